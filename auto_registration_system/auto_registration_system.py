@@ -1,15 +1,17 @@
+from collections.abc import Iterable
+from datetime import datetime
 from typing import BinaryIO
 
-from telegram import MessageEntity
-
-from auto_registration_system.model import User
+from auto_registration_system.model import Mention, User
 from auto_registration_system.command_handler.handler_aka import AkaHandler
 from auto_registration_system.command_handler.handler_allplayable import AllpendingHandler
 from auto_registration_system.data_structure.chat_manager import ChatManager
 from auto_registration_system.command_handler.handler_av import AvHandler
 from auto_registration_system.command_handler.handler_dereg import DeregHandler
+from auto_registration_system.command_handler.handler_pos import PosHandler
 from auto_registration_system.command_handler.handler_reg import RegHandler
 from auto_registration_system.command_handler.handler_reserve import ReserveHandler
+from auto_registration_system.data_structure.list_paginator import ListPaginator
 from auto_registration_system.data_structure.lock_manager import LockManager
 from auto_registration_system.data_structure.registration_data import RegistrationData
 from auto_registration_system.data_structure.admin_manager import AdminManager
@@ -19,9 +21,12 @@ from auto_registration_system.exception.error_maker import ErrorMaker
 from auto_registration_system.exception.exception_syntax_error import SyntaxErrorException
 from auto_registration_system.term import Term
 from config import Config
+from metrics import Metrics
+from string_parser.command_arguments import CommandArguments
 from string_parser.string_parser import StringParser
 from auto_registration_system.data_structure.identity_manager import IdentityManager
 from auto_registration_system.data_structure.time_manager import TimeManager
+from auto_registration_system.data_structure.waitlist import Waitlist
 from data_handler.data_handler import DataHandler
 from auto_registration_system.data_structure.reminder import Reminder
 from tracer import Tracer
@@ -29,18 +34,18 @@ from tracer import Tracer
 
 class AutoRegistrationSystem:
 
-    def __init__(self, admins: set[str], identity_manager: IdentityManager, time_manager: TimeManager):
+    def __init__(self, admins: set[str], identity_manager: IdentityManager, time_manager: TimeManager,
+                 allowed_chat_ids: set[int]):
+        self._allowed_chat_ids: set[int] = allowed_chat_ids  # chats where the main list is used
         self._data: RegistrationData or None = None
         self._pre_released_data: RegistrationData or None = None
         self._admin_manager: AdminManager = AdminManager(admins=admins)
         self._lock_manager: LockManager = LockManager(locked=False)
         self._identity_manager: IdentityManager = identity_manager
         self._release_time_manager: ReleaseTimeManager = ReleaseTimeManager()
-        self._reminder: Reminder = Reminder(
-            time_list=Config.reminder_time_list,
-            time_manager=time_manager,
-            release_time=self._release_time_manager.release_time
-        )
+        self._reminder: Reminder = Reminder(time_list=Config.reminder_time_list)
+        self._main_list_paginator: ListPaginator = ListPaginator(max_page_length=Config.max_list_page_length)
+        self._pre_released_list_paginator: ListPaginator = ListPaginator(max_page_length=Config.max_list_page_length)
 
     def attempt_release_data(self, time_manager: TimeManager) -> bool:
         if self._release_time_manager.is_releasable(time_manager=time_manager):
@@ -50,8 +55,10 @@ class AutoRegistrationSystem:
             return True
         return False
 
-    def update_reminder(self, time_manager: TimeManager) -> (bool, int):
-        return self._reminder.update_pointer(
+    def get_upcoming_reminders(self, time_manager: TimeManager) -> list[(int, datetime)]:
+        if not self._release_time_manager.enabled:
+            return []
+        return self._reminder.get_upcoming_reminders(
             time_manager=time_manager,
             release_time=self._release_time_manager.release_time
         )
@@ -64,10 +71,25 @@ class AutoRegistrationSystem:
     def data(self) -> RegistrationData:
         return self._data
 
+    @property
+    def pre_released_data(self) -> RegistrationData or None:
+        return self._pre_released_data
+
+    @property
+    def allowed_chat_ids(self) -> set[int]:
+        return self._allowed_chat_ids
+
     @property
     def identity_manager(self) -> IdentityManager:
         return self._identity_manager
 
+    def get_waitlist_priority(self, name: str) -> int:
+        """Return the priority class of name in waitlists: guests after members if configured, otherwise all in
+        the default class."""
+        if Config.prioritize_members_in_waitlist and not self._identity_manager.is_member(name=name):
+            return Waitlist.PRIORITY_GUEST
+        return Waitlist.PRIORITY_DEFAULT
+
     @staticmethod
     def convert_registrations_to_string(data: RegistrationData or None) -> str or None:
         if data is None:
@@ -101,28 +123,43 @@ class AutoRegistrationSystem:
 
     def handle_all(self, username: str, chat_id: int):
         try:
-            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=Config.allowed_chat_ids)
+            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=self._allowed_chat_ids)
         except Exception:
             try:
                 self._admin_manager.enforce_admin(username=username)
             except Exception:
                 raise ErrorMaker.make_admin_permission_error_exception()
 
-    def handle_new(self, username: str, message: str, chat_id: int) -> (str, bool):
-        is_in_main_group = ChatManager.is_chat_id_allowed(chat_id=chat_id, allowed_chat_ids=Config.allowed_chat_ids)
+    def handle_new(self, username: str, message: str, chat_id: int, lines: Iterable[str] | None = None) -> (str, bool):
+        """Replace the list (or the pre-released list outside the group) by the one in message, or in lines if
+        given, e.g. from an uploaded document. Nothing is changed if any line has an error."""
+        is_in_main_group = ChatManager.is_chat_id_allowed(chat_id=chat_id, allowed_chat_ids=self._allowed_chat_ids)
         try:
             adminUser = self._admin_manager.enforce_admin(username=username)
         except Exception as e:
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
             return repr(e), is_in_main_group
         
         temp_data = RegistrationData()
         try:
-            response = NewHandler.handle(
-                user=adminUser,
-                message=message,
-                data=temp_data,
-                max_num_players=Config.max_num_players_per_slot
-            )
+            # lines are parsed and inserted in one pass
+            with Metrics.phase(phase=Metrics.PHASE_PARSE):
+                if lines is None:
+                    response = NewHandler.handle(
+                        user=adminUser,
+                        message=message,
+                        data=temp_data,
+                        max_num_players=Config.max_num_players_per_slot,
+                        get_priority=self.get_waitlist_priority
+                    )
+                else:
+                    response = NewHandler.handle_lines(
+                        user=adminUser,
+                        lines=lines,
+                        data=temp_data,
+                        max_num_players=Config.max_num_players_per_slot,
+                        get_priority=self.get_waitlist_priority
+                    )
             if response:
                 if is_in_main_group:
                     self._data = temp_data
@@ -131,6 +168,7 @@ class AutoRegistrationSystem:
                 return "Set up successfully!", is_in_main_group
             return "Nothing has been changed", is_in_main_group
         except Exception as e:
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
             return repr(e), is_in_main_group
 
     def handle_notitime(self, username: str, message: str, time_manager: TimeManager) -> (bool, str):
@@ -141,11 +179,6 @@ class AutoRegistrationSystem:
                 new_release_time=time_manager.str_to_datetime(message),
                 time_manager=time_manager
             )
-            self._reminder = Reminder(
-                time_list=Config.reminder_time_list,
-                time_manager=time_manager,
-                release_time=self._release_time_manager.release_time
-            )
             if not self.release_time_manager.enabled:
                 return False, f"❌ Release time hasn't been set!"
             return True, f"✅ New list will be released after {time_manager.datetime_to_str(
@@ -160,6 +193,12 @@ class AutoRegistrationSystem:
             data = self._pre_released_data
         return AutoRegistrationSystem.convert_registrations_to_string(data=data)
 
+    def get_all_slots_as_pages(self, is_main_data: bool = True, is_compact: bool = False) -> list[str]:
+        """Return the list split into pages fitting in one message each, no page if there is no list."""
+        if is_main_data:
+            return self._main_list_paginator.paginate(data=self._data, is_compact=is_compact)
+        return self._pre_released_list_paginator.paginate(data=self._pre_released_data, is_compact=is_compact)
+
     def get_available_slots_as_string(self) -> str:
         res: str = AutoRegistrationSystem.convert_counts_from_available_slots_to_string(
             data=AvHandler.handle(data=self._data)
@@ -169,49 +208,72 @@ class AutoRegistrationSystem:
         return res
 
     def write_all_data_to_files(self, data_handler: DataHandler, time_manager: TimeManager):
-        data_handler.write_data_to_files(
-            main_list_as_str=self.get_all_slots_as_string(is_main_data=True),
-            release_time_as_str=self._release_time_manager.release_time_to_str_with_input_time_format(
-                time_manager=time_manager
-            ),
-            pre_released_list_as_str=self.get_all_slots_as_string(is_main_data=False)
-        )
+        with Metrics.phase(phase=Metrics.PHASE_PERSIST):
+            data_handler.write_data_to_files(
+                main_list_as_str=self.get_all_slots_as_string(is_main_data=True),
+                release_time_as_str=self._release_time_manager.release_time_to_str_with_input_time_format(
+                    time_manager=time_manager
+                ),
+                pre_released_list_as_str=self.get_all_slots_as_string(is_main_data=False)
+            )
 
     def handle_register(self, command_string_for_suggestion: str, username: str, message: str, chat_id: int) \
             -> (str, str or None):
         try:
             self._lock_manager.enforce_system_unlocked(username=username, admin_manager=self._admin_manager)
-            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=Config.allowed_chat_ids)
-            StringParser.enforce_single_line_message(message=message)
-            response, conflict_names, slot_label = RegHandler.handle(message=message, data=self._data)
+            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=self._allowed_chat_ids)
+            with Metrics.phase(phase=Metrics.PHASE_PARSE):
+                arguments = CommandArguments.parse(message=message)
+            if arguments.error is not None:
+                Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
+                return repr(arguments.error), None
+            with Metrics.phase(phase=Metrics.PHASE_MUTATE):
+                response, conflict_names, slot_label = RegHandler.handle(
+                    arguments=arguments,
+                    data=self._data,
+                    get_priority=self.get_waitlist_priority
+                )
 
             if conflict_names is not None:
                 suggestion = RegHandler.make_suggestion(
                     command_string=command_string_for_suggestion,
                     id_strings=conflict_names,
-                    slot_label=slot_label
+                    slot_label=slot_label,
+                    data=self._data
                 )
                 return response, suggestion
             return response, None
         except Exception as e:
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
             return repr(e), None
 
     def handle_reserve(self, username: str, message: str, chat_id: int) -> str:
         try:
             self._lock_manager.enforce_system_unlocked(username=username, admin_manager=self._admin_manager)
-            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=Config.allowed_chat_ids)
-            StringParser.enforce_single_line_message(message=message)
-            return ReserveHandler.handle(message=message, data=self._data)
+            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=self._allowed_chat_ids)
+            with Metrics.phase(phase=Metrics.PHASE_PARSE):
+                arguments = CommandArguments.parse(message=message)
+            if arguments.error is not None:
+                Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
+                return repr(arguments.error)
+            with Metrics.phase(phase=Metrics.PHASE_MUTATE):
+                return ReserveHandler.handle(arguments=arguments, data=self._data)
         except Exception as e:
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
             return repr(e)
 
     def handle_deregister(self, command_string: str, username: str, id_string: str, message: str, chat_id: int) -> str:
         try:
             self._lock_manager.enforce_system_unlocked(username=username, admin_manager=self._admin_manager)
-            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=Config.allowed_chat_ids)
-            StringParser.enforce_single_line_message(message=message)
-            return DeregHandler.handle(message=message, data=self._data)
-        except SyntaxErrorException:
+            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=self._allowed_chat_ids)
+            with Metrics.phase(phase=Metrics.PHASE_PARSE):
+                arguments = CommandArguments.parse(message=message)
+            if arguments.error is None:
+                with Metrics.phase(phase=Metrics.PHASE_MUTATE):
+                    return DeregHandler.handle(arguments=arguments, data=self._data)
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
+            if not isinstance(arguments.error, SyntaxErrorException):
+                return repr(arguments.error)
             response: str = "Syntax error\\!"
             suggestion: str = DeregHandler.make_suggestion(
                 command_string=command_string,
@@ -222,6 +284,17 @@ class AutoRegistrationSystem:
                 return f"{response}\n{suggestion}"
             return response
         except Exception as e:
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
+            return repr(e)
+
+    def handle_pos(self, id_string: str, message: str, chat_id: int) -> str:
+        """Return where the name in message (the sender if none) is in the slots, e.g. #2 of the waitlist."""
+        try:
+            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=self._allowed_chat_ids)
+            name = StringParser.remove_command(message=message).split("\n", 1)[0].strip()
+            return PosHandler.handle(name=name if len(name) > 0 else id_string, data=self._data)
+        except Exception as e:
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
             return repr(e)
 
     def get_admin_list_as_string(self) -> str:
@@ -229,13 +302,13 @@ class AutoRegistrationSystem:
 
     def handle_allpending(self, username: str, chat_id: int) -> str:
         try:
-            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=Config.allowed_chat_ids)
+            ChatManager.enforce_chat_id(chat_id=chat_id, allowed_chat_ids=self._allowed_chat_ids)
             self._admin_manager.enforce_admin(username=username)
         except Exception as e:
             return repr(e)
 
         try:
-            return AllpendingHandler.handle(data=self._data)
+            return AllpendingHandler.handle(data=self._data, get_priority=self.get_waitlist_priority)
         except Exception as e:
             return repr(e)
 
@@ -259,15 +332,46 @@ class AutoRegistrationSystem:
         self._admin_manager.enforce_admin(username=username)
         return tracer.load_file_history()
 
+    def handle_profile(self, username: str, message: str) -> int:
+        """Return the number of updates to be profiled, e.g. 50 for /profile 50 (default if not given)."""
+        self._admin_manager.enforce_admin(username=username)
+        argument = StringParser.remove_command(message=message).strip()
+        if len(argument) == 0:
+            return Config.default_num_profiled_updates
+        if not argument.isdigit() or not 1 <= int(argument) <= Config.max_num_profiled_updates:
+            raise ErrorMaker.make_syntax_error_exception(
+                message=message,
+                hint=f"Expecting a number of updates from 1 to {Config.max_num_profiled_updates}"
+            )
+        return int(argument)
+
+    def handle_memory(self, username: str, message: str) -> bool:
+        """Return whether tracing of memory is to be stopped, i.e. for /memory stop (/memory compares snapshots)."""
+        self._admin_manager.enforce_admin(username=username)
+        argument = StringParser.remove_command(message=message).strip()
+        if len(argument) == 0:
+            return False
+        if argument != "stop":
+            raise ErrorMaker.make_syntax_error_exception(message=message, hint="Expecting nothing or \"stop\"")
+        return True
+
+    def handle_stats(self, username: str, metrics: Metrics, chat_stats: Iterable[str] = ()) -> str:
+        """Return the report of metrics of the process, followed by chat_stats of this chat only."""
+        try:
+            self._admin_manager.enforce_admin(username=username)
+            return "\n".join([metrics.make_report()] + [f"This chat, {line}" for line in chat_stats])
+        except Exception as e:
+            return repr(e)
+
     def handle_aka(self, sender_id: int, sender_full_name: str, message: str,
-                   message_entities: dict[MessageEntity, str]) -> str:
-        if len(message_entities) >= 1:
+                   mentions: list[Mention]) -> str:
+        if len(mentions) >= 1:
             # self._admin_manager.enforce_admin(username=sender_username)
             raise ErrorMaker.make_syntax_error_exception(message=message)
         return AkaHandler.handle(
             sender_id=sender_id,
             sender_full_name=sender_full_name,
             message=message,
-            message_entities=message_entities,
+            mentions=mentions,
             identity_manager=self._identity_manager
         )
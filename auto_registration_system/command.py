@@ -20,10 +20,23 @@ class Command:
     COMMAND_AKA = "aka"
     COMMAND_RESET = "reset"
     COMMAND_NOTITIME = "notitime"
+    COMMAND_STATS = "stats"
+    COMMAND_PROFILE = "profile"
+    COMMAND_MEMORY = "memory"
+    COMMAND_POS = "pos"
     COMMAND_RT = "rt"  # command functioning is not developed yet
+    # callback data of inline buttons sent before compact callback codes were introduced
     CALLBACK_DATA_HELP = f"_{COMMAND_HELP}"
     CALLBACK_DATA_ALL = f"_{COMMAND_ALL}"
     CALLBACK_DATA_DRG = f"_{COMMAND_DRG}"
     CALLBACK_DATA_AV = f"_{COMMAND_AV}"
     CALLBACK_DATA_RG = f"_{COMMAND_RG}"
-    CALLBACK_DATA_RT = f"_{COMMAND_RT}"
\ No newline at end of file
+    CALLBACK_DATA_RT = f"_{COMMAND_RT}"
+    # compact callback data of inline buttons is "<code>" or "<code>:<arg 1>:...:<arg n>"
+    CALLBACK_CODE_HELP = "h"
+    CALLBACK_CODE_ALL = "a"
+    CALLBACK_CODE_AV = "v"
+    CALLBACK_CODE_RT = "t"
+    CALLBACK_CODE_RG = "r"  # argument: slot label
+    CALLBACK_CODE_DRG = "d"
+    CALLBACK_CODE_DRG_SLOT = "s"  # arguments: telegram id, slot label
@@ -1,22 +1,21 @@
-from telegram import MessageEntity
-
 from auto_registration_system.data_structure.identity_manager import IdentityManager
 from auto_registration_system.exception.error_maker import ErrorMaker
+from auto_registration_system.model import Mention
 from string_parser.string_parser import StringParser
 
 
 class AkaHandler:
 
     @staticmethod
-    def _parse_admin_case(message: str, command_string: str, message_entity: MessageEntity) \
+    def _parse_admin_case(message: str, command_string: str, mention: Mention) \
             -> (int, str, str):    # id, full_name, alias
-        if not message[len(command_string) + 1:message_entity.offset].isspace():
+        if not message[len(command_string) + 1:mention.offset].isspace():
             raise ErrorMaker.make_syntax_error_exception(message=message)
-        raw_alias: str = message[message_entity.offset + message_entity.length:]
+        raw_alias: str = message[mention.offset + mention.length:]
         if ',' in raw_alias:
             raise ErrorMaker.make_message_containing_comma_exception(message=message)
-        res_id = message_entity.user.id
-        res_full_name = StringParser.process_telegram_full_name(message_entity.user.full_name)
+        res_id = mention.user_id
+        res_full_name = StringParser.process_telegram_full_name(mention.user_full_name)
         res_alias = StringParser.split_names(message=raw_alias)[0]
         return res_id, res_full_name, res_alias
 
@@ -30,13 +29,13 @@ class AkaHandler:
 
     @staticmethod
     def handle(sender_id: int, sender_full_name: str, message: str,
-               message_entities: dict[MessageEntity, str], identity_manager: IdentityManager) -> str:
-        if len(message_entities) >= 1:
-            # message_entity = list(message_entities.keys())[0]
+               mentions: list[Mention], identity_manager: IdentityManager) -> str:
+        if len(mentions) >= 1:
+            # mention = mentions[0]
             # affected_id, affected_name, affected_alias = AkaHandler._parse_admin_case(
             #     message=message,
             #     command_string=command_string,
-            #     message_entity=message_entity
+            #     mention=mention
             # )
             raise ErrorMaker.make_syntax_error_exception(message=message)  # this functionality is skipped
         else:
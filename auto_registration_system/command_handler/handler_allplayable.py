@@ -1,14 +1,12 @@
+from collections.abc import Callable
+
 from auto_registration_system.data_structure.registration_data import RegistrationData
 
 
 class AllpendingHandler:
     @staticmethod
-    def handle(data: RegistrationData) -> str:
-        for date_venue in data.bookings_by_date_venue:
-            for slot_label in data.bookings_by_date_venue[date_venue]:
-                slot = data.bookings_by_date_venue[date_venue][slot_label]
-                for player_name in data.bookings_by_date_venue[date_venue][slot_label].non_pending_reservations:
-                    slot.pending_reservations.append(player_name)
-                slot.non_pending_reservations = list()
-        data.restructure()
+    def handle(data: RegistrationData, get_priority: Callable[[str], int] | None = None) -> str:
+        for _, slot in data.collect_all_slots_with_labels():
+            slot.make_reservations_pending(get_priority=get_priority)
+        data.mark_changed()
         return "Admin has changed all reserve members to (pending)"
@@ -1,4 +1,5 @@
 from auto_registration_system.data_structure.registration_data import RegistrationData
+from string_parser.command_arguments import CommandArguments
 from string_parser.string_parser import StringParser
 from ..data_structure.slot_manager import SlotManager
 from ..exception.error_maker import ErrorMaker
@@ -6,79 +7,52 @@ from ..exception.error_maker import ErrorMaker
 
 class DeregHandler:
     @staticmethod
-    def handle(message: str, data: RegistrationData) -> str:
-        original_message = message
-        message = StringParser.remove_command(message=message)
-        try:
-            slot_label = StringParser.get_last_word(message=message)
-            current_message = StringParser.remove_last_word(message=message)
-        except Exception:
-            raise ErrorMaker.make_syntax_error_exception(message=original_message)
-
-        players: list[str] = StringParser.split_names(current_message)
+    def handle(arguments: CommandArguments, data: RegistrationData) -> str:
+        slot_label = arguments.slot_label
 
         response: str = ""
         count_processed: int = 0
         slot: SlotManager = data.get_slot(slot_label=slot_label)
         if slot is None:
             return f"Cannot find slot {slot_label}\\!"
-        for name in players:
-            if len(name) > 0:
-                count_processed += 1
-                try:
-                    index = int(name) - 1
-                    if index < 0 or index >= slot.num_players:
-                        response += f"Position {index + 1} is not valid\\!\n"
-                    elif index >= len(slot.players) or slot.players[index] == "":
-                        response += f"Position {index + 1} has been removed or does not exist\\!\n"
-                    else:
-                        response += (f"{slot.players[index]} \\(from position {index + 1}\\) "
-                                     + f"has been removed from slot {slot_label}\\!\n")
-                        slot.players[index] = ""
-                except ValueError:
-                    found: bool = False
-                    for i, player_name in enumerate(slot.players):
-                        if name == player_name:
-                            slot.players[i] = ""
-                            found = True
-                            break
-                    if not found:
-                        for i, player_name in enumerate(slot.pending_reservations):
-                            if name == player_name:
-                                slot.pending_reservations[i] = ""
-                                found = True
-                                break
-                    if not found:
-                        for i, player_name in enumerate(slot.non_pending_reservations):
-                            if name == player_name:
-                                slot.non_pending_reservations[i] = ""
-                                found = True
-                                break
-                    if found:
-                        response += f"{
-                            StringParser.replace_escape_characters_for_markdown(name)
-                        } has been removed from slot {slot_label}\\!\n"
-                    else:
-                        response += f"{
-                            StringParser.replace_escape_characters_for_markdown(name)
-                        } does not exist in slot {slot_label}\\!\n"
-        # clean empty elements
-        new_players: list[str] = list()
-        new_pending_reservations: list[str] = list()
-        new_non_pending_reservations: list[str] = list()
-        for player in slot.players:
-            if player != "":
-                new_players.append(player)
-        for player in slot.pending_reservations:
-            if player != "":
-                new_pending_reservations.append(player)
-        for player in slot.non_pending_reservations:
-            if player != "":
-                new_non_pending_reservations.append(player)
-        slot.players = new_players
-        slot.pending_reservations = new_pending_reservations
-        slot.non_pending_reservations = new_non_pending_reservations
-        slot.restructure()
+        # positions refer to the list before the command, so names are removed once all are found
+        removed_names: set[str] = set()
+        for name in arguments.names:
+            count_processed += 1
+            try:
+                position = int(name)
+                player_name = slot.get_player_at(position=position)
+                if position < 1 or position > slot.num_players:
+                    response += f"Position {position} is not valid\\!\n"
+                elif player_name is None or player_name in removed_names:
+                    response += f"Position {position} has been removed or does not exist\\!\n"
+                else:
+                    response += (f"{StringParser.replace_escape_characters_for_markdown(message=player_name)} "
+                                 + f"\\(from position {position}\\) "
+                                 + f"has been removed from slot {slot_label}\\!\n")
+                    data.mark_member_changed(name=player_name)
+                    removed_names.add(player_name)
+            except ValueError:
+                if name not in removed_names and slot.is_in_any_list(proposed_name=name):
+                    removed_names.add(name)
+                    data.mark_member_changed(name=name)
+                    response += f"{
+                        StringParser.replace_escape_characters_for_markdown(name)
+                    } has been removed from slot {slot_label}\\!\n"
+                else:
+                    response += f"{
+                        StringParser.replace_escape_characters_for_markdown(name)
+                    } does not exist in slot {slot_label}\\!"
+                    similar_names = [
+                        similar_name
+                        for similar_name, _ in data.find_similar_names(query=name, slot_label=slot_label)
+                    ]
+                    if len(similar_names) > 0:
+                        response += f" Did you mean {StringParser.replace_escape_characters_for_markdown(
+                            message=' or '.join(similar_names)
+                        )}?"
+                    response += "\n"
+        slot.deregister(names=removed_names)
         if count_processed == 0:
             return "There is nothing changed\\!"
 
@@ -88,22 +62,19 @@ class DeregHandler:
     def make_suggestion(command_string: str, id_string: str, data: RegistrationData) -> str or None:
         res: str = ""
         count: int = 0
-        slots_able_to_be_deregistered = DeregHandler.search_for_slots_able_to_be_deregistered(
-            id_string=id_string,
-            data=data
-        )
-        for slot_label, slot in slots_able_to_be_deregistered:
-            res += f"{count + 1}\\. `/{command_string} "
-            res += f"{StringParser.replace_escape_characters_for_markdown(message=id_string)} {slot_label}`\n"
-            count += 1
+        # the sender may be in the list under a slightly different name, e.g. full name instead of alias
+        for name, slot_labels in data.find_similar_names(query=id_string):
+            for slot_label in slot_labels:
+                res += f"{count + 1}\\. `/{command_string} "
+                res += f"{StringParser.replace_escape_characters_for_markdown(message=name)} {slot_label}`\n"
+                count += 1
         if len(res) == 0:
             return None
         return f"You can try the following commands \\(hold to copy\\):\n{res}"
 
     @staticmethod
     def search_for_slots_able_to_be_deregistered(id_string: str, data: RegistrationData) -> list[(str, SlotManager)]:
-        res: list[(str, SlotManager)] = list()
-        for slot_label, slot in data.collect_all_slots_with_labels():
-            if slot.is_in_any_list(proposed_name=id_string):
-                res.append((slot_label, slot))
-        return res
+        return [
+            (slot_label, data.get_slot(slot_label=slot_label))
+            for slot_label in data.get_slot_labels_of_name(name=id_string)
+        ]
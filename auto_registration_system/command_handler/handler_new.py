@@ -1,140 +1,198 @@
 import re
+from collections.abc import Callable, Iterable, Iterator
 from typing import Optional
 
 from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.data_structure.waitlist import Waitlist
 from auto_registration_system.model import SlotDetail, Player, User
 from string_parser.string_parser import StringParser
 from ..exception.error_maker import ErrorMaker
+from ..exception.exception_list_errors import ListErrorsException
 from ..term import Term
 
 
-class NewHandler:
+class DateVenueNode:
+    """A line starting a date and venue, e.g. [dv] 🏸14/09 SUN Queenstown cc"""
+    def __init__(self, line_number: int, line: str, date_venue: str):
+        self.line_number = line_number
+        self.line = line
+        self.date_venue = date_venue
 
-    @staticmethod
-    def is_date_venue_line(message: str) -> bool:
-        try:
-            first_word: str = StringParser.get_first_word(message=message)
-        except Exception:
-            return False
-        if first_word in {Term.DATE_VENUE, Term.DATE_VENUE_SHORTENED}:
-            return True
-        return False
 
-    @staticmethod
-    def get_slot_label(message: str) -> str:
-        first_word: str = StringParser.get_first_word(message=message)
-        tag = first_word
-        if first_word[0] == "[" and first_word[-1:] == "]":
-            if len(first_word) >= 3:
-                tag = first_word[1:-1]
-            else:
-                tag = ""
-        try:
-            if not (tag.islower() and tag.isalnum()):
-                raise ErrorMaker.make_syntax_error_exception(message=message)
-            return tag
-        except Exception:
-            raise ErrorMaker.make_syntax_error_exception(message=message)
+class SlotNode:
+    """A line defining a slot of the current date and venue, e.g. [s] ❤️1:00-3:00 pm (1), #players: 7"""
+    def __init__(self, line_number: int, line: str, slot_detail: SlotDetail):
+        self.line_number = line_number
+        self.line = line
+        self.slot_detail = slot_detail
 
-    @staticmethod
-    def is_slot_line(message: str) -> bool:
-        try:
-            NewHandler.get_slot_label(message=message)
-            return True
-        except Exception:
-            return False
+
+class PlayerNode:
+    """A line of a position in the current slot, e.g. 1. Alice (paid), with no player if the position is empty"""
+    def __init__(self, line_number: int, line: str, player: Player | None):
+        self.line_number = line_number
+        self.line = line
+        self.player = player
+
+
+class NewHandler:
+    DATE_VENUE_TAGS = frozenset({Term.DATE_VENUE, Term.DATE_VENUE_SHORTENED})
+    SLOT_HEAD_PATTERN = re.compile(r"\[(.+)\](.*)")
+    NUM_PLAYERS_KEY = Term.NUM_PLAYERS[:-1].lower()
+    OWNER_KEY = Term.OWNER[:-1].lower()
+    # a run of empty positions in compact layout, e.g. 3.-6. (4 available)
+    EMPTY_POSITIONS_PATTERN = re.compile(rf"\d+\.\s*-\s*\d+\.\s*\(\s*\d+\s+{Term.AVAILABLE}\s*\)", re.IGNORECASE)
 
     @staticmethod
-    def get_player_label(message: str) -> str:
-        first_word: str = StringParser.get_first_word(message=message)
-        try:
-            if not (first_word[-1:] == "." and len(first_word) >= 2):
-                raise ErrorMaker.make_syntax_error_exception(message=message)
-            return first_word[:-1]
-        except Exception:
-            raise ErrorMaker.make_syntax_error_exception(message=message)
+    def is_slot_label(first_word: str) -> bool:
+        tag = first_word
+        if first_word[0] == "[" and first_word[-1] == "]":
+            tag = first_word[1:-1]
+        return tag.islower() and tag.isalnum()
 
     @staticmethod
-    def is_player_line(message: str) -> bool:
-        try:
-            NewHandler.get_player_label(message=message)
-            return True
-        except Exception:
-            return False
+    def parse_line(line_number: int, line: str) -> DateVenueNode | SlotNode | PlayerNode:
+        """Classify a non-empty stripped line by its first word and parse it into a node."""
+        words = line.split(None, 1)
+        first_word = words[0]
+        if first_word in NewHandler.DATE_VENUE_TAGS:
+            return DateVenueNode(line_number=line_number, line=line, date_venue=words[1] if len(words) > 1 else "")
+        if NewHandler.is_slot_label(first_word=first_word):
+            return SlotNode(line_number=line_number, line=line, slot_detail=NewHandler.parse_slot_line(line=line))
+        if len(first_word) >= 2 and first_word[-1] == ".":
+            return PlayerNode(line_number=line_number, line=line, player=NewHandler.parse_player_line(line=line))
+        raise ErrorMaker.make_syntax_error_exception(message=line)
 
     @staticmethod
-    def handle(user: User, message: str, data: RegistrationData, max_num_players: int) -> bool:
-        message = StringParser.remove_command(message=message)
+    def parse(lines: Iterable[str], errors: list[(int, str)] | None = None
+              ) -> Iterator[DateVenueNode | SlotNode | PlayerNode]:
+        """Parse lines one by one into nodes, skipping empty lines. Line numbers are counted from 1.
+
+        If errors is given, lines which cannot be parsed are added to it with their line numbers and skipped,
+        otherwise the first of them raises."""
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                node = NewHandler.parse_line(line_number=line_number, line=line)
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors.append((line_number, ListErrorsException.format_error(e)))
+                continue
+            yield node
 
-        # parsing state - update this as we parse the header
+    @staticmethod
+    def build(nodes: Iterable[DateVenueNode | SlotNode | PlayerNode], user: User, data: RegistrationData,
+              max_num_players: int, errors: list[(int, str)], get_priority: Callable[[str], int] | None = None) \
+            -> bool:
+        """Insert the parsed nodes into data, return False if there is no node. Pending reservations are put in the
+        priority classes given by get_priority, if given, keeping their order within each class.
+
+        Nodes which cannot be inserted are added to errors with their line numbers, and so are not the players of
+        a slot which cannot be inserted."""
+        # parsing state - update this as we go through the nodes
         current_date_venue: str or None = None
         current_slot_label: str or None = None
+        is_current_slot_invalid: bool = False
 
         count_processed: int = 0
-        for line in message.splitlines():
-            current_message = line.strip()
-            if not current_message:
-                continue
-
+        for node in nodes:
             count_processed += 1
-            if NewHandler.is_date_venue_line(message=current_message):
-                current_date_venue = NewHandler.parse_date_venue_line(current_message)
-                current_slot_label = None
-                
-            elif NewHandler.is_slot_line(message=current_message):
-                slot_detail: SlotDetail = NewHandler.parse_slot_line(line=current_message)
-                slot_detail.date_venue = current_date_venue
-
-                # validations
-                if slot_detail.num_players is None:
-                    slot_detail.num_players = max_num_players
-                if slot_detail.num_players > max_num_players:
-                    raise ErrorMaker.make_num_players_exceeding_maximum_allowed_exception(
-                        message=current_message,
-                        max_num_players=max_num_players
-                    )
-
-                data.insert_slot_detail(slot_detail=slot_detail)
-                # update this address for subsequent player lines
-                current_slot_label = slot_detail.slot_label
-
-            elif NewHandler.is_player_line(message=current_message):
-                player = NewHandler.parse_player_line(current_message)
-                if player is None:
-                    continue
-                if current_date_venue is None:
-                    raise ErrorMaker.make_dv_not_found_exception(message=line)
-                if current_slot_label is None:
-                    raise ErrorMaker.make_slot_not_found_exception(message=line)
-
-                if player.is_reserve and not player.is_pending:
-                    data.reserve_player(current_slot_label, player.name.title())
+            try:
+                if isinstance(node, DateVenueNode):
+                    current_date_venue = node.date_venue
+                    current_slot_label = None
+                    is_current_slot_invalid = False
+
+                elif isinstance(node, SlotNode):
+                    current_slot_label = None
+                    is_current_slot_invalid = True
+                    slot_detail: SlotDetail = node.slot_detail
+                    slot_detail.date_venue = current_date_venue
+
+                    # validations
+                    if slot_detail.num_players is None:
+                        slot_detail.num_players = max_num_players
+                    if slot_detail.num_players > max_num_players:
+                        raise ErrorMaker.make_num_players_exceeding_maximum_allowed_exception(
+                            message=node.line,
+                            max_num_players=max_num_players
+                        )
+
+                    data.insert_slot_detail(slot_detail=slot_detail)
+                    # update this address for subsequent player lines
+                    current_slot_label = slot_detail.slot_label
+                    is_current_slot_invalid = False
+
                 else:
-                    data.register_player(current_slot_label, player.name.title())
-                
-                if player.is_paid:
-                    data.get_slot(current_slot_label).confirm_payment(player.name, user)
-            else:
-                if len(current_message) > 0:
-                    raise ErrorMaker.make_syntax_error_exception(message=line)
-                count_processed -= 1
-        if count_processed == 0:
-            return False
+                    player = node.player
+                    if player is None or is_current_slot_invalid:
+                        continue
+                    if current_date_venue is None:
+                        raise ErrorMaker.make_dv_not_found_exception(message=node.line)
+                    if current_slot_label is None:
+                        raise ErrorMaker.make_slot_not_found_exception(message=node.line)
+
+                    if player.is_reserve and not player.is_pending:
+                        data.reserve_player(current_slot_label, player.name.title())
+                    else:
+                        name = player.name.title()
+                        data.register_player(
+                            current_slot_label,
+                            name,
+                            priority=get_priority(name) if get_priority is not None else Waitlist.PRIORITY_DEFAULT
+                        )
+
+                    if player.is_paid:
+                        data.get_slot(current_slot_label).confirm_payment(player.name, user)
+            except Exception as e:
+                errors.append((node.line_number, ListErrorsException.format_error(e)))
 
-        return True
+        return count_processed > 0
+
+    @staticmethod
+    def handle(user: User, message: str, data: RegistrationData, max_num_players: int,
+               get_priority: Callable[[str], int] | None = None) -> bool:
+        message = StringParser.remove_command(message=message)
+        return NewHandler.handle_lines(
+            user=user,
+            lines=message.splitlines(),
+            data=data,
+            max_num_players=max_num_players,
+            get_priority=get_priority
+        )
+
+    @staticmethod
+    def handle_lines(user: User, lines: Iterable[str], data: RegistrationData, max_num_players: int,
+                     get_priority: Callable[[str], int] | None = None) -> bool:
+        """Parse lines, e.g. streamed from a document, into data in one pass, return False if there is no line.
+
+        All errors are raised together at the end with their line numbers, in which case data is partially filled
+        and must be discarded."""
+        errors: list[(int, str)] = []
+        is_processed = NewHandler.build(
+            nodes=NewHandler.parse(lines=lines, errors=errors),
+            user=user,
+            data=data,
+            max_num_players=max_num_players,
+            errors=errors,
+            get_priority=get_priority
+        )
+        if len(errors) > 0:
+            raise ErrorMaker.make_list_errors_exception(errors=errors)
+        return is_processed
 
     @staticmethod
     def parse_date_venue_line(line: str) -> str:
         """Parse a line defining a date and venue and return the date_venue string."""
         # line to parse looks something like below
         # [dv] 🏸14/09 SUN Queenstown cc
-        line = line.strip()
-        if line.startswith(Term.DATE_VENUE):
-            return line[len(Term.DATE_VENUE):].strip()
-        if line.startswith(Term.DATE_VENUE_SHORTENED):
-            return line[len(Term.DATE_VENUE_SHORTENED):].strip()
-
-        raise ErrorMaker.make_syntax_error_exception(message=line, hint="Line must start with [dv] or dv")
+        words = line.split(None, 1)
+        if len(words) == 0 or words[0] not in NewHandler.DATE_VENUE_TAGS:
+            raise ErrorMaker.make_syntax_error_exception(message=line, hint="Line must start with [dv] or dv")
+        return words[1].strip() if len(words) > 1 else ""
 
     @staticmethod
     def parse_slot_line(line: str) -> SlotDetail:
@@ -144,47 +202,33 @@ class NewHandler:
         # [s] ❤️1:00-3:00 pm (1), #players: 7
         # or
         # [s] ❤️1:00-3:00 pm (1), #players: 7, #owner: @alice
-        print(f"Parsing slot line: '{line}'")
-
-        slot_label = ""
-        time: Optional[str] = None
+        line = line.strip()
+        parts = line.split(",")
+        m = NewHandler.SLOT_HEAD_PATTERN.search(parts[0])
+        if not m:
+            raise ErrorMaker.make_syntax_error_exception(message=line, hint="Expecting slot [x]")
+        slot_label = m.group(1).strip()
+        time: Optional[str] = m.group(2).strip()
         num_players: Optional[int] = None
         owner: Optional[str] = None
 
-        for idx, part in enumerate(line.strip().split(",")):
-            if len(part) == 0:
+        for part in parts[1:]:
+            key, separator, value = part.partition(":")
+            if not separator:
+                # skip over parts without key
                 continue
+            key = key.strip().lower()
+            value = value.strip()
+            if key == NewHandler.NUM_PLAYERS_KEY:
+                try:
+                    num_players = int(value)
+                except ValueError:
+                    raise ErrorMaker.make_syntax_error_exception(message=line)
+            elif key == NewHandler.OWNER_KEY:
+                owner = value.removeprefix("@").strip()
+            else:
+                raise ErrorMaker.make_syntax_error_exception(message=line, hint=f"Unknown key '{key}'")
 
-            part = part.strip()
-            if idx == 0:
-                m = re.search(r"\[(.+)\](.*)", part)
-                if not m:
-                    raise ErrorMaker.make_syntax_error_exception(message=line, hint="Expecting slot [x]")
-                slot_label = m.group(1).strip()
-                time = m.group(2).strip()
-                continue
-            if not part:
-                # skip over empty parts
-                continue
-            if ":" in part:
-                key, value = part.split(":", 1)
-                key = key.strip().lower()
-                value = value.strip()
-                if key == Term.NUM_PLAYERS[:-1].lower():
-                    try:
-                        num_players = int(value)
-                    except ValueError:
-                        raise ErrorMaker.make_syntax_error_exception(message=line)
-                elif key == Term.OWNER[:-1].lower():
-                    if value.startswith("@"):
-                        owner = value[1:].strip()
-                    else:
-                        owner = value.strip()
-                else:
-                    print(f"Unknown key '{key}' in slot line '{line}'")
-                    raise ErrorMaker.make_syntax_error_exception(message=line, hint=f"Unknown key '{key}'")
-
-        print(f"Parsed slot line: label='{slot_label}', time='{time}', num_players='{num_players}', owner='{owner}'")
         return SlotDetail(
             slot_label=slot_label,
             date_venue="",
@@ -195,51 +239,46 @@ class NewHandler:
         )
 
     @staticmethod
-    def parse_player_line(line: str) -> Player:
-        """Parse a line defining a player and return the player's name."""
+    def parse_player_line(line: str) -> Player | None:
+        """Parse a line defining a player and return the player, or None if the position is empty."""
         # line to parse looks something like below
         # 1. Alice (pending payment)
         # 2. Bob (paid)
         # 3. Charlie
         # 4.
+        # 5.-6. (2 available)
         # reserve. David
         # reserve. Eve (pending)
 
         line = line.strip()
+        if NewHandler.EMPTY_POSITIONS_PATTERN.fullmatch(line):
+            return None
         begin = 0
         end = len(line)
 
-        label = ""
         is_pending = False
         is_reserve = False
-        payment_status: Optional[str] = None
+        is_paid = False
 
         # consume "reserve"
         if line.startswith(Term.RESERVATION):
-            label = Term.RESERVATION
             is_reserve = True
             begin += len(Term.RESERVATION)
-        # consumer whitespace and row number
+        # consume whitespace and row number
         while begin < end and (line[begin].isspace() or line[begin].isdigit() or line[begin] in {".", "#"}):
             begin += 1
-        label = line[:begin].strip()
 
         if line.endswith(Term.PAYMENT_PENDING):
             end -= len(Term.PAYMENT_PENDING)
-            payment_status = Term.PAYMENT_PENDING
         elif line.endswith(Term.PAYMENT_PAID):
             end -= len(Term.PAYMENT_PAID)
-            payment_status = Term.PAYMENT_PAID
+            is_paid = True
         elif line.endswith(Term.PENDING):
             end -= len(Term.PENDING)
             is_pending = True
-        _ = label
-        
+
         player_name = line[begin:end].strip()
         if not player_name:
             return None
 
-        # if not player_name:
-        #     raise ErrorMaker.make_syntax_error_exception(message=line, hint="Player name cannot be empty")
-
-        return Player(player_name, payment_status == Term.PAYMENT_PAID, is_pending, is_reserve)
+        return Player(player_name, is_paid, is_pending, is_reserve)
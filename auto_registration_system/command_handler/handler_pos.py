@@ -0,0 +1,29 @@
+import time
+
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.term import Term
+
+
+class PosHandler:
+    @staticmethod
+    def handle(name: str, data: RegistrationData, now: float | None = None) -> str:
+        """Return the position of name in every slot involving it, with the time waited in pending reservations
+        (since now, time.time() if not given)."""
+        if now is None:
+            now = time.time()
+        slot_labels = data.get_slot_labels_of_name(name=name)
+        if len(slot_labels) == 0:
+            return f"{name} is not in any slot!"
+        response: str = ""
+        for slot_label in slot_labels:
+            slot = data.get_slot(slot_label=slot_label)
+            position = slot.waitlist.get_position(name=name)
+            if position is not None:
+                num_minutes = int(max(0.0, now - slot.waitlist.get_entry(name=name).enqueue_time) // 60)
+                response += (f"{name} is #{position} of {len(slot.waitlist)} in {Term.RESERVATION} "
+                             + f"{Term.PENDING} of slot {slot_label}, waiting for {num_minutes} min.\n")
+            elif name in slot.non_pending_reservations:
+                response += f"{name} is in {Term.RESERVATION} of slot {slot_label}, not waiting for a position.\n"
+            else:
+                response += f"{name} is a player of slot {slot_label}.\n"
+        return response
@@ -1,32 +1,25 @@
 from auto_registration_system.data_structure.registration_data import RegistrationData
 from auto_registration_system.exception.error_maker import ErrorMaker
-from string_parser.string_parser import StringParser
+from string_parser.command_arguments import CommandArguments
 
 
 class ReserveHandler:
     @staticmethod
-    def handle(message: str, data: RegistrationData) -> str:
-        original_message = message
-        message = StringParser.remove_command(message=message)
-        try:
-            slot_label = StringParser.get_last_word(message=message)
-            current_message = StringParser.remove_last_word(message=message)
-        except Exception:
-            raise ErrorMaker.make_syntax_error_exception(message=original_message)
-
-        players: list[str] = StringParser.split_names(current_message)
+    def handle(arguments: CommandArguments, data: RegistrationData) -> str:
+        slot_label = arguments.slot_label
 
         response: str = ""
         count_processed: int = 0
-        for name in players:
-            if len(name) > 0:
-                count_processed += 1
-                try:
-                    StringParser.enforce_message_containing_alpha(message=name)
-                    data.reserve_player(slot_label=slot_label, player=name)
-                    response += f"{name} has been inserted into reserve list of slot {slot_label}.\n"
-                except Exception as e:
-                    response += f"{repr(e)}\n"
+        for name in arguments.names:
+            count_processed += 1
+            if name in arguments.names_without_alpha:
+                response += f"{repr(ErrorMaker.make_message_not_containing_alpha_exception(message=name))}\n"
+                continue
+            try:
+                data.reserve_player(slot_label=slot_label, player=name)
+                response += f"{name} has been inserted into reserve list of slot {slot_label}.\n"
+            except Exception as e:
+                response += f"{repr(e)}\n"
         if count_processed == 0:
             return "There is nothing changed!"
 
@@ -11,6 +11,9 @@ class DeletionQueue:
 
         self._deletion_queue.append((chat_id, message_id))
 
+    def is_empty(self) -> bool:
+        return self._deletion_queue is None
+
     def dequeue(self) -> (bool, (int, int)):
         if self._deletion_queue is None:
             return False, (0, 0)
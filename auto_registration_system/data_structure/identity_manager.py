@@ -6,11 +6,17 @@ class IdentityManager:
     def __init__(self, file_name_alias):
         self._file_name_alias = file_name_alias
         self._id_to_alias: dict[int, str] = IdentityManager._load(alias_file_name=self._file_name_alias)
+        self._lowercase_aliases: set[str] = {alias.lower() for alias in self._id_to_alias.values()}
 
     def set_alias(self, telegram_id: int, alias: str):
         self._id_to_alias[telegram_id] = alias
+        self._lowercase_aliases = {alias.lower() for alias in self._id_to_alias.values()}
         self._dump()
 
+    def is_member(self, name: str) -> bool:
+        """Return whether name is the alias of a user, in any case (the list is saved with names in title case)."""
+        return name.lower() in self._lowercase_aliases
+
     @staticmethod
     def _load(alias_file_name: str) -> dict[int, str]:
         try:
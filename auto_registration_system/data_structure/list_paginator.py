@@ -0,0 +1,92 @@
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.term import Term
+
+
+class ListPaginator:
+    """Splits the list into pages no longer than max_page_length, on date/venue and slot boundaries.
+
+    A date/venue continued on the next page has its line repeated there. Only a slot longer than a page is split,
+    on line boundaries. The pages of the last paginated data are kept until the data changes."""
+
+    def __init__(self, max_page_length: int):
+        self._max_page_length: int = max_page_length
+        self._data: RegistrationData | None = None
+        self._key: tuple | None = None
+        self._pages: list[str] = []
+
+    @property
+    def max_page_length(self) -> int:
+        return self._max_page_length
+
+    def paginate(self, data: RegistrationData | None, is_compact: bool = False) -> list[str]:
+        if data is None:
+            return []
+        key = (data.revision, is_compact)
+        if data is not self._data or key != self._key:
+            self._pages = ListPaginator.split_into_pages(
+                blocks=ListPaginator.make_blocks(data=data, is_compact=is_compact),
+                max_page_length=self._max_page_length
+            )
+            self._data = data
+            self._key = key
+        return self._pages
+
+    @staticmethod
+    def make_blocks(data: RegistrationData, is_compact: bool) -> list[(str, list[str])]:
+        """Return (line of date/venue, texts of its slots) for every date/venue."""
+        return [
+            (
+                f"{Term.DATE_VENUE} {date_venue_name}\n",
+                [slot.to_string(slot_label=slot_label, is_compact=is_compact)
+                 for slot_label, slot in date_venue_data.items()]
+            )
+            for date_venue_name, date_venue_data in data.bookings_by_date_venue.items()
+        ]
+
+    @staticmethod
+    def split_into_pages(blocks: list[(str, list[str])], max_page_length: int) -> list[str]:
+        pages: list[str] = []
+        page = ""
+        for date_venue_line, slot_texts in blocks:
+            is_date_venue_on_page = False
+            pieces: list[str] = [
+                piece
+                for slot_text in slot_texts
+                for piece in ListPaginator.split_text(
+                    text=slot_text,
+                    max_length=max_page_length - len(date_venue_line)
+                )
+            ]
+            for piece in pieces if len(pieces) > 0 else [""]:
+                addition = piece if is_date_venue_on_page else date_venue_line + piece
+                if len(page) > 0 and len(page) + len(addition) > max_page_length:
+                    pages.append(page)
+                    addition = date_venue_line + piece
+                    page = ""
+                page += addition
+                is_date_venue_on_page = True
+        if len(page) > 0:
+            pages.append(page)
+        return pages
+
+    @staticmethod
+    def split_text(text: str, max_length: int) -> list[str]:
+        """Split text into pieces no longer than max_length on line boundaries (lines are only cut if longer)."""
+        if len(text) <= max_length:
+            return [text]
+        pieces: list[str] = []
+        piece = ""
+        for line in text.splitlines(keepends=True):
+            while len(line) > max_length:
+                if len(piece) > 0:
+                    pieces.append(piece)
+                    piece = ""
+                pieces.append(line[:max_length])
+                line = line[max_length:]
+            if len(piece) + len(line) > max_length:
+                pieces.append(piece)
+                piece = ""
+            piece += line
+        if len(piece) > 0:
+            pieces.append(piece)
+        return pieces
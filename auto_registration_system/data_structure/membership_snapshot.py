@@ -0,0 +1,64 @@
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.term import Term
+
+
+class MembershipSnapshot:
+    """Players and reservations of every slot, taken before a command so that what it changed can be described
+    in a few lines instead of showing the entire list again."""
+
+    # places of a name in a slot
+    MAIN = 0
+    PENDING = 1
+    NON_PENDING = 2
+
+    def __init__(self, data: RegistrationData | None):
+        self._data: RegistrationData | None = data
+        self._slot_set_revision: int | None = data.slot_set_revision if data is not None else None
+        self._slots: dict[str, (tuple[str, ...], tuple[str, ...], tuple[str, ...])] = {
+            slot_label: (tuple(slot.players), tuple(slot.pending_reservations), tuple(slot.non_pending_reservations))
+            for slot_label, slot in data.collect_all_slots_with_labels()
+        } if data is not None else {}
+
+    @staticmethod
+    def locate(members: (tuple[str, ...], tuple[str, ...], tuple[str, ...])) -> dict[str, (int, int)]:
+        """Return name -> (place, position counted from 1) for the members of a slot."""
+        res: dict[str, (int, int)] = dict()
+        for place, names in enumerate(members):
+            for i, name in enumerate(names):
+                res[name] = (place, i + 1)
+        return res
+
+    @staticmethod
+    def describe_place(slot_label: str, place: int, position: int) -> str:
+        if place == MembershipSnapshot.MAIN:
+            return f"slot {slot_label} #{position}"
+        if place == MembershipSnapshot.PENDING:
+            return f"slot {slot_label} {Term.RESERVATION} {Term.PENDING}"
+        return f"slot {slot_label} {Term.RESERVATION}"
+
+    def describe_changes(self, data: RegistrationData | None) -> list[str] | None:
+        """Return one line per name that joined, left or changed place in a slot since the snapshot, or None if
+        slots were added or removed (e.g. a new list), which cannot be described in short."""
+        if data is not self._data or data is None or data.slot_set_revision != self._slot_set_revision:
+            return None
+        res: list[str] = []
+        for slot_label, slot in data.collect_all_slots_with_labels():
+            old_members = self._slots[slot_label]
+            new_members = (slot.players, slot.pending_reservations, slot.non_pending_reservations)
+            if all(old == tuple(new) for old, new in zip(old_members, new_members)):
+                continue
+            old_places = MembershipSnapshot.locate(members=old_members)
+            new_places = MembershipSnapshot.locate(members=new_members)
+            for name in old_places:
+                if name not in new_places:
+                    res.append(f"{name} ✗ slot {slot_label}")
+            for name, (place, position) in new_places.items():
+                old_place = old_places.get(name)
+                if old_place is None:
+                    res.append(f"{name} → {MembershipSnapshot.describe_place(slot_label, place, position)}")
+                elif old_place[0] != place:
+                    if place == MembershipSnapshot.MAIN:
+                        res.append(f"{name} promoted from {Term.RESERVATION} to slot {slot_label} #{position}")
+                    else:
+                        res.append(f"{name} moved to {MembershipSnapshot.describe_place(slot_label, place, position)}")
+        return res
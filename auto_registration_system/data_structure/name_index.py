@@ -0,0 +1,79 @@
+import heapq
+import itertools
+from collections import Counter
+
+
+class NameIndex:
+    """Index of the names in the slots by their trigrams, for finding the names close to a misspelled one.
+
+    The index is updated whenever a name enters or leaves a slot, so queries never scan the slots. The slots of a
+    name are kept with their positions in the list, so they are returned in the order of the list."""
+    MIN_SIMILARITY = 0.4
+    MAX_NUM_SUGGESTIONS = 3
+
+    def __init__(self):
+        self._slot_labels_by_name: dict[str, dict[str, tuple]] = dict()  # name -> slot label -> position of slot
+        self._names_by_trigram: dict[str, set[str]] = dict()
+        self._trigrams_by_name: dict[str, frozenset[str]] = dict()
+
+    @staticmethod
+    def make_trigrams(name: str) -> frozenset[str]:
+        padded = f"  {name.lower()} "
+        return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    def clear(self):
+        self._slot_labels_by_name.clear()
+        self._names_by_trigram.clear()
+        self._trigrams_by_name.clear()
+
+    def add(self, name: str, slot_label: str, slot_position: tuple):
+        """Record that name is in the slot (nothing changes if it was already), slot_position ordering the slots."""
+        slot_labels = self._slot_labels_by_name.get(name)
+        if slot_labels is None:
+            slot_labels = self._slot_labels_by_name[name] = dict()
+            trigrams = NameIndex.make_trigrams(name=name)
+            self._trigrams_by_name[name] = trigrams
+            for trigram in trigrams:
+                self._names_by_trigram.setdefault(trigram, set()).add(name)
+        slot_labels[slot_label] = slot_position
+
+    def remove(self, name: str, slot_label: str):
+        """Record that name has left the slot, dropping the name once it is in no slot."""
+        slot_labels = self._slot_labels_by_name.get(name)
+        if slot_labels is None or slot_labels.pop(slot_label, None) is None or len(slot_labels) > 0:
+            return
+        del self._slot_labels_by_name[name]
+        for trigram in self._trigrams_by_name.pop(name):
+            names = self._names_by_trigram[trigram]
+            names.discard(name)
+            if len(names) == 0:
+                del self._names_by_trigram[trigram]
+
+    def get_slot_labels(self, name: str) -> list[str]:
+        """Return the labels of the slots having name, in the order of the list."""
+        slot_labels = self._slot_labels_by_name.get(name)
+        if slot_labels is None:
+            return []
+        return sorted(slot_labels, key=slot_labels.__getitem__)
+
+    def is_in_slot(self, name: str, slot_label: str) -> bool:
+        return slot_label in self._slot_labels_by_name.get(name, ())
+
+    def find_similar_names(self, query: str, k: int | None) -> list[(str, float)]:
+        """Return at most k (all if k is None) (name, similarity) of the most similar names, the most similar
+        first."""
+        query_trigrams = NameIndex.make_trigrams(name=query)
+        num_shared_trigrams = Counter(itertools.chain.from_iterable(
+            self._names_by_trigram.get(trigram, ()) for trigram in query_trigrams
+        ))
+        # Dice coefficient of the two sets of trigrams
+        num_query_trigrams = len(query_trigrams)
+        trigrams_by_name = self._trigrams_by_name
+        candidates: list[(float, str)] = [
+            (similarity, name)
+            for name, num_shared in num_shared_trigrams.items()
+            if (similarity := 2 * num_shared / (num_query_trigrams + len(trigrams_by_name[name])))
+            >= NameIndex.MIN_SIMILARITY
+        ]
+        best = sorted(candidates, reverse=True) if k is None else heapq.nlargest(k, candidates)
+        return [(name, similarity) for similarity, name in best]
@@ -1,20 +1,96 @@
+import functools
+import weakref
 from typing import Optional
 
 from ..exception.error_maker import ErrorMaker
+from .name_index import NameIndex
 from .slot_manager import SlotManager
+from .waitlist import Waitlist
 from auto_registration_system.model import SlotDetail
 
 
 class RegistrationData:
+    _instances: "weakref.WeakSet[RegistrationData]" = weakref.WeakSet()  # live data, counted by the memory monitor
+
     def __init__(self):
         self._bookings_by_date_venue: dict[str, dict[str, SlotManager]] = dict()
+        # revisions let caches built from this data know when they are stale
+        self._slot_set_revision: int = 0
+        self._member_revisions: dict[str, int] = dict()
+        self._last_member_revision: int = 0
+        self._name_index: NameIndex = NameIndex()
+        RegistrationData._instances.add(self)
+
+    @staticmethod
+    def count_instances() -> int:
+        return len(RegistrationData._instances)
 
     @property
     def bookings_by_date_venue(self):
         return self._bookings_by_date_venue
 
+    @property
+    def slot_set_revision(self) -> int:
+        """Revision of the set of dates/venues and slots, changed whenever one is inserted or removed."""
+        return self._slot_set_revision
+
+    @property
+    def revision(self) -> tuple[int, int]:
+        """Revision of the whole data, changed whenever a slot is inserted, a name is inserted or removed, or the data
+        is marked as changed."""
+        return self._slot_set_revision, self._last_member_revision
+
+    def get_member_revision(self, name: str) -> int:
+        """Revision of the slots involving name, changed whenever name is inserted into or removed from a slot."""
+        return self._member_revisions.get(name, 0)
+
+    def mark_member_changed(self, name: str):
+        self._last_member_revision += 1
+        self._member_revisions[name] = self._last_member_revision
+
+    def mark_changed(self):
+        """Mark a change not inserting or removing names, e.g. reservations made pending or promoted."""
+        self._last_member_revision += 1
+
     def reset(self):
         self._bookings_by_date_venue = dict()
+        self._slot_set_revision += 1
+        self._name_index.clear()
+
+    def _update_name_index(self, slot_label: str, slot_position: tuple[int, int], name: str, is_in_slot: bool):
+        if is_in_slot:
+            self._name_index.add(name=name, slot_label=slot_label, slot_position=slot_position)
+        else:
+            self._name_index.remove(name=name, slot_label=slot_label)
+
+    def _make_slot(self, date_venue: str, slot_label: str, **kwargs) -> SlotManager:
+        """Return a new slot to be inserted last into date_venue, keeping the name index updated."""
+        # position of the slot in the list, which stays valid as slots are only inserted last into a date/venue
+        slot_position = (list(self._bookings_by_date_venue).index(date_venue),
+                         len(self._bookings_by_date_venue[date_venue]))
+        return SlotManager(
+            on_member_changed=functools.partial(self._update_name_index, slot_label, slot_position),
+            **kwargs
+        )
+
+    def get_slot_labels_of_name(self, name: str) -> list[str]:
+        """Return the labels of the slots having name as a player or reserve, in the order of the list."""
+        return self._name_index.get_slot_labels(name=name)
+
+    def find_similar_names(self, query: str, k: int = NameIndex.MAX_NUM_SUGGESTIONS, slot_label: str | None = None) \
+            -> list[(str, list[str])]:
+        """Return at most k (name, labels of its slots) of the names closest to query, the closest first,
+        only among the names in slot_label if given."""
+        if slot_label is None:
+            return [
+                (name, self.get_slot_labels_of_name(name=name))
+                for name, _ in self._name_index.find_similar_names(query=query, k=k)
+            ]
+        return [
+            (name, [slot_label])
+            for name, _ in self._name_index.find_similar_names(query=query, k=None)
+            if self._name_index.is_in_slot(name=name, slot_label=slot_label)
+        ][:k]
 
     def insert_slot_detail(self, slot_detail: SlotDetail):
         """Insert a slot detail into the registration data structure.
@@ -32,24 +108,26 @@ class RegistrationData:
         if slot_label in self._bookings_by_date_venue[date_venue]:
             raise ErrorMaker.make_slot_conflict_exception(message=slot_label)
 
-        self._bookings_by_date_venue[date_venue][slot_label] = SlotManager(
-            slot_name=slot_label, num_players=num_players, owner=owner
+        self._bookings_by_date_venue[date_venue][slot_label] = self._make_slot(
+            date_venue=date_venue, slot_label=slot_label, slot_name=slot_label, num_players=num_players, owner=owner
         )
-
+        self._slot_set_revision += 1
 
     def insert_date_venue(self, date_venue: str):
         if date_venue in self._bookings_by_date_venue:
             raise ErrorMaker.make_dv_conflict_exception(message=date_venue)
         self._bookings_by_date_venue[date_venue]: dict = {}
+        self._slot_set_revision += 1
 
     def insert_slot(self, date_venue: str, slot_label: str, slot_name: str, num_players: int):
         if date_venue not in self._bookings_by_date_venue:
             raise ErrorMaker.make_dv_not_found_exception(message=date_venue)
         if slot_label in self._bookings_by_date_venue[date_venue]:
             raise ErrorMaker.make_slot_conflict_exception(message=slot_label)
-        self._bookings_by_date_venue[date_venue][slot_label]: SlotManager = SlotManager(
-            slot_name=slot_name, num_players=num_players
+        self._bookings_by_date_venue[date_venue][slot_label]: SlotManager = self._make_slot(
+            date_venue=date_venue, slot_label=slot_label, slot_name=slot_name, num_players=num_players
         )
+        self._slot_set_revision += 1
 
     def get_slot(self, slot_label) -> Optional[SlotManager]:
         """Return the slot with the given label, or None if not found."""
@@ -58,13 +136,14 @@ class RegistrationData:
                 return self._bookings_by_date_venue[date_venue][slot_label]
         return None
 
-    def register_player(self, slot_label: str, player: str):
+    def register_player(self, slot_label: str, player: str, priority: int = Waitlist.PRIORITY_DEFAULT):
         """Register a player to the slot with the given label.
-        If the slot is already full, player will be added to the reserve list.
+        If the slot is already full, player will be added to the reserve list in the given priority class.
         If the slot is not found, raise an exception."""
         slot = self.get_slot(slot_label=slot_label)
         if slot is not None:
-            slot.register(proposed_name=player)
+            slot.register(proposed_name=player, priority=priority)
+            self.mark_member_changed(name=player)
             return
         raise ErrorMaker.make_slot_not_found_exception(message=slot_label)
 
@@ -72,6 +151,7 @@ class RegistrationData:
         slot = self.get_slot(slot_label=slot_label)
         if slot is not None:
             slot.reserve(proposed_name=player)
+            self.mark_member_changed(name=player)
             return
         raise ErrorMaker.make_slot_not_found_exception(message=slot_label)
 
@@ -86,6 +166,7 @@ class RegistrationData:
         for date_venue in self._bookings_by_date_venue:
             for slot_label in self._bookings_by_date_venue[date_venue]:
                 self._bookings_by_date_venue[date_venue][slot_label].restructure()
+        self.mark_changed()
 
     #FIXME: unused
     def collect_slot_labels_involving_user(self, id_string: str) -> list[str]:
@@ -37,6 +37,10 @@ class ReleaseTimeManager:
             return True
         return False
 
+    def compute_delay_in_milliseconds(self, time_manager: TimeManager) -> float:
+        """Return how long after release time now is (negative if release time is still ahead)."""
+        return (time_manager.now() - self._release_time).total_seconds() * 1000
+
     def release_time_to_str(self, time_manager: TimeManager) -> str or None:
         return time_manager.datetime_to_str(datetime_val=self.release_time)
 
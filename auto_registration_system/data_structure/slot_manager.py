@@ -1,5 +1,8 @@
+import weakref
+from collections.abc import Callable
 from typing import Optional
 
+from auto_registration_system.data_structure.waitlist import Waitlist
 from auto_registration_system.term import Term
 from auto_registration_system.exception.error_maker import ErrorMaker
 from auto_registration_system.exception.exceptions import ActionNotAllowedException
@@ -7,17 +10,28 @@ from auto_registration_system.model import User
 
 
 class SlotManager:
+    """Players and reservations of a slot. If on_member_changed is given, it is called with (name, whether name is
+    now in the slot) whenever a name enters or leaves the slot by register, reserve or deregister; moving between
+    the lists, e.g. promoting a pending reservation, does not call it."""
+    _instances: "weakref.WeakSet[SlotManager]" = weakref.WeakSet()  # live slots, counted by the memory monitor
 
     def __init__(self, slot_name: str, num_players: int,
-                 extra_cost: Optional[int] = None, owner: Optional[str] = None):
+                 extra_cost: Optional[int] = None, owner: Optional[str] = None,
+                 on_member_changed: Callable[[str, bool], None] | None = None):
         self._slot_name: str = slot_name
         self._num_players: int = num_players
         self._players: list[str] = []
-        self._pending_reservations: list[str] = []
+        self._waitlist: Waitlist = Waitlist()  # pending reservations, promoted when positions are free
         self._non_pending_reservations: list[str] = []
         self._extra_cost: Optional[int] = extra_cost
         self._owner: Optional[str] = owner
         self._confirmed_payments: set[str] = set()
+        self._on_member_changed: Callable[[str, bool], None] | None = on_member_changed
+        SlotManager._instances.add(self)
+
+    @staticmethod
+    def count_instances() -> int:
+        return len(SlotManager._instances)
 
     @property
     def slot_name(self) -> str:
@@ -39,13 +53,21 @@ class SlotManager:
     def players(self, new_players: list[str]):
         self._players = new_players
 
+    @property
+    def waitlist(self) -> Waitlist:
+        return self._waitlist
+
     @property
     def pending_reservations(self) -> list[str]:
-        return self._pending_reservations
+        """Return the names of pending reservations in the order of promotion."""
+        return self._waitlist.names
 
     @pending_reservations.setter
-    def pending_reservations(self, pending_reservation: list[str]):
-        self._pending_reservations = pending_reservation
+    def pending_reservations(self, pending_reservations: list[str]):
+        """Replace the waitlist by names in the order of promotion, all in the default priority class."""
+        self._waitlist = Waitlist()
+        for name in pending_reservations:
+            self._waitlist.push(name=name)
 
     @property
     def non_pending_reservations(self) -> list[str]:
@@ -55,16 +77,11 @@ class SlotManager:
     def non_pending_reservations(self, non_pending_reservation: list[str]):
         self._non_pending_reservations = non_pending_reservation
 
-    def _pop_first_pending_player(self) -> str or None:
-        if self._pending_reservations:
-            return self._pending_reservations.pop(0)
-        return None
-
     # sorting the lists, pending players will be moved to main players if possible,
     # and pending players are placed before non-pending players
     def restructure(self):
         while len(self._players) < self._num_players:
-            player = self._pop_first_pending_player()
+            player = self._waitlist.pop()
             if player is None:
                 break
             self._players.append(player)
@@ -72,7 +89,7 @@ class SlotManager:
     def is_in_any_list(self, proposed_name: str) -> bool:
         return (
                 (proposed_name in self._players)
-                or (proposed_name in self._pending_reservations)
+                or (proposed_name in self._waitlist)
                 or (proposed_name in self._non_pending_reservations)
         )
 
@@ -86,13 +103,7 @@ class SlotManager:
         return found
 
     def _remove_player_from_pending_reservations(self, proposed_name: str) -> bool:
-        found = False
-        try:
-            self._pending_reservations.remove(proposed_name)
-            found = True
-        except ValueError:
-            pass
-        return found
+        return self._waitlist.remove(name=proposed_name)
 
     def _remove_player_from_players(self, proposed_name: str) -> bool:
         found = False
@@ -103,12 +114,12 @@ class SlotManager:
             pass
         return found
 
-    def register(self, proposed_name: str):
-        """Adding a user to this"""
+    def register(self, proposed_name: str, priority: int = Waitlist.PRIORITY_DEFAULT):
+        """Adding a user to this, or to the waitlist in the given priority class if the slot is full"""
         # Potentially moving from reservations to main players
         is_successful_popping_player = self._remove_player_from_non_pending_reservations(proposed_name=proposed_name)
         if is_successful_popping_player:
-            self.register(proposed_name=proposed_name)
+            self.register(proposed_name=proposed_name, priority=priority)
             return
 
         # prioritize to append to main list. If not then append to pending reservations
@@ -118,7 +129,39 @@ class SlotManager:
         if len(self._players) < self._num_players:
             self._players.append(proposed_name)
         else:
-            self._pending_reservations.append(proposed_name)
+            self._waitlist.push(name=proposed_name, priority=priority)
+        self.restructure()
+        if self._on_member_changed is not None:
+            self._on_member_changed(proposed_name, True)
+
+    def get_player_at(self, position: int) -> str | None:
+        """Return the main player at position (counted from 1), or None if the position is empty or not valid."""
+        if 1 <= position <= len(self._players):
+            return self._players[position - 1]
+        return None
+
+    def deregister(self, names: set[str]):
+        """Remove names from the main players and reservations, then promote pending reservations to the freed
+        positions."""
+        removed_names = [name for name in names if self.is_in_any_list(proposed_name=name)]
+        self._players = [player for player in self._players if player not in names]
+        for name in names:
+            self._waitlist.remove(name=name)
+        self._non_pending_reservations = [
+            player for player in self._non_pending_reservations if player not in names
+        ]
+        self.restructure()
+        if self._on_member_changed is not None:
+            for name in removed_names:
+                self._on_member_changed(name, False)
+
+    def make_reservations_pending(self, get_priority: Callable[[str], int] | None = None):
+        """Move the non-pending reservations to the end of the waitlist (of their priority classes if get_priority
+        is given), then promote them if possible."""
+        for player in self._non_pending_reservations:
+            self._waitlist.push(name=player,
+                                priority=get_priority(player) if get_priority is not None else Waitlist.PRIORITY_DEFAULT)
+        self._non_pending_reservations = []
         self.restructure()
 
     def is_paid_user(self, user: str) -> bool:
@@ -177,15 +220,28 @@ class SlotManager:
         if proposed_name not in self._non_pending_reservations:
             self._non_pending_reservations.append(proposed_name)
         self.restructure()
+        if self._on_member_changed is not None:
+            self._on_member_changed(proposed_name, True)
 
-    def to_string(self, slot_label: str) -> str:
+    def to_string(self, slot_label: str, is_compact: bool = False) -> str:
+        """Return the slot as text. In compact layout, a run of empty positions is collapsed into one line."""
         res = f"[{slot_label}] {self._slot_name}, {Term.NUM_PLAYERS} {self._num_players}\n"
-        for i in range(self._num_players):
-            res += f"{Term.INDENT_SPACE}{i + 1}."
+        i = 0
+        while i < self._num_players:
             if i < len(self._players) and self._players[i] is not None:
-                res += f" {self._format_player(self._players[i])}"
-            res += "\n"
-        for player in self._pending_reservations:
+                res += f"{Term.INDENT_SPACE}{i + 1}. {self._format_player(self._players[i])}\n"
+                i += 1
+                continue
+            j = i + 1  # end of the run of empty positions starting at i
+            while j < self._num_players and (j >= len(self._players) or self._players[j] is None):
+                j += 1
+            if is_compact and j - i >= 2:
+                res += f"{Term.INDENT_SPACE}{i + 1}.-{j}. ({j - i} {Term.AVAILABLE})\n"
+            else:
+                for k in range(i, j):
+                    res += f"{Term.INDENT_SPACE}{k + 1}.\n"
+            i = j
+        for player in self._waitlist.names:
             res += f"{Term.INDENT_SPACE}{Term.RESERVATION}. {player}"
             res += f" {Term.PENDING}"
             res += "\n"
@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import time
+
+
+class WaitlistEntry:
+    """A name waiting for a position in a slot, with its priority class and the time it was enqueued."""
+    __slots__ = ("name", "priority", "enqueue_time", "sequence", "is_removed")
+
+    def __init__(self, name: str, priority: int, enqueue_time: float, sequence: int):
+        self.name: str = name
+        self.priority: int = priority  # smaller classes are promoted first
+        # time.time() when the name was enqueued, not saved with the list, so it restarts when the list is loaded
+        self.enqueue_time: float = enqueue_time
+        self.sequence: int = sequence  # order of enqueueing, breaking ties within a priority class
+        self.is_removed: bool = False  # removed entries stay in the heap until popped
+
+    def __lt__(self, other: "WaitlistEntry") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class Waitlist:
+    """Pending reservations of a slot, promoted by priority class, then first come, first served.
+
+    Entries are kept in a heap, so the next one is promoted in O(log n), and removed lazily. The order of the
+    names and their ranks are cached; promoting the first name or enqueueing behind the last one keeps the cache,
+    so positions are answered in O(1) unless a name is removed from the middle or enqueued ahead of others."""
+    PRIORITY_DEFAULT = 0
+    PRIORITY_GUEST = 1  # promoted after the default class, e.g. names without an alias
+
+    def __init__(self):
+        self._heap: list[WaitlistEntry] = []
+        self._entry_by_name: dict[str, WaitlistEntry] = dict()
+        self._sequence = itertools.count()
+        self._ordered_names: list[str] | None = None  # cache, names before self._num_promoted are gone
+        self._index_by_name: dict[str, int] = dict()  # cache, index of a name in self._ordered_names
+        self._num_promoted: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entry_by_name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entry_by_name
+
+    def get_entry(self, name: str) -> WaitlistEntry | None:
+        """Return the entry of name, None if name is not waiting."""
+        return self._entry_by_name.get(name)
+
+    def _invalidate(self):
+        self._ordered_names = None
+        self._index_by_name = dict()
+        self._num_promoted = 0
+
+    def _build_cache(self):
+        self._ordered_names = [entry.name for entry in sorted(self._entry_by_name.values())]
+        self._index_by_name = {name: i for i, name in enumerate(self._ordered_names)}
+        self._num_promoted = 0
+
+    @property
+    def names(self) -> list[str]:
+        """Return the names in the order of promotion."""
+        if self._ordered_names is None:
+            self._build_cache()
+        return self._ordered_names[self._num_promoted:]
+
+    def get_position(self, name: str) -> int | None:
+        """Return the position of name, 1 for the next to be promoted, or None if name is not waiting."""
+        if name not in self._entry_by_name:
+            return None
+        if self._ordered_names is None:
+            self._build_cache()
+        return self._index_by_name[name] - self._num_promoted + 1
+
+    def push(self, name: str, priority: int = PRIORITY_DEFAULT, enqueue_time: float | None = None) -> WaitlistEntry:
+        """Enqueue name behind the names of its priority class (again if it is already waiting)."""
+        self.remove(name=name)
+        entry = WaitlistEntry(
+            name=name,
+            priority=priority,
+            enqueue_time=enqueue_time if enqueue_time is not None else time.time(),
+            sequence=next(self._sequence)
+        )
+        if self._ordered_names is not None and len(self._entry_by_name) > 0 \
+                and entry < self._entry_by_name[self._ordered_names[-1]]:
+            self._invalidate()  # enqueued ahead of others, whose positions change
+        self._entry_by_name[name] = entry
+        heapq.heappush(self._heap, entry)
+        if self._ordered_names is not None:
+            self._index_by_name[name] = len(self._ordered_names)
+            self._ordered_names.append(name)
+        return entry
+
+    def pop(self) -> str | None:
+        """Remove and return the name to be promoted, or None if nobody is waiting."""
+        while len(self._heap) > 0:
+            entry = heapq.heappop(self._heap)
+            if not entry.is_removed:
+                self._forget(name=entry.name)
+                return entry.name
+        return None
+
+    def remove(self, name: str) -> bool:
+        """Remove name, returning whether it was waiting."""
+        entry = self._entry_by_name.get(name)
+        if entry is None:
+            return False
+        entry.is_removed = True
+        self._forget(name=name)
+        if len(self._heap) > 2 * len(self._entry_by_name) + 16:
+            self._heap = [entry for entry in self._heap if not entry.is_removed]
+            heapq.heapify(self._heap)
+        return True
+
+    def _forget(self, name: str):
+        del self._entry_by_name[name]
+        if self._ordered_names is None:
+            return
+        if self._index_by_name.pop(name) != self._num_promoted:
+            self._invalidate()  # removed from the middle, positions behind it change
+            return
+        self._num_promoted += 1
+        if self._num_promoted > len(self._entry_by_name):
+            self._invalidate()  # drop promoted names rather than keeping them in the cache
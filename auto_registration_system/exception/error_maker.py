@@ -1,3 +1,4 @@
+from auto_registration_system.exception.exception_list_errors import ListErrorsException
 from auto_registration_system.exception.exception_name_conflict import NameConflictException
 from auto_registration_system.exception.exception_syntax_error import SyntaxErrorException
 
@@ -71,3 +72,7 @@ class ErrorMaker:
     @staticmethod
     def make_num_players_exceeding_maximum_allowed_exception(message: str, max_num_players: int) -> Exception:
         return Exception(f"At line '{message}', number of players exceeds {max_num_players}.")
+
+    @staticmethod
+    def make_list_errors_exception(errors: list[(int, str)]) -> ListErrorsException:
+        return ListErrorsException(errors=errors)
@@ -0,0 +1,36 @@
+class ListErrorsException(Exception):
+    MAX_ERROR_LENGTH = 120  # characters of each error, which usually quotes the whole offending line
+    MAX_LENGTH = 3500  # characters of the report, leaving room in a message (4096 characters at most)
+
+    def __init__(self, errors: list[(int, str)]):
+        self._errors: list[(int, str)] = errors
+
+    @property
+    def errors(self) -> list[(int, str)]:
+        return self._errors
+
+    @staticmethod
+    def format_error(e: Exception) -> str:
+        """Return the message of e, with its type only if it is not raised by this package (e.g. ValueError)."""
+        if type(e).__repr__ is not BaseException.__repr__:
+            return repr(e)
+        if type(e) is Exception:
+            return str(e)
+        return f"{type(e).__name__}: {e}"
+
+    @staticmethod
+    def shorten(text: str, max_length: int) -> str:
+        text = " ".join(text.split())  # errors quoting a line may contain line breaks
+        if len(text) <= max_length:
+            return text
+        return text[:max_length - 3] + "..."
+
+    def __repr__(self) -> str:
+        res = f"Found {len(self._errors)} error(s), nothing has been changed!"
+        max_length = ListErrorsException.MAX_LENGTH - len(f"\n... and {len(self._errors)} more errors")
+        for index, (line_number, error) in enumerate(self._errors):
+            line = f"\nLine {line_number}: {ListErrorsException.shorten(error, ListErrorsException.MAX_ERROR_LENGTH)}"
+            if len(res) + len(line) > max_length:  # leaving room for the line telling how many are left out
+                return res + f"\n... and {len(self._errors) - index} more errors"
+            res += line
+        return res
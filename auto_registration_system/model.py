@@ -33,3 +33,14 @@ class Player:
         self.is_paid = is_paid
         self.is_pending = is_pending
         self.is_reserve = is_reserve
+
+
+class Mention:
+    """Represent a user mentioned in a message, e.g. @alice, or a name linked to a user without username"""
+    def __init__(self, offset: int, length: int, text: str, user_id: Optional[int] = None,
+                 user_full_name: Optional[str] = None):
+        self.offset = offset  # position in the message
+        self.length = length
+        self.text = text
+        self.user_id = user_id  # known only for a linked name
+        self.user_full_name = user_full_name
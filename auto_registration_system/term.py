@@ -10,6 +10,7 @@ class Term:
     PENDING = "(pending)"
     PAYMENT_PAID = "(paid)"
     PAYMENT_PENDING = "(pending payment)"
+    AVAILABLE = "available"
     INDENT_SPACE = "   "
     HELP_TEXT = f"""
     Please use the following syntaxes:
@@ -27,6 +28,8 @@ class Term:
         /{Command.COMMAND_AKA} [your new alias]
     7. To view your alias, use
         /{Command.COMMAND_AKA}
+    8. To see your position in the slots and in the reserve lists, use
+        /{Command.COMMAND_POS}
         
     See detailed guide from the below link. 
     https://hackmd.io/@1UKfawZER96uwy_xohcquQ/B1fyW-c4R
@@ -0,0 +1,75 @@
+"""Benchmark the time to import the core package and main.py, measured with python -X importtime.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --verbose
+
+Every import runs in a fresh interpreter, so nothing is cached in sys.modules. The core package is expected to import
+without python-telegram-bot, so that it starts fast for tools, benchmarks and headless use.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DIRECTORY_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULE_CORE = "auto_registration_system.auto_registration_system"
+MODULE_MAIN = "main"
+REPEAT = 3
+
+
+def import_module(module: str) -> dict[str, int]:
+    """Import the module in a fresh interpreter and return the cumulative microseconds of every module imported."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=DIRECTORY_REPO,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stderr
+    cumulative_us: dict[str, int] = dict()
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            cumulative_us[name.strip()] = int(cumulative)
+    return cumulative_us
+
+
+def measure(module: str) -> tuple[int, dict[str, int]]:
+    """Return the best microseconds of importing the module, and the modules imported in that run."""
+    runs = [import_module(module=module) for _ in range(REPEAT)]
+    best = min(runs, key=lambda cumulative_us: cumulative_us[module])
+    return best[module], best
+
+
+def run() -> dict:
+    """Return microseconds of importing the core package and main.py, and whether the core imports telegram."""
+    core_us, core_modules = measure(module=MODULE_CORE)
+    main_us, _ = measure(module=MODULE_MAIN)
+    return {
+        "core_import_us": core_us,
+        "main_import_us": main_us,
+        "core_imports_telegram": int(any(name.split(".")[0] == "telegram" for name in core_modules)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="also list the slowest modules imported by each")
+    args = parser.parse_args()
+    for name, value in run().items():
+        print(f"{name:<24} {value:10.1f}")
+    if args.verbose:
+        for module in (MODULE_CORE, MODULE_MAIN):
+            _, cumulative_us = measure(module=module)
+            print(f"\nSlowest imports of {module}:")
+            for name, value in sorted(cumulative_us.items(), key=lambda item: -item[1])[:15]:
+                print(f"{name:<56} {value:10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark commands and buttons handled end to end by CommandApi in an in-memory chat, without network.
+
+Usage:
+    python benchmarks/bench_in_memory_chat.py
+    python benchmarks/bench_in_memory_chat.py --num-users 2000 --num-slots 20
+
+Every user registers once, half of them by /rg and half by the button of a slot, like at release time. Each update
+includes rendering the list and writing all data to files (in a temporary directory), as the bot does.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_registration_system.command import Command  # noqa: E402
+from auto_registration_system.data_structure.time_manager import TimeManager  # noqa: E402
+from chat_api.callback_data import CallbackData  # noqa: E402
+from chat_api.command_api import CommandApi  # noqa: E402
+from chat_api.in_memory_chat import InMemoryChat  # noqa: E402
+from chat_api.model import Sender  # noqa: E402
+from chat_api.tenant import Tenant  # noqa: E402
+from config import Config  # noqa: E402
+from metrics import Metrics  # noqa: E402
+
+CHAT_ID = -1000000000001
+ADMIN = Sender(id=1, full_name="Admin", username="admin")
+REPEAT = 3
+
+
+def make_new_list(num_slots: int, num_players: int) -> str:
+    lines = [f"/{Command.COMMAND_NEW} [dv] Benchmark day, Benchmark venue"]
+    for i in range(num_slots):
+        lines.append(f"[s{i}] {i % 12 + 1}:00-{i % 12 + 3}:00 pm, #players: {num_players}")
+    return "\n".join(lines)
+
+
+async def register_all(num_users: int, num_slots: int, num_players: int) -> float:
+    """Return seconds taken by num_users registrations, in a new chat with an empty list."""
+    time_manager = TimeManager(
+        time_zone=Config.time_zone,
+        input_time_format=Config.input_time_format,
+        output_time_format=Config.output_time_format
+    )
+    chat = InMemoryChat(api=CommandApi(
+        time_manager=time_manager,
+        tracer=Tenant.make_data_handler(chat_id=CHAT_ID).load_tracer(time_manager=time_manager),
+        metrics=Metrics()
+    ))
+    await chat.send(chat_id=CHAT_ID, sender=ADMIN, text=make_new_list(num_slots=num_slots, num_players=num_players))
+    tenant = chat.api.get_tenant(chat_id=CHAT_ID)
+    start_time = time.perf_counter()
+    for user_index in range(num_users):
+        sender = Sender(id=100 + user_index, full_name=f"Bench User{user_index}", username=f"bench_{user_index}")
+        slot_label = f"s{user_index % num_slots}"
+        if user_index % 2 == 0:
+            await chat.send(chat_id=CHAT_ID, sender=sender,
+                            text=f"/{Command.COMMAND_RG} {sender.full_name} {slot_label}")
+        else:
+            await chat.press(chat_id=CHAT_ID, message_id=tenant.list_message_ids[-1], sender=sender,
+                             callback_data=CallbackData.encode(Command.CALLBACK_CODE_RG, slot_label))
+        await chat.delete_queued_messages()
+    return time.perf_counter() - start_time
+
+
+def run(num_users: int = 400, num_slots: int = 10, num_players: int = 20) -> dict:
+    """Return microseconds per update handled (command or button) and updates handled per second."""
+    saved = (Config.directory_data, Config.allowed_chat_ids, Config.default_chat_id, Config.admins)
+    try:
+        best_seconds = None
+        for _ in range(REPEAT):
+            with tempfile.TemporaryDirectory() as directory_data:
+                Config.directory_data = directory_data
+                Config.allowed_chat_ids = {CHAT_ID}
+                Config.default_chat_id = CHAT_ID
+                Config.admins = {ADMIN.username}
+                seconds = asyncio.run(register_all(num_users=num_users, num_slots=num_slots,
+                                                   num_players=num_players))
+            best_seconds = seconds if best_seconds is None else min(best_seconds, seconds)
+    finally:
+        Config.directory_data, Config.allowed_chat_ids, Config.default_chat_id, Config.admins = saved
+    return {
+        "num_users": num_users,
+        "update_us": best_seconds / num_users * 1e6,
+        "updates_per_second": num_users / best_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-users", type=int, default=400)
+    parser.add_argument("--num-slots", type=int, default=10)
+    parser.add_argument("--num-players", type=int, default=20)
+    args = parser.parse_args()
+    for name, value in run(num_users=args.num_users, num_slots=args.num_slots, num_players=args.num_players).items():
+        print(f"{name:<24} {value:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
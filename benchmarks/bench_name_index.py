@@ -0,0 +1,75 @@
+"""Benchmark finding names close to a misspelled one in a large list, e.g. for /drg suggestions.
+
+Usage:
+    python benchmarks/bench_name_index.py
+    python benchmarks/bench_name_index.py --num-names 3000 --number 1000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_registration_system.data_structure.registration_data import RegistrationData  # noqa: E402
+from auto_registration_system.model import SlotDetail  # noqa: E402
+
+NUM_PLAYERS_PER_SLOT = 50
+REPEAT = 3
+FAMILY_NAMES = ["Nguyen", "Tran", "Le", "Pham", "Hoang", "Phan", "Vu", "Dang", "Bui", "Do", "Smith", "Tan"]
+GIVEN_NAMES = ["Minh", "Anh", "Dung", "Hung", "Linh", "Trang", "Cuong", "Phong", "Uy", "James", "Alice", "Wei",
+               "Tuan", "Trinh", "Khai", "Huong", "Long", "Nam", "Hai", "Bao"]
+
+
+def make_name(i: int) -> str:
+    """Names like those in the lists, some of them only told apart by a number."""
+    name = f"{GIVEN_NAMES[i % len(GIVEN_NAMES)]} {FAMILY_NAMES[i // len(GIVEN_NAMES) % len(FAMILY_NAMES)]}"
+    return name if i < len(GIVEN_NAMES) * len(FAMILY_NAMES) else f"{name}{i}"
+
+
+def make_data(num_names: int) -> RegistrationData:
+    data = RegistrationData()
+    for i in range(num_names):
+        slot_label = f"s{i // NUM_PLAYERS_PER_SLOT}"
+        if i % NUM_PLAYERS_PER_SLOT == 0:
+            data.insert_slot_detail(SlotDetail(slot_label=slot_label, date_venue=f"Day {i // 500}", time="",
+                                               court="", num_players=NUM_PLAYERS_PER_SLOT))
+        data.register_player(slot_label=slot_label, player=make_name(i=i))
+    return data
+
+
+def run(num_names: int = 1000, number: int = 1000) -> dict:
+    """Return microseconds of the first query, per query, and per query after a name leaves and enters a slot."""
+    data = make_data(num_names=num_names)
+    first_seconds = timeit.timeit(lambda: data.find_similar_names(query="Phog Nguyen"), number=1)
+    query_seconds = min(timeit.repeat(lambda: data.find_similar_names(query="Phog Nguyen"), number=number,
+                                      repeat=REPEAT))
+
+    name = make_name(i=3)
+    slot = data.get_slot(slot_label="s0")
+
+    def change_and_query():
+        slot.deregister(names={name})
+        data.register_player(slot_label="s0", player=name)
+        data.find_similar_names(query="Phog Nguyen")
+
+    change_seconds = min(timeit.repeat(change_and_query, number=number, repeat=REPEAT))
+    return {
+        "num_names": num_names,
+        "first_query_us": first_seconds * 1e6,
+        "query_us": query_seconds / number * 1e6,
+        "query_after_change_us": change_seconds / number * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-names", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=1000)
+    args = parser.parse_args()
+    for name, value in run(num_names=args.num_names, number=args.number).items():
+        print(f"{name:<24} {value:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
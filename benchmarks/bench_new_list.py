@@ -0,0 +1,71 @@
+"""Benchmark parsing a long list with /new, the path also taken when the list is restored at startup.
+
+Usage:
+    python benchmarks/bench_new_list.py
+    python benchmarks/bench_new_list.py --num-lines 10000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_registration_system.command_handler.handler_new import NewHandler  # noqa: E402
+from auto_registration_system.data_structure.registration_data import RegistrationData  # noqa: E402
+from auto_registration_system.model import User  # noqa: E402
+
+NUM_PLAYERS_PER_SLOT = 20
+NUM_SLOTS_PER_DATE_VENUE = 4
+
+
+def make_list(num_lines: int) -> str:
+    """Make a /new message of about num_lines lines, with players, empty positions, payments and reserves."""
+    lines: list[str] = ["/new"]
+    slot_index = 0
+    while len(lines) < num_lines:
+        if slot_index % NUM_SLOTS_PER_DATE_VENUE == 0:
+            lines.append(f"[dv] 🏸{slot_index // NUM_SLOTS_PER_DATE_VENUE} SUN Queenstown cc")
+        lines.append(f"[s{slot_index}] ❤️1:00-3:00 pm (1), #players: {NUM_PLAYERS_PER_SLOT}, owner: @owner{slot_index}")
+        for i in range(NUM_PLAYERS_PER_SLOT):
+            if i % 5 == 4:
+                lines.append(f"   {i + 1}.")
+            elif i % 5 == 3:
+                lines.append(f"   {i + 1}. Player {slot_index} {i} (paid)")
+            else:
+                lines.append(f"   {i + 1}. Player {slot_index} {i}")
+        lines.append(f"   reserve. Reserve {slot_index} (pending)")
+        lines.append(f"   reserve. Reserve {slot_index}")
+        slot_index += 1
+    return "\n".join(lines[:num_lines])
+
+
+def run(num_lines: int = 10000, repeat: int = 5) -> dict:
+    """Return the best and mean time of parsing a list of num_lines lines into new data."""
+    message = make_list(num_lines=num_lines)
+    admin = User("admin", "admin", is_admin=True)
+    times: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        NewHandler.handle(user=admin, message=message, data=RegistrationData(), max_num_players=NUM_PLAYERS_PER_SLOT)
+        times.append(time.perf_counter() - start)
+    return {
+        "num_lines": num_lines,
+        "repeat": repeat,
+        "best_seconds": min(times),
+        "mean_seconds": sum(times) / len(times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-lines", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    result = run(num_lines=args.num_lines, repeat=args.repeat)
+    print(f"/new with {result['num_lines']} lines: best {result['best_seconds'] * 1000:.1f} ms, "
+          f"mean {result['mean_seconds'] * 1000:.1f} ms over {result['repeat']} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark the registration data structures and handlers over lists of several sizes.
+
+Sizes are given as slots x players per slot x waitlist length per slot.
+
+Usage:
+    python benchmarks/bench_registration_data.py
+    python benchmarks/bench_registration_data.py --sizes 10x20x5 200x50x50 --number 200
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_registration_system.auto_registration_system import AutoRegistrationSystem  # noqa: E402
+from auto_registration_system.command_handler.handler_av import AvHandler  # noqa: E402
+from auto_registration_system.command_handler.handler_dereg import DeregHandler  # noqa: E402
+from auto_registration_system.command_handler.handler_new import NewHandler  # noqa: E402
+from auto_registration_system.data_structure.registration_data import RegistrationData  # noqa: E402
+from auto_registration_system.data_structure.slot_manager import SlotManager  # noqa: E402
+from auto_registration_system.model import SlotDetail, User  # noqa: E402
+from string_parser.command_arguments import CommandArguments  # noqa: E402
+
+DEFAULT_SIZES = ["10x20x5", "50x50x20", "200x50x50"]
+NUM_SLOTS_PER_DATE_VENUE = 10
+REPEAT = 3
+
+
+def parse_size(size: str) -> (int, int, int):
+    num_slots, num_players, waitlist_length = (int(x) for x in size.split("x"))
+    return num_slots, num_players, waitlist_length
+
+
+def fill_slot(slot: SlotManager, num_players: int, waitlist_length: int):
+    """Fill the slot and put waitlist_length players on its waitlist, half of them pending."""
+    for i in range(num_players + waitlist_length // 2):
+        slot.register(proposed_name=f"Player {i}")
+    for i in range(waitlist_length - waitlist_length // 2):
+        slot.reserve(proposed_name=f"Reserve {i}")
+
+
+def make_data(num_slots: int, num_players: int, waitlist_length: int) -> RegistrationData:
+    data = RegistrationData()
+    for i in range(num_slots):
+        slot_label = f"s{i}"
+        data.insert_slot_detail(SlotDetail(
+            slot_label=slot_label,
+            date_venue=f"Day {i // NUM_SLOTS_PER_DATE_VENUE}",
+            time="",
+            court="",
+            num_players=num_players
+        ))
+        for j in range(num_players + waitlist_length // 2):
+            data.register_player(slot_label=slot_label, player=f"Player {i} {j}")
+        for j in range(waitlist_length - waitlist_length // 2):
+            data.reserve_player(slot_label=slot_label, player=f"Reserve {i} {j}")
+    return data
+
+
+def time_us(statement, number: int) -> float:
+    """Return microseconds per run of statement, the best of REPEAT rounds of number runs."""
+    return min(timeit.repeat(statement, number=number, repeat=REPEAT)) / number * 1e6
+
+
+def run_size(num_slots: int, num_players: int, waitlist_length: int, number: int) -> dict:
+    """Return microseconds per operation on a list of the given size."""
+    data = make_data(num_slots=num_slots, num_players=num_players, waitlist_length=waitlist_length)
+    last_slot_label = f"s{num_slots - 1}"
+    last_slot = data.get_slot(slot_label=last_slot_label)
+    num_names_per_slot = num_players + waitlist_length
+
+    def register_into_new_slot():
+        fill_slot(slot=SlotManager(slot_name="x", num_players=num_players), num_players=num_players,
+                  waitlist_length=waitlist_length)
+
+    def remove_first_player_and_restructure():
+        # the removed player goes back to the end of the waitlist, so the slot keeps its size
+        name = last_slot.players.pop(0)
+        last_slot.restructure()
+        last_slot.register(proposed_name=name)
+
+    def deregister_and_register_again():
+        name = last_slot.players[0]
+        DeregHandler.handle(arguments=CommandArguments.parse(message=f"/drg {name} {last_slot_label}"), data=data)
+        data.register_player(slot_label=last_slot_label, player=name)
+
+    admin = User("admin", "admin", is_admin=True)
+    list_as_str = AutoRegistrationSystem.convert_registrations_to_string(data=data)
+    new_number = max(1, number // 20)
+    return {
+        "slot_register_us": time_us(register_into_new_slot, number=max(1, number // 10)) / num_names_per_slot,
+        "slot_reserve_us": time_us(lambda: last_slot.reserve(proposed_name="Reserve x"), number=number),
+        "slot_restructure_us": time_us(remove_first_player_and_restructure, number=number),
+        "get_slot_us": time_us(lambda: data.get_slot(slot_label=last_slot_label), number=number),
+        "dereg_and_register_us": time_us(deregister_and_register_again, number=number),
+        "av_us": time_us(lambda: AvHandler.handle(data=data), number=number),
+        "convert_registrations_to_string_us": time_us(
+            lambda: AutoRegistrationSystem.convert_registrations_to_string(data=data),
+            number=new_number
+        ),
+        "new_us": time_us(
+            lambda: NewHandler.handle(user=admin, message=list_as_str, data=RegistrationData(),
+                                      max_num_players=num_players),
+            number=new_number
+        ),
+    }
+
+
+def run(sizes: list[str] = None, number: int = 100) -> dict:
+    """Return size -> operation with _us -> microseconds per operation."""
+    return {
+        size: run_size(*parse_size(size=size), number=number)
+        for size in (sizes if sizes is not None else DEFAULT_SIZES)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+    for size, result in run(sizes=args.sizes, number=args.number).items():
+        print(size)
+        for name, microseconds in result.items():
+            print(f"    {name.removesuffix('_us'):<36} {microseconds:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark every function of StringParser on inputs like those of a busy registration.
+
+Usage:
+    python benchmarks/bench_string_parser.py
+    python benchmarks/bench_string_parser.py --number 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from string_parser.string_parser import StringParser  # noqa: E402
+
+NAMES = [f"nguyen van  {chr(ord('a') + i % 26)}{i}" for i in range(200)]
+REPEAT = 3
+COMMAND = f"/rg {', '.join(NAMES[:10])}   sat1"
+
+
+def make_cases() -> dict[str, callable]:
+    """Return function name -> call of it with a typical input."""
+    escaped_name = StringParser.replace_escape_characters_for_markdown("Mr. Nguyen (Minh)")
+    return {
+        "remove_redundant_spaces": lambda: StringParser.remove_redundant_spaces(COMMAND),
+        "remove_first_word": lambda: StringParser.remove_first_word(COMMAND),
+        "remove_command": lambda: StringParser.remove_command(COMMAND),
+        "get_first_word": lambda: StringParser.get_first_word(COMMAND),
+        "get_last_word": lambda: StringParser.get_last_word(COMMAND),
+        "remove_last_word": lambda: StringParser.remove_last_word(COMMAND),
+        "split_names": lambda: StringParser.split_names(COMMAND),
+        "enforce_message_containing_alpha": lambda: StringParser.enforce_message_containing_alpha(" 12345 x"),
+        "enforce_single_line_message": lambda: StringParser.enforce_single_line_message(COMMAND),
+        "process_telegram_full_name": lambda: StringParser.process_telegram_full_name("Nguyen,  Van  A"),
+        "replace_escape_characters_for_markdown": lambda: [
+            StringParser.replace_escape_characters_for_markdown(name) for name in NAMES
+        ],
+        "remove_escape_characters_for_markdown": lambda: StringParser.remove_escape_characters_for_markdown(
+            escaped_name
+        ),
+        "make_clickable_link_for_telegram_id": lambda: StringParser.make_clickable_link_for_telegram_id(
+            telegram_id=123456789,
+            full_name="Mr. Nguyen (Minh)"
+        ),
+    }
+
+
+def run(number: int = 5000) -> dict:
+    """Return function name with _us -> microseconds per call (per 200 names for escaping), the best of
+    REPEAT runs."""
+    return {
+        f"{name}_us": min(timeit.repeat(case, number=number, repeat=REPEAT)) / number * 1e6
+        for name, case in make_cases().items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+    for name, microseconds in run(number=args.number).items():
+        print(f"{name.removesuffix('_us'):<40} {microseconds:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
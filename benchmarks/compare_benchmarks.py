@@ -0,0 +1,69 @@
+"""Compare two results of run_benchmarks.py and flag the timings which got slower.
+
+Usage:
+    python benchmarks/compare_benchmarks.py benchmarks/results/abc1234.json benchmarks/results/def5678.json
+    python benchmarks/compare_benchmarks.py before.json after.json --threshold 0.3
+
+Timings are the values whose keys end with _us, _ms or _seconds. The exit status is 1 if any of them is slower
+than in the base results by more than the threshold (a fraction, 0.2 by default), so it can be used in scripts.
+"""
+import argparse
+import json
+import sys
+
+TIMING_SUFFIXES = ("_us", "_ms", "_seconds")
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """Return dotted key -> timing for every timing in the nested results."""
+    res: dict[str, float] = dict()
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            res.update(flatten(results=value, prefix=f"{name}."))
+        elif isinstance(value, (int, float)) and key.endswith(TIMING_SUFFIXES):
+            res[name] = float(value)
+    return res
+
+
+def compare(base: dict, new: dict, threshold: float) -> (list[(str, float, float, float)], list[str]):
+    """Return (name, base timing, new timing, relative change) of timings in both, and names of regressions."""
+    base_timings = flatten(results=base["results"])
+    new_timings = flatten(results=new["results"])
+    rows: list[(str, float, float, float)] = []
+    regressions: list[str] = []
+    for name, base_timing in base_timings.items():
+        if name not in new_timings:
+            continue
+        new_timing = new_timings[name]
+        change = (new_timing - base_timing) / base_timing if base_timing > 0 else 0.0
+        rows.append((name, base_timing, new_timing, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with open(file=args.base, mode="r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(file=args.new, mode="r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows, regressions = compare(base=base, new=new, threshold=args.threshold)
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    for name, base_timing, new_timing, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<70} {base_timing:12.2f} {new_timing:12.2f} {change:+8.1%}{flag}")
+    if len(regressions) > 0:
+        print(f"{len(regressions)} timing(s) slower by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
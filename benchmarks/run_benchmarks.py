@@ -0,0 +1,82 @@
+"""Run every benchmark in this directory and write the results as JSON, to be compared across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --output before.json --only bench_string_parser bench_new_list
+
+Each module named bench_*.py has a function run() returning its results. Results are written to
+benchmarks/results/<commit>.json unless --output is given. Compare two runs with compare_benchmarks.py.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+DIRECTORY_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+DIRECTORY_RESULTS = os.path.join(DIRECTORY_BENCHMARKS, "results")
+
+sys.path.append(DIRECTORY_BENCHMARKS)
+
+
+def find_benchmark_names() -> list[str]:
+    return sorted(
+        file_name[:-len(".py")]
+        for file_name in os.listdir(DIRECTORY_BENCHMARKS)
+        if file_name.startswith("bench_") and file_name.endswith(".py")
+    )
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=DIRECTORY_BENCHMARKS,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(benchmark_names: list[str]) -> dict:
+    results: dict = dict()
+    for name in benchmark_names:
+        print(f"Running {name}...", file=sys.stderr)
+        start = time.perf_counter()
+        results[name] = importlib.import_module(name).run()
+        print(f"Finished {name} in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="file to write the results to")
+    parser.add_argument("--only", nargs="+", help="names of the benchmarks to run (all by default)")
+    args = parser.parse_args()
+
+    commit = get_commit()
+    report = {
+        "commit": commit,
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": run_benchmarks(benchmark_names=args.only if args.only else find_benchmark_names()),
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(DIRECTORY_RESULTS, exist_ok=True)
+        output = os.path.join(DIRECTORY_RESULTS, f"{commit}.json")
+    with open(file=output, mode="w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results are written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
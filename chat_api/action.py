@@ -0,0 +1,68 @@
+from collections.abc import Callable
+from typing import BinaryIO, Optional
+
+from chat_api.model import Keyboard
+
+
+class Action:
+    """An outbound action of the bot, executed in order by a transport (see Transport)"""
+
+
+class SendMessage(Action):
+    """Send text to a chat, replying to a message (or to the message sent by an earlier action) if reply_to is set"""
+    PARSE_MODE_MARKDOWN_V2 = "MarkdownV2"
+
+    def __init__(self, chat_id: int, text: str, parse_mode: Optional[str] = None, keyboard: Optional[Keyboard] = None,
+                 reply_to: "int | SendMessage | None" = None, on_sent: Optional[Callable[[int], None]] = None,
+                 on_failed: Optional[Callable[[], list[Action]]] = None):
+        self.chat_id = chat_id
+        self.text = text
+        self.parse_mode = parse_mode
+        self.keyboard = keyboard
+        self.reply_to = reply_to
+        self.on_sent = on_sent  # called with the id of the sent message
+        self.on_failed = on_failed  # see Transport.execute
+        self.message_id: Optional[int] = None  # set by the transport once sent
+
+    @property
+    def reply_to_message_id(self) -> Optional[int]:
+        if isinstance(self.reply_to, SendMessage):
+            return self.reply_to.message_id
+        return self.reply_to
+
+
+class EditMessage(Action):
+    """Replace the text and keyboard of a message sent by the bot"""
+    def __init__(self, chat_id: int, message_id: int, text: str, keyboard: Optional[Keyboard] = None,
+                 on_failed: Optional[Callable[[], list[Action]]] = None):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = text
+        self.keyboard = keyboard
+        self.on_failed = on_failed  # see Transport.execute
+
+
+class DeleteMessage(Action):
+    """Delete a message sent by the bot"""
+    def __init__(self, chat_id: int, message_id: int):
+        self.chat_id = chat_id
+        self.message_id = message_id
+
+
+class SendDocument(Action):
+    """Send a file to a chat, replying to a message if reply_to is set"""
+    def __init__(self, chat_id: int, document: BinaryIO, file_name: Optional[str] = None,
+                 reply_to: Optional[int] = None, on_failed: Optional[Callable[[], list[Action]]] = None):
+        self.chat_id = chat_id
+        self.document = document
+        self.file_name = file_name
+        self.reply_to = reply_to
+        self.on_failed = on_failed  # see Transport.execute
+
+
+class AnswerButton(Action):
+    """Answer a pressed button, stopping its loading animation and showing text (as an alert if show_alert)"""
+    def __init__(self, callback_query_id: str, text: Optional[str] = None, show_alert: bool = False):
+        self.callback_query_id = callback_query_id
+        self.text = text
+        self.show_alert = show_alert
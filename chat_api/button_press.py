@@ -0,0 +1,80 @@
+from functools import cached_property
+
+from auto_registration_system.data_structure.identity_manager import IdentityManager
+from chat_api.action import Action, AnswerButton
+from chat_api.callback_data import CallbackData
+from chat_api.model import ChatRequest, Sender
+from string_parser.string_parser import StringParser
+
+
+class ButtonPress:
+    """A pressed inline button with its decoded callback data.
+
+    The identity of the sender is only resolved when a button handler asks for it."""
+
+    MAX_ANSWER_LENGTH = 200  # limit of Telegram for the text of answerCallbackQuery
+
+    def __init__(self, request: ChatRequest, callback_data: CallbackData | None, identity_manager: IdentityManager,
+                 actions: list[Action]):
+        self._request: ChatRequest = request
+        self._callback_data: CallbackData = callback_data
+        self._identity_manager: IdentityManager = identity_manager
+        self._actions: list[Action] = actions
+        self._is_answered: bool = False
+
+    @property
+    def request(self) -> ChatRequest:
+        return self._request
+
+    @property
+    def callback_data(self) -> CallbackData | None:
+        return self._callback_data
+
+    @property
+    def is_answered(self) -> bool:
+        return self._is_answered
+
+    def answer(self, text: str | None = None, show_alert: bool = False):
+        """Answer the press (stopping the loading animation of the button) if it has not been answered yet."""
+        if self._is_answered:
+            return
+        self._is_answered = True
+        if text is not None:
+            text = text.strip()
+            if len(text) > ButtonPress.MAX_ANSWER_LENGTH:
+                text = text[:ButtonPress.MAX_ANSWER_LENGTH - 3] + "..."
+        self._actions.append(AnswerButton(
+            callback_query_id=self._request.callback_query_id,
+            text=text or None,
+            show_alert=show_alert
+        ))
+
+    @property
+    def sender(self) -> Sender:
+        return self._request.sender
+
+    @property
+    def chat_id(self) -> int:
+        return self._request.chat_id
+
+    @property
+    def message_id(self) -> int:
+        return self._request.message_id
+
+    @cached_property
+    def id_string(self) -> str:
+        return self._identity_manager.get_alias_or_full_name(
+            telegram_id=self.sender.id,
+            full_name=StringParser.process_telegram_full_name(telegram_full_name=self.sender.full_name)
+        )
+
+    @cached_property
+    def clickable_link(self) -> str:
+        return StringParser.make_clickable_link_for_telegram_id(
+            telegram_id=self.sender.id,
+            full_name=self.sender.full_name
+        )
+
+    @cached_property
+    def identity_message(self) -> str:
+        return f"\\(from {self.clickable_link}\\)"
@@ -0,0 +1,65 @@
+from auto_registration_system.command import Command
+
+
+class CallbackData:
+    """Callback data of an inline button, decoded once into a code and its arguments.
+
+    The compact form is "<code>" or "<code>:<arg 1>:...:<arg n>", e.g. "r:a" for registering slot a.
+    Buttons still present in old messages use the legacy form, e.g. "_rg a" or "_drg 123 a", and are decoded
+    into the same codes."""
+
+    SEPARATOR = ":"
+
+    _LEGACY_FIRST_WORD_TO_CODE: dict[str, str] = {
+        Command.CALLBACK_DATA_HELP: Command.CALLBACK_CODE_HELP,
+        Command.CALLBACK_DATA_ALL: Command.CALLBACK_CODE_ALL,
+        Command.CALLBACK_DATA_AV: Command.CALLBACK_CODE_AV,
+        Command.CALLBACK_DATA_RT: Command.CALLBACK_CODE_RT,
+        Command.CALLBACK_DATA_RG: Command.CALLBACK_CODE_RG,
+        Command.CALLBACK_DATA_DRG: Command.CALLBACK_CODE_DRG,
+    }
+
+    def __init__(self, code: str, args: tuple[str, ...] = ()):
+        self._code: str = code
+        self._args: tuple[str, ...] = args
+
+    @property
+    def code(self) -> str:
+        return self._code
+
+    @property
+    def args(self) -> tuple[str, ...]:
+        return self._args
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CallbackData) and self._code == other._code and self._args == other._args
+
+    def __repr__(self) -> str:
+        return f"CallbackData({self._code!r}, {self._args!r})"
+
+    @staticmethod
+    def encode(code: str, *args) -> str:
+        if len(args) == 0:
+            return code
+        return CallbackData.SEPARATOR.join((code, *(str(arg) for arg in args)))
+
+    @staticmethod
+    def decode(data: str | None) -> "CallbackData | None":
+        if not data:
+            return None
+        if data[0] == "_":
+            return CallbackData._decode_legacy(data=data)
+        code, _, raw_args = data.partition(CallbackData.SEPARATOR)
+        if len(raw_args) == 0:
+            return CallbackData(code=code)
+        return CallbackData(code=code, args=tuple(raw_args.split(CallbackData.SEPARATOR)))
+
+    @staticmethod
+    def _decode_legacy(data: str) -> "CallbackData | None":
+        words = data.split()
+        code = CallbackData._LEGACY_FIRST_WORD_TO_CODE.get(words[0])
+        if code is None:
+            return None
+        if code == Command.CALLBACK_CODE_DRG and len(words) > 1:
+            code = Command.CALLBACK_CODE_DRG_SLOT
+        return CallbackData(code=code, args=tuple(words[1:]))
@@ -0,0 +1,1133 @@
+import io
+import time
+from collections.abc import Awaitable, Callable
+
+from auto_registration_system.auto_registration_system import AutoRegistrationSystem
+from auto_registration_system.command import Command
+from auto_registration_system.command_handler.handler_dereg import DeregHandler
+from auto_registration_system.data_structure.chat_manager import ChatManager
+from auto_registration_system.data_structure.membership_snapshot import MembershipSnapshot
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.data_structure.time_manager import TimeManager
+from auto_registration_system.term import Term
+from chat_api.action import Action, DeleteMessage, EditMessage, SendDocument, SendMessage
+from chat_api.button_press import ButtonPress
+from chat_api.callback_data import CallbackData
+from chat_api.model import Button, ChatRequest, Keyboard, Sender
+from chat_api.release_payload import ReleasePayload
+from chat_api.tenant import Tenant
+from chat_api.tenant_registry import TenantRegistry
+from chat_api.transport import Scheduler, Transport
+from memory_monitor import MemoryMonitor
+from metrics import Metrics
+from string_parser.string_parser import StringParser
+from tracer import Tracer
+
+from config import Config
+
+MARKDOWN_V2 = SendMessage.PARSE_MODE_MARKDOWN_V2
+
+
+class CommandApi:
+    """Commands and buttons of the bot, independent of the chat platform.
+
+    A handler takes a ChatRequest and returns the actions (send, edit, delete, document, answer) to be executed
+    in order by a transport. Handlers may only be run one at a time, as updates are handled by the bot. Messages
+    sent by the bot that have to be tracked (pages of the list, available slots) are recorded when the transport
+    reports them sent."""
+
+    NUM_BUTTONS_PER_LINE = 3
+
+    def __init__(self, time_manager: TimeManager, tracer: Tracer, metrics: Metrics,
+                 tenant_chat_ids: set[int] | None = None):
+        self.time_manager: TimeManager = time_manager
+        self.tracer: Tracer = tracer  # activities of the process itself, e.g. connection errors
+        self.metrics: Metrics = metrics
+        self.memory_monitor: MemoryMonitor = MemoryMonitor()
+        self.tenants: TenantRegistry = TenantRegistry(
+            tenant_chat_ids=tenant_chat_ids if tenant_chat_ids is not None else Config.allowed_chat_ids,
+            staging_chat_ids=Config.staging_chat_ids,
+            default_chat_id=Config.default_chat_id,
+            max_num_tenants=Config.max_num_tenants_in_memory,
+            load=self.load_tenant,
+            unload=self.unload_tenant
+        )
+        self.transport: Transport | None = None  # executes actions not caused by a request, e.g. stats of /profile
+        self.scheduler: Scheduler | None = None  # without scheduler, release and deletions are run by the caller
+
+    def get_tenant(self, chat_id: int) -> Tenant:
+        """Return the tenant serving chat_id, loading it from files if it is not in memory."""
+        return self.tenants.get(chat_id=chat_id)
+
+    def load_tenant(self, chat_id: int) -> Tenant:
+        tenant = Tenant(chat_id=chat_id, time_manager=self.time_manager, metrics=self.metrics)
+        auto_reg_system = tenant.auto_reg_system
+
+        def log(message: str):
+            # logged rather than printed, tenants are loaded on demand (also by tests and benchmarks)
+            tenant.tracer.log(message=f"(from system) {message}", is_history_required=False)
+
+        log(message=f"Loading data of chat {chat_id}")
+        try:
+            main_list_as_str, release_time_as_str, pre_released_list_str = tenant.data_handler.read_data_from_files()
+            try:
+                auto_reg_system.handle_new(
+                    username="*",  # special username for enforcing admin
+                    message=f"/{Command.COMMAND_NEW} {main_list_as_str}",
+                    chat_id=chat_id
+                )
+                log(message="Main list is loaded successfully!")
+            except Exception:  # pylint: disable=broad-except
+                log(message="Unable to load main list! Main list is reset to be empty!")
+
+            try:
+                _, message = auto_reg_system.handle_notitime(
+                    username="*",  # special username for enforcing admin
+                    message=f"/{Command.COMMAND_NOTITIME} {release_time_as_str}",
+                    time_manager=self.time_manager
+                )
+                log(message=f"Release time {release_time_as_str}: {message}")
+            except Exception:
+                log(message="Unable to load release time! Release time is set to be None!")
+
+            try:
+                auto_reg_system.handle_new(
+                    username="*",  # special username for enforcing admin
+                    message=f"/{Command.COMMAND_NEW} {pre_released_list_str}",
+                    chat_id=0,  # chat_id is set for making pre-released list
+                )
+                log(message="Pre-released list is loaded successfully!")
+            except Exception:
+                log(message="Unable to load pre-released list! Pre-released list is reset to be empty!")
+        except Exception:
+            log(message="No data or error data in files!")
+
+        if auto_reg_system.release_time_manager.enabled:
+            self.prepare_release_payload(tenant=tenant)
+            if self.scheduler is not None:
+                self.scheduler.arm_release(tenant=tenant)
+        return tenant
+
+    def unload_tenant(self, tenant: Tenant):
+        if self.scheduler is not None:
+            self.scheduler.disarm_release(tenant=tenant)
+        tenant.auto_reg_system.write_all_data_to_files(
+            data_handler=tenant.data_handler,
+            time_manager=self.time_manager
+        )
+        tenant.tracer.log(message=f"(from system) Data of chat {tenant.chat_id} is unloaded", is_history_required=False)
+
+    def load_tenants_with_pending_release(self, chat_ids: set[int]):
+        """Load the tenants with a release time in files, so that release and reminders still happen after a
+        restart. Other tenants are loaded when their chats are used."""
+        for chat_id in chat_ids:
+            release_time_as_str = Tenant.make_data_handler(chat_id=chat_id).read_release_time_from_file()
+            if release_time_as_str is not None and len(release_time_as_str.strip()) > 0:
+                self.get_tenant(chat_id=chat_id)  # loading arms jobs of pending release
+
+    @staticmethod
+    def delete_message(tenant: Tenant, chat_id: int, message_id: int):
+        # deleted later by a job (see dequeue_deletions), but counted for the update queueing it
+        Metrics.count_api_call(method="deleteMessage")
+        tenant.deletion_queue.enqueue(chat_id=chat_id, message_id=message_id)
+
+    def dequeue_deletions(self) -> list[Action]:
+        """Return the deletion of one queued message of every tenant in memory."""
+        actions: list[Action] = []
+        for tenant in self.tenants.loaded_tenants:
+            has_message_to_delete, (chat_id, message_id) = tenant.deletion_queue.dequeue()
+            if has_message_to_delete:
+                actions.append(DeleteMessage(chat_id=chat_id, message_id=message_id))
+        return actions
+
+    def evict_idle_tenants(self):
+        evicted_chat_ids = self.tenants.evict_idle(idle_time=Config.idle_time_for_evicting_tenant)
+        if len(evicted_chat_ids) > 0:
+            self.tracer.log(
+                message=f"(from system) Idle chats are unloaded: {evicted_chat_ids}",
+                is_history_required=False
+            )
+
+    @staticmethod
+    def reply(request: ChatRequest, text: str, parse_mode: str | None = None,
+              keyboard: Keyboard | None = None) -> SendMessage:
+        return SendMessage(chat_id=request.chat_id, text=text, parse_mode=parse_mode, keyboard=keyboard,
+                           reply_to=request.message_id)
+
+    @staticmethod
+    def make_buttons_in_lines(buttons: list[Button]) -> list[list[Button]]:
+        return [
+            buttons[index:index + CommandApi.NUM_BUTTONS_PER_LINE]
+            for index in range(0, len(buttons), CommandApi.NUM_BUTTONS_PER_LINE)
+        ]
+
+    @staticmethod
+    def make_inline_buttons_for_registration(data: RegistrationData | None) -> Keyboard:
+        slot_buttons: list[Button] = []
+        if data is not None:
+            for date_venue in data.bookings_by_date_venue:
+                for slot_label in data.bookings_by_date_venue[date_venue]:
+                    slot_buttons.append(Button(
+                        text=f"slot {slot_label}",
+                        callback_data=CallbackData.encode(Command.CALLBACK_CODE_RG, slot_label)
+                    ))
+        button_list = CommandApi.make_buttons_in_lines(buttons=slot_buttons)
+
+        # add buttons all and help
+        button_list.append([
+            Button(text=Command.COMMAND_ALL, callback_data=CallbackData.encode(Command.CALLBACK_CODE_ALL)),
+            Button(text=Command.COMMAND_AV, callback_data=CallbackData.encode(Command.CALLBACK_CODE_AV)),
+            Button(text=Command.COMMAND_HELP, callback_data=CallbackData.encode(Command.CALLBACK_CODE_HELP)),
+        ])
+        button_list.append([
+            Button(text="release time", callback_data=CallbackData.encode(Command.CALLBACK_CODE_RT)),
+            Button(text="deregister", callback_data=CallbackData.encode(Command.CALLBACK_CODE_DRG)),
+        ])
+        return Keyboard(rows=button_list)
+
+    @staticmethod
+    def get_inline_buttons_for_registration(tenant: Tenant, data: RegistrationData | None) -> Keyboard:
+        return tenant.keyboard_cache.get_registration_keyboard(
+            data=data,
+            build=lambda: CommandApi.make_inline_buttons_for_registration(data=data)
+        )
+
+    @staticmethod
+    def make_inline_buttons_for_deregistration(data: RegistrationData, telegram_id: int, id_string: str) \
+            -> Keyboard | None:
+        slots_able_to_be_deregistered = DeregHandler.search_for_slots_able_to_be_deregistered(
+            id_string=id_string,
+            data=data
+        )
+        if len(slots_able_to_be_deregistered) == 0:
+            return None
+        return Keyboard(rows=CommandApi.make_buttons_in_lines(buttons=[
+            Button(
+                text=f"slot {slot_label}",
+                callback_data=CallbackData.encode(Command.CALLBACK_CODE_DRG_SLOT, telegram_id, slot_label)
+            )
+            for slot_label, slot in slots_able_to_be_deregistered
+        ]))
+
+    @staticmethod
+    def get_id_string(tenant: Tenant, sender: Sender) -> str:
+        return tenant.auto_reg_system.identity_manager.get_alias_or_full_name(
+            telegram_id=sender.id,
+            full_name=StringParser.process_telegram_full_name(telegram_full_name=sender.full_name)
+        )
+
+    @staticmethod
+    def make_echo_message_for_button(press: ButtonPress, message: str) -> SendMessage:
+        return SendMessage(
+            chat_id=press.chat_id,
+            text=f"{StringParser.replace_escape_characters_for_markdown(message=message)}\t{press.identity_message}",
+            parse_mode=MARKDOWN_V2
+        )
+
+    async def run_button_all(self, tenant: Tenant, press: ButtonPress, actions: list[Action]):
+        press.answer()
+        echo = CommandApi.make_echo_message_for_button(press=press, message=f"/{Command.COMMAND_ALL}")
+        actions.append(echo)
+        CommandApi.log_message(tenant=tenant, message=f"(from {press.id_string}) /{Command.COMMAND_ALL}")
+        self.show_all(tenant=tenant, actions=actions, chat_id=press.chat_id, reply_to=echo,
+                      username=press.sender.username)
+
+    async def run_button_help(self, tenant: Tenant, press: ButtonPress, actions: list[Action]):
+        press.answer()
+        echo = CommandApi.make_echo_message_for_button(press=press, message=f"/{Command.COMMAND_HELP}")
+        actions.append(echo)
+        actions.append(SendMessage(chat_id=press.chat_id, text=Term.HELP_TEXT, reply_to=echo))
+
+    async def run_button_av(self, tenant: Tenant, press: ButtonPress, actions: list[Action]):
+        press.answer()
+        echo = CommandApi.make_echo_message_for_button(press=press, message=f"/{Command.COMMAND_AV}")
+        actions.append(echo)
+        CommandApi.log_message(tenant=tenant, message=f"(from {press.id_string}) /{Command.COMMAND_AV}")
+        CommandApi.show_available_slots(tenant=tenant, actions=actions, chat_id=press.chat_id, reply_to=echo)
+
+    async def run_button_rt(self, tenant: Tenant, press: ButtonPress, actions: list[Action]):
+        press.answer()
+        actions.append(CommandApi.make_echo_message_for_button(press=press, message=f"/{Command.COMMAND_RT}"))
+        self.send_release_time_status(tenant=tenant, actions=actions, chat_id=press.chat_id)
+
+    async def run_button_rg(self, tenant: Tenant, press: ButtonPress, actions: list[Action]):
+        if len(press.callback_data.args) != 1:
+            return
+        slot_label = press.callback_data.args[0]
+        message = f"/{Command.COMMAND_RG} {press.id_string} {slot_label}"
+        CommandApi.log_message(tenant=tenant, message=f"(from {press.id_string}) {message}")
+        snapshot = CommandApi.take_snapshot(tenant=tenant)
+        response, suggestion = tenant.auto_reg_system.handle_register(
+            command_string_for_suggestion=Command.COMMAND_DRG,
+            username=press.sender.username,
+            message=message,
+            chat_id=press.chat_id
+        )
+        press.answer(text=response)
+        self.write_data_and_update_bot_message_for_full_list(
+            tenant=tenant,
+            actions=actions,
+            chat_id=press.chat_id,
+            reply_to=None,
+            message=None,
+            header=response,
+            snapshot=snapshot
+        )
+        if suggestion is not None:
+            actions.append(SendMessage(chat_id=press.chat_id, text=suggestion, parse_mode=MARKDOWN_V2))
+
+    async def run_button_drg_initially(self, tenant: Tenant, press: ButtonPress, actions: list[Action]):
+        press.answer()
+        data = tenant.auto_reg_system.data
+        inline_button_list = tenant.keyboard_cache.get_member_keyboard(
+            data=data,
+            telegram_id=press.sender.id,
+            id_string=press.id_string,
+            build=lambda: CommandApi.make_inline_buttons_for_deregistration(
+                data=data,
+                telegram_id=press.sender.id,
+                id_string=press.id_string
+            )
+        ) if data is not None else None
+        if inline_button_list is not None:
+            response = (f"The following slots can be deregistered for {press.clickable_link} "
+                        + f"with name/alias {StringParser.replace_escape_characters_for_markdown(press.id_string)}")
+        else:
+            response = (f"There is no slot for {press.clickable_link} "
+                        + f"\\(with name/alias {StringParser.replace_escape_characters_for_markdown(press.id_string)}\\) to deregister\\!")
+            # the sender may be in the list under a slightly different name
+            suggestion = DeregHandler.make_suggestion(
+                command_string=Command.COMMAND_DRG,
+                id_string=press.id_string,
+                data=data
+            ) if data is not None else None
+            if suggestion is not None:
+                response += f"\n{suggestion}"
+
+        actions.append(SendMessage(
+            chat_id=press.chat_id,
+            text=response,
+            parse_mode=MARKDOWN_V2,
+            keyboard=inline_button_list
+        ))
+
+    async def run_button_drg_for_specific_slot(self, tenant: Tenant, press: ButtonPress, actions: list[Action]):
+        if len(press.callback_data.args) != 2:
+            return
+        enforced_telegram_id, slot_label = press.callback_data.args
+        if enforced_telegram_id != str(press.sender.id):
+            press.answer(text="You are not allowed to deregister other members by this way!", show_alert=True)
+            return
+        message = f"/{Command.COMMAND_DRG} {press.id_string} {slot_label}"
+        CommandApi.log_message(tenant=tenant, message=f"(from {press.id_string}) {message}")
+        snapshot = CommandApi.take_snapshot(tenant=tenant)
+        response = StringParser.remove_escape_characters_for_markdown(
+            message=tenant.auto_reg_system.handle_deregister(
+                command_string=Command.COMMAND_DRG,
+                username=press.sender.username,
+                id_string=press.id_string,
+                message=message,
+                chat_id=press.chat_id
+            )
+        )
+        press.answer(text=response)
+        self.write_data_and_update_bot_message_for_full_list(
+            tenant=tenant,
+            actions=actions,
+            chat_id=press.chat_id,
+            reply_to=None,
+            message=None,
+            header=response,
+            snapshot=snapshot
+        )
+        CommandApi.delete_message(tenant=tenant, chat_id=press.chat_id, message_id=press.message_id)
+
+    # routes the code of callback data to the handler of the pressed button
+    BUTTON_HANDLERS: dict[str, Callable[["CommandApi", Tenant, ButtonPress, list[Action]], Awaitable[None]]] = {
+        Command.CALLBACK_CODE_ALL: run_button_all,
+        Command.CALLBACK_CODE_HELP: run_button_help,
+        Command.CALLBACK_CODE_AV: run_button_av,
+        Command.CALLBACK_CODE_RT: run_button_rt,
+        Command.CALLBACK_CODE_RG: run_button_rg,
+        Command.CALLBACK_CODE_DRG: run_button_drg_initially,
+        Command.CALLBACK_CODE_DRG_SLOT: run_button_drg_for_specific_slot,
+    }
+
+    async def run_button(self, request: ChatRequest) -> list[Action]:
+        # each button handler answers the press itself, as early as its outcome is known
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        actions: list[Action] = []
+        press = ButtonPress(
+            request=request,
+            callback_data=CallbackData.decode(data=request.callback_data),
+            identity_manager=tenant.auto_reg_system.identity_manager,
+            actions=actions
+        )
+        if press.callback_data is not None:
+            button_handler = CommandApi.BUTTON_HANDLERS.get(press.callback_data.code)
+            if button_handler is not None:
+                Metrics.set_command(command=button_handler.__name__.removeprefix("run_"))
+                await button_handler(self, tenant, press, actions)
+        press.answer()
+        return actions
+
+    @staticmethod
+    def make_page_texts(header: str or None, pages: list[str], text_if_empty: str) -> list[str]:
+        """Put header on top of the first page if it fits there, otherwise send it as a page of its own."""
+        if len(pages) == 0:
+            pages = [text_if_empty]
+        if header is None:
+            return list(pages)
+        header = header.strip()
+        if len(header) + 2 + len(pages[0]) <= Config.max_list_page_length:
+            return [f"{header}\n\n{pages[0]}"] + pages[1:]
+        return [header] + pages
+
+    @staticmethod
+    def post_list_pages(
+            actions: list[Action],
+            chat_id: int,
+            reply_to: int | SendMessage | None,
+            page_texts: list[str],
+            keyboard: Keyboard | None,
+            on_posted: Callable[[list[int]], None] | None = None,
+    ):
+        """Send the pages in order, the first one replying to reply_to, the keyboard with the last one. on_posted
+        is called with the ids of the pages once the last one is sent."""
+        page_actions: list[SendMessage] = [
+            SendMessage(
+                chat_id=chat_id,
+                text=page_text,
+                keyboard=keyboard if index == len(page_texts) - 1 else None,
+                reply_to=reply_to if index == 0 else None
+            )
+            for index, page_text in enumerate(page_texts)
+        ]
+        if on_posted is not None:
+            page_actions[-1].on_sent = lambda _: on_posted([page_action.message_id for page_action in page_actions])
+        actions.extend(page_actions)
+
+    @staticmethod
+    def replace_list_messages(tenant: Tenant, chat_id: int | None, message_ids: list[int], page_texts: list[str],
+                              keyboard: Keyboard | None):
+        """Record the messages now showing the list, queueing the previous ones for deletion."""
+        for message_id in tenant.list_message_ids:
+            CommandApi.delete_message(tenant=tenant, chat_id=tenant.list_chat_id, message_id=message_id)
+        tenant.list_chat_id = chat_id if len(message_ids) > 0 else None
+        tenant.list_message_ids = message_ids
+        tenant.list_pages = page_texts
+        tenant.list_keyboard = keyboard
+        tenant.list_posted_time = time.monotonic() if len(message_ids) > 0 else None
+
+    @staticmethod
+    def edit_list_pages(
+            tenant: Tenant,
+            actions: list[Action],
+            page_texts: list[str],
+            keyboard: Keyboard | None,
+    ):
+        """Edit the pages of the posted list whose text or keyboard changed, send pages that are new and delete
+        pages that are not needed anymore. If the posted list cannot be edited, it is posted again."""
+        chat_id = tenant.list_chat_id
+        old_message_ids = tenant.list_message_ids
+        old_page_texts = tenant.list_pages
+        old_keyboard = tenant.list_keyboard
+        new_message_ids: list[int] = []
+
+        def post_again() -> list[Action]:
+            fallback_actions: list[Action] = []
+            CommandApi.post_list_pages(
+                actions=fallback_actions,
+                chat_id=chat_id,
+                reply_to=None,
+                page_texts=page_texts,
+                keyboard=keyboard,
+                on_posted=lambda message_ids: CommandApi.replace_list_messages(
+                    tenant=tenant,
+                    chat_id=chat_id,
+                    message_ids=message_ids,
+                    page_texts=page_texts,
+                    keyboard=keyboard
+                )
+            )
+            return fallback_actions
+
+        for index, page_text in enumerate(page_texts):
+            is_last_page = index == len(page_texts) - 1
+            page_keyboard = keyboard if is_last_page else None
+            if index >= len(old_message_ids):
+                actions.append(SendMessage(chat_id=chat_id, text=page_text, keyboard=page_keyboard,
+                                           on_sent=new_message_ids.append, on_failed=post_again))
+                continue
+            was_last_page = index == len(old_message_ids) - 1
+            is_keyboard_changed = (is_last_page or was_last_page) and (
+                    is_last_page != was_last_page or keyboard is not old_keyboard
+            )
+            if page_text != old_page_texts[index] or is_keyboard_changed:
+                actions.append(EditMessage(chat_id=chat_id, message_id=old_message_ids[index], text=page_text,
+                                           keyboard=page_keyboard, on_failed=post_again))
+            new_message_ids.append(old_message_ids[index])
+        for message_id in old_message_ids[len(page_texts):]:
+            CommandApi.delete_message(tenant=tenant, chat_id=chat_id, message_id=message_id)
+        tenant.list_message_ids = new_message_ids  # ids of new pages are appended once they are sent
+        tenant.list_pages = page_texts
+        tenant.list_keyboard = keyboard
+        tenant.list_posted_time = time.monotonic()
+
+    @staticmethod
+    def take_snapshot(tenant: Tenant) -> MembershipSnapshot | None:
+        """Take the snapshot of the main list before a change if only changes are notified."""
+        if not Config.notify_changes_only:
+            return None
+        return MembershipSnapshot(data=tenant.auto_reg_system.data)
+
+    @staticmethod
+    def is_full_list_recent(tenant: Tenant, chat_id: int) -> bool:
+        return (tenant.list_chat_id == chat_id and tenant.list_posted_time is not None
+                and time.monotonic() - tenant.list_posted_time < Config.interval_for_refreshing_full_list)
+
+    def write_data_and_update_bot_message_for_full_list(
+            self,
+            tenant: Tenant,
+            actions: list[Action],
+            chat_id: int,
+            reply_to: int | SendMessage | None,
+            message: str or None,
+            parse_mode: str or None = None,
+            is_main_data: bool = True,
+            header: str or None = None,
+            snapshot: MembershipSnapshot | None = None,
+    ):
+        """Send the list to chat_id (with header put on top of the first page) and message, then write all data
+        to files. If snapshot (of the main list before the change) is given and the list was posted recently in
+        the chat, only the changes since snapshot are sent (below header) instead of the list."""
+        with Metrics.phase(phase=Metrics.PHASE_RENDER):
+            changes = snapshot.describe_changes(data=tenant.auto_reg_system.data) if snapshot is not None else None
+        if changes is not None and CommandApi.is_full_list_recent(tenant=tenant, chat_id=chat_id):
+            CommandApi.send_changes(
+                tenant=tenant,
+                actions=actions,
+                chat_id=chat_id,
+                reply_to=reply_to,
+                header=header,
+                changes=changes
+            )
+        else:
+            CommandApi.send_list(
+                tenant=tenant,
+                actions=actions,
+                chat_id=chat_id,
+                reply_to=reply_to,
+                is_main_data=is_main_data,
+                header=header
+            )
+
+        # inform message
+        if message is not None:
+            actions.append(SendMessage(chat_id=chat_id, text=message, parse_mode=parse_mode, reply_to=reply_to))
+
+        # write all data to file
+        tenant.auto_reg_system.write_all_data_to_files(
+            data_handler=tenant.data_handler,
+            time_manager=self.time_manager
+        )
+
+    @staticmethod
+    def send_list(
+            tenant: Tenant,
+            actions: list[Action],
+            chat_id: int,
+            reply_to: int | SendMessage | None,
+            is_main_data: bool,
+            header: str or None,
+    ):
+        """Long lists are sent in several pages. If Config.edit_list_in_place is set, the main list already posted
+        in the chat is edited where it changed, and header is sent on its own before the edits."""
+        with Metrics.phase(phase=Metrics.PHASE_RENDER):
+            pages = tenant.auto_reg_system.get_all_slots_as_pages(
+                is_main_data=is_main_data,
+                is_compact=Config.use_compact_list_layout
+            )
+            inline_buttons: Keyboard | None = CommandApi.get_inline_buttons_for_registration(
+                tenant=tenant,
+                data=tenant.auto_reg_system.data
+            ) if is_main_data else None
+        if (is_main_data and Config.edit_list_in_place and len(pages) > 0
+                and tenant.list_chat_id == chat_id and len(tenant.list_message_ids) > 0):
+            if header is not None:
+                actions.append(SendMessage(chat_id=chat_id, text=header, reply_to=reply_to))
+            CommandApi.edit_list_pages(tenant=tenant, actions=actions, page_texts=pages, keyboard=inline_buttons)
+        else:
+            page_texts = CommandApi.make_page_texts(
+                header=header,
+                pages=pages,
+                text_if_empty="The list is empty!" if is_main_data else "The pre-released list is empty!"
+            )
+            CommandApi.post_list_pages(
+                actions=actions,
+                chat_id=chat_id,
+                reply_to=reply_to,
+                page_texts=page_texts,
+                keyboard=inline_buttons,
+                on_posted=(lambda message_ids: CommandApi.replace_list_messages(
+                    tenant=tenant,
+                    chat_id=chat_id,
+                    message_ids=message_ids if len(pages) > 0 else [],
+                    page_texts=page_texts,
+                    keyboard=inline_buttons
+                )) if is_main_data else None
+            )
+        if len(pages) > 0:
+            tenant.tracer.log(
+                message=f"(from system) \n{''.join(pages)}",
+                is_history_required=is_main_data
+            )
+
+    @staticmethod
+    def send_changes(
+            tenant: Tenant,
+            actions: list[Action],
+            chat_id: int,
+            reply_to: int | SendMessage | None,
+            header: str or None,
+            changes: list[str],
+    ):
+        change_text = "\n".join(([header.strip()] if header is not None else []) + changes)
+        if len(change_text) == 0:
+            return
+        actions.append(SendMessage(chat_id=chat_id, text=change_text, reply_to=reply_to))
+        if len(changes) > 0:
+            tenant.tracer.log(message="(from system) \n" + "\n".join(changes))
+
+    @staticmethod
+    def log_message_from_user(tenant: Tenant, request: ChatRequest, is_history_required: bool = True):
+        id_string = CommandApi.get_id_string(tenant=tenant, sender=request.sender)
+        text = request.text
+        if request.document is not None:
+            text = f"{request.text} (document {request.document.file_name})"
+        tenant.tracer.log(
+            message=f"(from {id_string}) {text}",
+            is_history_required=is_history_required
+        )
+
+    @staticmethod
+    def log_message(tenant: Tenant, message: str):
+        tenant.tracer.log(message=message)
+
+    async def run_start(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        if self.scheduler is not None:
+            self.scheduler.arm_release(tenant=tenant)
+            self.scheduler.start_maintenance()
+        return [CommandApi.reply(request=request, text="I (bot) checked and started all potential jobs!")]
+
+    async def run_hello(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        return [CommandApi.reply(request=request, text=f'Hello {request.sender.first_name}')]
+
+    async def run_all(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        actions: list[Action] = []
+        self.show_all(tenant=tenant, actions=actions, chat_id=request.chat_id, reply_to=request.message_id,
+                      username=request.sender.username)
+        return actions
+
+    def show_all(self, tenant: Tenant, actions: list[Action], chat_id: int, reply_to: int | SendMessage | None,
+                 username: str | None):
+        try:
+            tenant.auto_reg_system.handle_all(username=username, chat_id=chat_id)
+            if ChatManager.is_chat_id_allowed(chat_id=chat_id, allowed_chat_ids=tenant.auto_reg_system.allowed_chat_ids):
+                self.write_data_and_update_bot_message_for_full_list(
+                    tenant=tenant,
+                    actions=actions,
+                    chat_id=chat_id,
+                    reply_to=reply_to,
+                    message=None,
+                    is_main_data=True
+                )
+            else:
+                self.write_data_and_update_bot_message_for_full_list(
+                    tenant=tenant,
+                    actions=actions,
+                    chat_id=chat_id,
+                    reply_to=reply_to,
+                    message=None,
+                    is_main_data=False
+                )
+                self.send_release_time_status(tenant=tenant, actions=actions, chat_id=chat_id)
+        except Exception as e:
+            actions.append(SendMessage(chat_id=chat_id, text=repr(e), reply_to=reply_to))
+
+    async def run_av(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        actions: list[Action] = []
+        CommandApi.show_available_slots(tenant=tenant, actions=actions, chat_id=request.chat_id,
+                                        reply_to=request.message_id)
+        return actions
+
+    @staticmethod
+    def show_available_slots(tenant: Tenant, actions: list[Action], chat_id: int,
+                             reply_to: int | SendMessage | None):
+        if not ChatManager.is_chat_id_allowed(
+                chat_id=chat_id,
+                allowed_chat_ids=tenant.auto_reg_system.allowed_chat_ids
+        ):
+            actions.append(SendMessage(chat_id=chat_id, text="This command is not allowed to be used here!",
+                                       reply_to=reply_to))
+            return
+
+        # try delete previous message
+        if tenant.last_av_chat_id is not None and tenant.last_av_message_id is not None:
+            CommandApi.delete_message(
+                tenant=tenant,
+                chat_id=tenant.last_av_chat_id,
+                message_id=tenant.last_av_message_id
+            )
+            tenant.last_av_chat_id = None
+            tenant.last_av_message_id = None
+
+        def record_av_message(message_id: int):
+            tenant.last_av_chat_id = chat_id
+            tenant.last_av_message_id = message_id
+
+        # send new message
+        actions.append(SendMessage(
+            chat_id=chat_id,
+            text="The list of available slots:\n\n" + tenant.auto_reg_system.get_available_slots_as_string(),
+            keyboard=CommandApi.get_inline_buttons_for_registration(tenant=tenant, data=tenant.auto_reg_system.data),
+            reply_to=reply_to,
+            on_sent=record_av_message
+        ))
+
+    def send_release_time_status(self, tenant: Tenant, actions: list[Action], chat_id: int):
+        if tenant.auto_reg_system.release_time_manager.enabled:
+            actions.append(SendMessage(
+                chat_id=chat_id,
+                text=f"✅ The new list will be released after {
+                    tenant.auto_reg_system.release_time_manager.release_time_to_str(time_manager=self.time_manager)
+                }"
+            ))
+        else:
+            actions.append(SendMessage(chat_id=chat_id, text="❌ Release time for new list has not been set!"))
+
+    async def run_new(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        (message, is_in_main_group) = tenant.auto_reg_system.handle_new(
+            username=request.sender.username,
+            message=request.text,
+            chat_id=request.chat_id
+        )
+        return self.show_new_list(tenant=tenant, request=request, message=message, is_in_main_group=is_in_main_group)
+
+    async def run_new_from_document(self, request: ChatRequest) -> list[Action]:
+        """/new as the caption of an uploaded text document containing the list, which can be longer than a
+        message. The document is read line by line while parsing."""
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        document = request.document
+        if document.file_size is not None and document.file_size > Config.max_size_of_list_document:
+            CommandApi.log_message_from_user(tenant=tenant, request=request, is_history_required=False)
+            return [CommandApi.reply(
+                request=request,
+                text=f"The document must not be larger than {Config.max_size_of_list_document} bytes!"
+            )]
+        try:
+            content = await document.download()
+        except Exception as e:
+            CommandApi.log_message_from_user(tenant=tenant, request=request, is_history_required=False)
+            self.tracer.log(message=f"Unable to download document: {repr(e)}", is_history_required=False)
+            return [CommandApi.reply(request=request, text="Cannot read the document!")]
+        (message, is_in_main_group) = tenant.auto_reg_system.handle_new(
+            username=request.sender.username,
+            message=request.text,
+            chat_id=request.chat_id,
+            lines=io.TextIOWrapper(io.BytesIO(content), encoding="utf-8-sig", errors="replace")
+        )
+        return self.show_new_list(tenant=tenant, request=request, message=message, is_in_main_group=is_in_main_group)
+
+    def show_new_list(self, tenant: Tenant, request: ChatRequest, message: str, is_in_main_group: bool) \
+            -> list[Action]:
+        CommandApi.log_message_from_user(tenant=tenant, request=request, is_history_required=is_in_main_group)
+        actions: list[Action] = []
+        self.write_data_and_update_bot_message_for_full_list(
+            tenant=tenant,
+            actions=actions,
+            chat_id=request.chat_id,
+            reply_to=request.message_id,
+            message=message,
+            is_main_data=is_in_main_group
+        )
+        if not is_in_main_group:
+            self.prepare_release_payload(tenant=tenant)
+            actions.append(CommandApi.reply(request=request, text="This is pre-released list, not public yet!"))
+            self.send_release_time_status(tenant=tenant, actions=actions, chat_id=request.chat_id)
+        return actions
+
+    def make_reminder(self, chat_id: int, minutes_left: int) -> list[Action]:
+        return [SendMessage(chat_id=chat_id, text=f"The list will be released in {minutes_left} minute(s)")]
+
+    def prepare_release_payload(self, tenant: Tenant) -> ReleasePayload:
+        """Render the pre-released list, its keyboard and the data written to files after release, unless they
+        have been prepared for the current pre-released list and release time already."""
+        auto_reg_system = tenant.auto_reg_system
+        data = auto_reg_system.pre_released_data
+        release_time = auto_reg_system.release_time_manager.release_time
+        payload = tenant.release_payload
+        if payload is not None and payload.is_prepared_for(data=data, release_time=release_time):
+            return payload
+        main_list_as_str = AutoRegistrationSystem.convert_registrations_to_string(data=data)
+        payload = ReleasePayload(
+            data=data,
+            release_time=release_time,
+            pages=CommandApi.make_page_texts(
+                header="The list is now released!",
+                pages=auto_reg_system.get_all_slots_as_pages(
+                    is_main_data=False,
+                    is_compact=Config.use_compact_list_layout
+                ),
+                text_if_empty="The list is empty!"
+            ),
+            keyboard=CommandApi.make_inline_buttons_for_registration(data=data),
+            main_list_as_str=main_list_as_str,
+            release_time_as_str=auto_reg_system.release_time_manager.release_time_to_str_with_input_time_format(
+                time_manager=self.time_manager
+            )
+        )
+        tenant.release_payload = payload
+        return payload
+
+    def release(self, chat_id: int) -> list[Action]:
+        """Release the pre-released list of the tenant if release time is reached. Run by the job at release time,
+        the job is armed again if it fired marginally before."""
+        tenant = self.get_tenant(chat_id=chat_id)
+        release_time_manager = tenant.auto_reg_system.release_time_manager
+        payload = self.prepare_release_payload(tenant=tenant)  # normally prepared before release
+        actions: list[Action] = []
+        if tenant.auto_reg_system.attempt_release_data(time_manager=self.time_manager):
+            release_delay_in_milliseconds = release_time_manager.compute_delay_in_milliseconds(
+                time_manager=self.time_manager
+            )
+
+            def finish_release(message_ids: list[int]):
+                send_delay_in_milliseconds = release_time_manager.compute_delay_in_milliseconds(
+                    time_manager=self.time_manager
+                )
+                latency_message = (f"The list of chat {tenant.chat_id} is released "
+                                   + f"{release_delay_in_milliseconds:.0f} ms "
+                                   + f"and sent {send_delay_in_milliseconds:.0f} ms after release time")
+                tenant.tracer.log(message=f"(from system) {latency_message}", is_history_required=False)
+                print(latency_message)
+
+                # the rest is not urgent: replace previous list, record history and write all data to files
+                tenant.release_payload = None
+                if payload.data is not None:
+                    tenant.keyboard_cache.adopt_registration_keyboard(data=payload.data, keyboard=payload.keyboard)
+                CommandApi.replace_list_messages(
+                    tenant=tenant,
+                    chat_id=tenant.chat_id,
+                    message_ids=message_ids,
+                    page_texts=payload.pages,
+                    keyboard=payload.keyboard
+                )
+                tenant.tracer.log(message=f"(from system) \n{''.join(payload.pages)}")
+                tenant.data_handler.write_data_to_files(
+                    main_list_as_str=payload.main_list_as_str,
+                    release_time_as_str=payload.release_time_as_str,
+                    pre_released_list_as_str=None
+                )
+
+            CommandApi.post_list_pages(
+                actions=actions,
+                chat_id=tenant.chat_id,
+                reply_to=None,
+                page_texts=payload.pages,
+                keyboard=payload.keyboard,
+                on_posted=finish_release
+            )
+        elif release_time_manager.enabled and self.scheduler is not None:
+            # the job fired marginally before release time, so it is armed again for the remaining time
+            self.scheduler.arm_release(tenant=tenant)
+        return actions
+
+    async def run_notitime(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        is_release_time_set_successfully, message = tenant.auto_reg_system.handle_notitime(
+            username=request.sender.username,
+            message=request.text,
+            time_manager=self.time_manager,
+        )
+        actions: list[Action] = [CommandApi.reply(request=request, text=message)]
+        if is_release_time_set_successfully:
+            if not ChatManager.is_chat_id_allowed(
+                    chat_id=request.chat_id,
+                    allowed_chat_ids=tenant.auto_reg_system.allowed_chat_ids
+            ):
+                actions.append(SendMessage(chat_id=tenant.chat_id, text=message))
+            self.prepare_release_payload(tenant=tenant)
+        if self.scheduler is not None:
+            self.scheduler.arm_release(tenant=tenant)
+
+        # write all data to file
+        tenant.auto_reg_system.write_all_data_to_files(
+            data_handler=tenant.data_handler,
+            time_manager=self.time_manager
+        )
+        return actions
+
+    async def run_reset(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        message = tenant.auto_reg_system.handle_reset(username=request.sender.username)
+        return [CommandApi.reply(request=request, text=message)]
+
+    async def run_reg(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+
+        snapshot = CommandApi.take_snapshot(tenant=tenant)
+        response, suggestion = tenant.auto_reg_system.handle_register(
+            command_string_for_suggestion=Command.COMMAND_DRG,
+            username=request.sender.username,
+            message=request.text,
+            chat_id=request.chat_id
+        )
+        actions: list[Action] = []
+        self.write_data_and_update_bot_message_for_full_list(
+            tenant=tenant,
+            actions=actions,
+            chat_id=request.chat_id,
+            reply_to=request.message_id,
+            message=response,
+            snapshot=snapshot
+        )
+        if suggestion is not None:
+            actions.append(CommandApi.reply(request=request, text=suggestion, parse_mode=MARKDOWN_V2))
+        return actions
+
+    async def run_reserve(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+
+        snapshot = CommandApi.take_snapshot(tenant=tenant)
+        message = tenant.auto_reg_system.handle_reserve(
+            username=request.sender.username,
+            message=request.text,
+            chat_id=request.chat_id
+        )
+        actions: list[Action] = []
+        self.write_data_and_update_bot_message_for_full_list(
+            tenant=tenant,
+            actions=actions,
+            chat_id=request.chat_id,
+            reply_to=request.message_id,
+            message=message,
+            snapshot=snapshot
+        )
+        return actions
+
+    async def run_dereg(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+
+        snapshot = CommandApi.take_snapshot(tenant=tenant)
+        message = tenant.auto_reg_system.handle_deregister(
+            command_string=Command.COMMAND_DRG,
+            username=request.sender.username,
+            id_string=CommandApi.get_id_string(tenant=tenant, sender=request.sender),
+            message=request.text,
+            chat_id=request.chat_id
+        )
+        actions: list[Action] = []
+        self.write_data_and_update_bot_message_for_full_list(
+            tenant=tenant,
+            actions=actions,
+            chat_id=request.chat_id,
+            reply_to=request.message_id,
+            message=message,
+            parse_mode=MARKDOWN_V2,
+            snapshot=snapshot
+        )
+        return actions
+
+    async def run_pos(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request, is_history_required=False)
+        response = tenant.auto_reg_system.handle_pos(
+            id_string=CommandApi.get_id_string(tenant=tenant, sender=request.sender),
+            message=request.text,
+            chat_id=request.chat_id
+        )
+        return [CommandApi.reply(request=request, text=response)]
+
+    async def run_admin(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        return [CommandApi.reply(request=request, text=tenant.auto_reg_system.get_admin_list_as_string())]
+
+    async def run_command_not_found(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        return [CommandApi.reply(request=request, text="Incorrect command/syntax!")]
+
+    async def run_allpending(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+
+        snapshot = CommandApi.take_snapshot(tenant=tenant)
+        message = tenant.auto_reg_system.handle_allpending(
+            username=request.sender.username,
+            chat_id=request.chat_id
+        )
+        actions: list[Action] = []
+        self.write_data_and_update_bot_message_for_full_list(
+            tenant=tenant,
+            actions=actions,
+            chat_id=request.chat_id,
+            reply_to=request.message_id,
+            message=message,
+            snapshot=snapshot
+        )
+        return actions
+
+    async def run_lock(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        message = tenant.auto_reg_system.handle_lock(username=request.sender.username)
+        return [CommandApi.reply(request=request, text=message)]
+
+    async def run_unlock(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        message = tenant.auto_reg_system.handle_unlock(username=request.sender.username)
+        return [CommandApi.reply(request=request, text=message)]
+
+    async def run_history(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+
+        def report_failure() -> list[Action]:
+            return [CommandApi.reply(request=request,
+                                     text="Cannot send file! Admin permission required or connection error")]
+
+        try:
+            file = tenant.auto_reg_system.handle_history(username=request.sender.username, tracer=tenant.tracer)
+        except Exception:
+            return report_failure()
+        return [SendDocument(chat_id=request.chat_id, document=file, reply_to=request.message_id,
+                             on_failed=report_failure)]
+
+    async def run_stats(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request, is_history_required=False)
+        response = tenant.auto_reg_system.handle_stats(username=request.sender.username, metrics=self.metrics,
+                                                       chat_stats=[tenant.keyboard_cache.stats_to_str()])
+        return [CommandApi.reply(request=request, text=response)]
+
+    async def run_profile(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request, is_history_required=False)
+
+        async def send_stats(stats: str):
+            await self.transport.execute(actions=[SendDocument(
+                chat_id=request.chat_id,
+                document=io.BytesIO(stats.encode("utf-8")),
+                file_name=f"profile_{self.time_manager.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                reply_to=request.message_id
+            )])
+
+        try:
+            num_updates = tenant.auto_reg_system.handle_profile(
+                username=request.sender.username,
+                message=request.text
+            )
+            self.metrics.profiler.start(num_updates=num_updates, on_finished=send_stats)
+            return [CommandApi.reply(
+                request=request,
+                text=f"Profiling the next {num_updates} update(s), the stats will be sent here."
+            )]
+        except Exception as e:
+            return [CommandApi.reply(request=request, text=repr(e))]
+
+    async def run_memory(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request, is_history_required=False)
+        try:
+            if tenant.auto_reg_system.handle_memory(username=request.sender.username, message=request.text):
+                self.memory_monitor.stop()
+                response = "Tracing of memory is stopped."
+            else:
+                with Metrics.phase(phase=Metrics.PHASE_RENDER):
+                    response = MemoryMonitor.make_sample() + "\n" + self.memory_monitor.compare_snapshot()
+            return [CommandApi.reply(request=request, text=response)]
+        except Exception as e:
+            return [CommandApi.reply(request=request, text=repr(e))]
+
+    def log_memory_sample(self):
+        """Log the resident memory and the numbers of registration structures, for a periodic job."""
+        self.tracer.log(message=f"(from system) Memory: {MemoryMonitor.make_sample()}", is_history_required=False)
+
+    async def run_aka(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+
+        try:
+            response = tenant.auto_reg_system.handle_aka(
+                sender_id=request.sender.id,
+                sender_full_name=StringParser.process_telegram_full_name(telegram_full_name=request.sender.full_name),
+                message=request.text,
+                mentions=request.mentions
+            )
+            return [CommandApi.reply(request=request, text=response)]
+        except Exception as e:
+            return [CommandApi.reply(request=request, text=repr(e))]
+
+    async def run_help(self, request: ChatRequest) -> list[Action]:
+        tenant = self.get_tenant(chat_id=request.chat_id)
+        CommandApi.log_message_from_user(tenant=tenant, request=request)
+        return [CommandApi.reply(request=request, text=Term.HELP_TEXT)]
+
+    # routes commands to their handlers for transports without routing of their own (Telegram has one handler
+    # per command, see main.py)
+    COMMAND_HANDLERS: dict[str, Callable[["CommandApi", ChatRequest], Awaitable[list[Action]]]] = {
+        Command.COMMAND_START: run_start,
+        Command.COMMAND_HELLO: run_hello,
+        Command.COMMAND_RETRIEVE: run_all,
+        Command.COMMAND_ALL: run_all,
+        Command.COMMAND_NEW: run_new,
+        Command.COMMAND_NOTITIME: run_notitime,
+        Command.COMMAND_RESET: run_reset,
+        Command.COMMAND_REG: run_reg,
+        Command.COMMAND_RG: run_reg,
+        Command.COMMAND_RESERVE: run_reserve,
+        Command.COMMAND_RS: run_reserve,
+        Command.COMMAND_DEREG: run_dereg,
+        Command.COMMAND_DRG: run_dereg,
+        Command.COMMAND_POS: run_pos,
+        Command.COMMAND_ADMIN: run_admin,
+        Command.COMMAND_AV: run_av,
+        Command.COMMAND_ALLPENDING: run_allpending,
+        Command.COMMAND_LOCK: run_lock,
+        Command.COMMAND_UNLOCK: run_unlock,
+        Command.COMMAND_HELP: run_help,
+        Command.COMMAND_HISTORY: run_history,
+        Command.COMMAND_AKA: run_aka,
+        Command.COMMAND_STATS: run_stats,
+        Command.COMMAND_PROFILE: run_profile,
+        Command.COMMAND_MEMORY: run_memory,
+    }
+
+    def find_handler(self, request: ChatRequest) -> Callable[[ChatRequest], Awaitable[list[Action]]] | None:
+        """Return the handler of the request, None for a message that is not a command."""
+        if request.is_button:
+            return self.run_button
+        text = request.text or ""
+        if not text.startswith("/"):
+            return None
+        command = text.split(maxsplit=1)[0][1:].split("@")[0].lower()
+        if request.document is not None:
+            return self.run_new_from_document if command == Command.COMMAND_NEW else None
+        handler = CommandApi.COMMAND_HANDLERS.get(command, CommandApi.run_command_not_found)
+        return getattr(self, handler.__name__)
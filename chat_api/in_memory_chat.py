@@ -0,0 +1,139 @@
+from auto_registration_system.model import Mention
+from chat_api.action import Action, AnswerButton, DeleteMessage, EditMessage, SendDocument, SendMessage
+from chat_api.command_api import CommandApi
+from chat_api.model import ChatRequest, Document, Keyboard, Sender
+from chat_api.transport import Transport
+from metrics import Metrics
+
+
+class ChatMessage:
+    """Represent a message in an in-memory chat, sent by a user (sender) or by the bot (sender is None)"""
+    def __init__(self, chat_id: int, message_id: int, text: str | None, sender: Sender | None = None,
+                 keyboard: Keyboard | None = None, reply_to_message_id: int | None = None):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = text
+        self.sender = sender
+        self.keyboard = keyboard
+        self.reply_to_message_id = reply_to_message_id
+
+
+class InMemoryChat(Transport):
+    """Chats kept in memory, served by CommandApi without network, e.g. for tests and benchmarks.
+
+    Messages of users are handled like updates of the bot (measured by the metrics of the api) and the actions
+    returned are applied to the chats. Message ids are assigned in order, over all chats. Editing or deleting a
+    message that does not exist fails, like it does on Telegram."""
+
+    def __init__(self, api: CommandApi):
+        self._api: CommandApi = api
+        self._api.transport = self
+        self._next_message_id: int = 1
+        self._next_callback_query_id: int = 1
+        self._messages: dict[tuple[int, int], ChatMessage] = dict()  # (chat id, message id) -> message
+        self.executed_actions: list[Action] = []  # in order of execution, failed ones included
+        self.answers: list[AnswerButton] = []
+        self.documents: list[SendDocument] = []
+
+    @property
+    def api(self) -> CommandApi:
+        return self._api
+
+    def get_message(self, chat_id: int, message_id: int) -> ChatMessage | None:
+        return self._messages.get((chat_id, message_id))
+
+    def get_messages(self, chat_id: int) -> list[ChatMessage]:
+        """Return the messages of the chat that are not deleted, oldest first."""
+        return [message for (message_chat_id, _), message in self._messages.items() if message_chat_id == chat_id]
+
+    def get_bot_messages(self, chat_id: int) -> list[ChatMessage]:
+        return [message for message in self.get_messages(chat_id=chat_id) if message.sender is None]
+
+    def add_message(self, chat_id: int, text: str | None, sender: Sender | None = None,
+                    keyboard: Keyboard | None = None, reply_to_message_id: int | None = None) -> ChatMessage:
+        message = ChatMessage(chat_id=chat_id, message_id=self._next_message_id, text=text, sender=sender,
+                              keyboard=keyboard, reply_to_message_id=reply_to_message_id)
+        self._next_message_id += 1
+        self._messages[(chat_id, message.message_id)] = message
+        return message
+
+    async def send(self, chat_id: int, sender: Sender, text: str, mentions: list[Mention] | None = None,
+                   document: Document | None = None) -> list[Action]:
+        """Post a message of sender in the chat and let the bot handle it, return the actions executed."""
+        message = self.add_message(chat_id=chat_id, text=text, sender=sender)
+        return await self.handle(request=ChatRequest(
+            chat_id=chat_id,
+            message_id=message.message_id,
+            sender=sender,
+            text=text,
+            mentions=mentions,
+            document=document
+        ))
+
+    async def press(self, chat_id: int, message_id: int, sender: Sender, callback_data: str) -> list[Action]:
+        """Press a button of a message of the bot and let the bot handle it, return the actions executed."""
+        callback_query_id = str(self._next_callback_query_id)
+        self._next_callback_query_id += 1
+        return await self.handle(request=ChatRequest(
+            chat_id=chat_id,
+            message_id=message_id,
+            sender=sender,
+            callback_data=callback_data,
+            callback_query_id=callback_query_id
+        ))
+
+    async def handle(self, request: ChatRequest) -> list[Action]:
+        handler = self._api.find_handler(request=request)
+        if handler is None:
+            return []
+
+        async def serve(served_request: ChatRequest) -> list[Action]:
+            actions = await handler(served_request)
+            await self.execute(actions=actions)
+            return actions
+
+        return await self._api.metrics.measure(command=handler.__name__.removeprefix("run_"), callback=serve)(request)
+
+    async def release(self, chat_id: int) -> list[Action]:
+        """Run the job at release time of the tenant serving chat_id."""
+        actions = self._api.release(chat_id=chat_id)
+        await self.execute(actions=actions)
+        return actions
+
+    async def delete_queued_messages(self):
+        """Run the job deleting queued messages until no message is queued."""
+        while True:
+            actions = self._api.dequeue_deletions()
+            if len(actions) == 0:
+                return
+            await self.execute(actions=actions)
+
+    async def execute_action(self, action: Action) -> bool:
+        self.executed_actions.append(action)
+        if isinstance(action, SendMessage):
+            with Metrics.api_call(method="sendMessage"):
+                message = self.add_message(chat_id=action.chat_id, text=action.text, keyboard=action.keyboard,
+                                           reply_to_message_id=action.reply_to_message_id)
+            action.message_id = message.message_id
+            if action.on_sent is not None:
+                action.on_sent(message.message_id)
+            return True
+        if isinstance(action, EditMessage):
+            with Metrics.api_call(method="editMessageText"):
+                message = self._messages.get((action.chat_id, action.message_id))
+            if message is None:
+                return False
+            message.text = action.text
+            message.keyboard = action.keyboard
+            return True
+        if isinstance(action, DeleteMessage):
+            return self._messages.pop((action.chat_id, action.message_id), None) is not None
+        if isinstance(action, SendDocument):
+            with Metrics.api_call(method="sendDocument"):
+                self.documents.append(action)
+            return True
+        if isinstance(action, AnswerButton):
+            with Metrics.api_call(method="answerCallbackQuery"):
+                self.answers.append(action)
+            return True
+        return False
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from collections.abc import Callable
+
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from chat_api.model import Keyboard
+from metrics import Metrics
+
+
+class KeyboardCache:
+    """Inline keyboards built from registration data, rebuilt only when the data they depend on changes.
+
+    The registration keyboard (one button per slot) depends on the set of slots, so it is keyed by the slot-set
+    revision of the data. The deregistration keyboard of a user depends on the slots involving that user, so it is
+    keyed by the slot-set revision and the member revision of the user. Everything is dropped when the data
+    object itself is replaced (new list or release). Hits and misses are also counted in metrics if given, which
+    outlive the tenant."""
+
+    def __init__(self, max_num_member_keyboards: int = 256, metrics: Metrics | None = None):
+        self._max_num_member_keyboards: int = max_num_member_keyboards
+        self._data: RegistrationData | None = None
+        self._registration_keyboard: tuple[int, Keyboard] | None = None
+        self._member_keyboards: OrderedDict[tuple[int, str], tuple[tuple[int, int], Keyboard | None]] \
+            = OrderedDict()
+        self._num_hits: int = 0
+        self._num_misses: int = 0
+        self._metrics: Metrics | None = metrics
+
+    @property
+    def num_hits(self) -> int:
+        return self._num_hits
+
+    @property
+    def num_misses(self) -> int:
+        return self._num_misses
+
+    def stats_to_str(self) -> str:
+        return f"keyboard cache: {self._num_hits} hit(s), {self._num_misses} miss(es)"
+
+    def _count_lookup(self, is_hit: bool):
+        if is_hit:
+            self._num_hits += 1
+        else:
+            self._num_misses += 1
+        if self._metrics is not None:
+            self._metrics.count_keyboard_cache_lookup(is_hit=is_hit)
+
+    def _switch_data(self, data: RegistrationData | None):
+        if data is not self._data:
+            self._data = data
+            self._registration_keyboard = None
+            self._member_keyboards.clear()
+
+    def get_registration_keyboard(self, data: RegistrationData | None,
+                                  build: Callable[[], Keyboard]) -> Keyboard:
+        self._switch_data(data=data)
+        revision = data.slot_set_revision if data is not None else -1
+        if self._registration_keyboard is not None and self._registration_keyboard[0] == revision:
+            self._count_lookup(is_hit=True)
+            return self._registration_keyboard[1]
+        self._count_lookup(is_hit=False)
+        keyboard = build()
+        self._registration_keyboard = (revision, keyboard)
+        return keyboard
+
+    def adopt_registration_keyboard(self, data: RegistrationData, keyboard: Keyboard):
+        """Use a keyboard built ahead of time for data, e.g. when data is about to replace the current data."""
+        self._switch_data(data=data)
+        self._registration_keyboard = (data.slot_set_revision, keyboard)
+
+    def get_member_keyboard(self, data: RegistrationData, telegram_id: int, id_string: str,
+                            build: Callable[[], Keyboard | None]) -> Keyboard | None:
+        """Return the deregistration keyboard of a user, None meaning there is no slot to deregister."""
+        self._switch_data(data=data)
+        key = (telegram_id, id_string)
+        revision = (data.slot_set_revision, data.get_member_revision(name=id_string))
+        cached = self._member_keyboards.get(key)
+        if cached is not None and cached[0] == revision:
+            self._member_keyboards.move_to_end(key)
+            self._count_lookup(is_hit=True)
+            return cached[1]
+        self._count_lookup(is_hit=False)
+        keyboard = build()
+        self._member_keyboards[key] = (revision, keyboard)
+        self._member_keyboards.move_to_end(key)
+        if len(self._member_keyboards) > self._max_num_member_keyboards:
+            self._member_keyboards.popitem(last=False)
+        return keyboard
@@ -0,0 +1,53 @@
+from collections.abc import Awaitable, Callable
+from typing import Optional
+
+from auto_registration_system.model import Mention
+
+
+class Sender:
+    """Represent the user sending a message or pressing a button"""
+    def __init__(self, id: int, full_name: str, username: Optional[str] = None, first_name: Optional[str] = None):
+        self.id = id
+        self.full_name = full_name
+        self.username = username
+        self.first_name = first_name if first_name is not None else full_name
+
+
+class Button:
+    """Represent an inline button sending callback_data back to the bot when pressed"""
+    def __init__(self, text: str, callback_data: str):
+        self.text = text
+        self.callback_data = callback_data
+
+
+class Keyboard:
+    """Represent the rows of inline buttons shown below a message"""
+    def __init__(self, rows: list[list[Button]]):
+        self.rows = rows
+
+
+class Document:
+    """Represent a file sent with a message, downloaded only when a command reads it"""
+    def __init__(self, file_name: Optional[str], file_size: Optional[int], download: Callable[[], Awaitable[bytes]]):
+        self.file_name = file_name
+        self.file_size = file_size  # in bytes, if known before downloading
+        self.download = download
+
+
+class ChatRequest:
+    """Represent a message (e.g. a command) or a pressed button, as received from any chat platform"""
+    def __init__(self, chat_id: int, message_id: int, sender: Sender, text: Optional[str] = None,
+                 mentions: Optional[list[Mention]] = None, document: Optional[Document] = None,
+                 callback_data: Optional[str] = None, callback_query_id: Optional[str] = None):
+        self.chat_id = chat_id
+        self.message_id = message_id  # of the message sent, or of the message with the pressed button
+        self.sender = sender
+        self.text = text  # caption if the message has a document
+        self.mentions = mentions if mentions is not None else []
+        self.document = document
+        self.callback_data = callback_data  # set only for a pressed button
+        self.callback_query_id = callback_query_id
+
+    @property
+    def is_button(self) -> bool:
+        return self.callback_query_id is not None
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from chat_api.model import Keyboard
+
+
+class ReleasePayload:
+    """Everything the bot sends and writes when the pre-released list is released, prepared ahead of release time.
+
+    The payload is only valid for the pre-released data object, its revision and the release time it was
+    prepared with."""
+
+    def __init__(self, data: RegistrationData | None, release_time: datetime | None, pages: list[str],
+                 keyboard: Keyboard, main_list_as_str: str | None, release_time_as_str: str | None):
+        self._data: RegistrationData | None = data
+        self._revision: tuple[int, int] | None = data.revision if data is not None else None
+        self._release_time: datetime | None = release_time
+        self._pages: list[str] = pages
+        self._keyboard: Keyboard = keyboard
+        self._main_list_as_str: str | None = main_list_as_str
+        self._release_time_as_str: str | None = release_time_as_str
+
+    @property
+    def data(self) -> RegistrationData | None:
+        return self._data
+
+    @property
+    def pages(self) -> list[str]:
+        """Messages released in order, the keyboard goes with the last one."""
+        return self._pages
+
+    @property
+    def keyboard(self) -> Keyboard:
+        return self._keyboard
+
+    @property
+    def main_list_as_str(self) -> str | None:
+        """Main list written to file after release."""
+        return self._main_list_as_str
+
+    @property
+    def release_time_as_str(self) -> str | None:
+        """Release time written to file after release."""
+        return self._release_time_as_str
+
+    def is_prepared_for(self, data: RegistrationData | None, release_time: datetime | None) -> bool:
+        if data is not self._data or release_time != self._release_time:
+            return False
+        return data is None or data.revision == self._revision
@@ -0,0 +1,103 @@
+import time
+
+from auto_registration_system.auto_registration_system import AutoRegistrationSystem
+from auto_registration_system.data_structure.deletion_queue import DeletionQueue
+from auto_registration_system.data_structure.time_manager import TimeManager
+from data_handler.data_handler import DataHandler
+from chat_api.keyboard_cache import KeyboardCache
+from chat_api.model import Keyboard
+from chat_api.release_payload import ReleasePayload
+from metrics import Metrics
+from tracer import Tracer
+
+from config import Config
+
+
+class Tenant:
+    """State of one group chat: its registration system, files, deletion queue, bot messages and jobs."""
+
+    def __init__(self, chat_id: int, time_manager: TimeManager, metrics: Metrics | None = None):
+        self._chat_id: int = chat_id
+        self._data_handler: DataHandler = Tenant.make_data_handler(chat_id=chat_id)
+        self._tracer: Tracer = self._data_handler.load_tracer(time_manager=time_manager)
+        self._auto_reg_system: AutoRegistrationSystem = AutoRegistrationSystem(
+            admins=Config.admins,
+            identity_manager=self._data_handler.load_identity_manager(),
+            time_manager=time_manager,
+            allowed_chat_ids={chat_id}
+        )
+        self._deletion_queue: DeletionQueue = DeletionQueue()
+        self._keyboard_cache: KeyboardCache = KeyboardCache(metrics=metrics)
+        self.release_payload: ReleasePayload | None = None
+
+        # messages of the bot showing the pages of the list (the last one with keyboard) and available slots,
+        # deleted or edited when they are replaced
+        self.list_chat_id: int | None = None
+        self.list_message_ids: list[int] = []
+        self.list_pages: list[str] = []
+        self.list_keyboard: Keyboard | None = None
+        self.list_posted_time: float | None = None  # time.monotonic() when the list was posted or edited
+        self.last_av_chat_id: int | None = None
+        self.last_av_message_id: int | None = None
+
+        self._last_used_time: float = time.monotonic()
+
+    @staticmethod
+    def make_directory_data(chat_id: int) -> str:
+        # the default chat keeps the layout used before tenants existed
+        if chat_id == Config.default_chat_id:
+            return Config.directory_data
+        return f"{Config.directory_data}/{chat_id}"
+
+    @staticmethod
+    def make_data_handler(chat_id: int) -> DataHandler:
+        return DataHandler(
+            directory_data=Tenant.make_directory_data(chat_id=chat_id),
+            file_name_log=Config.file_name_log,
+            file_name_history=Config.file_name_history,
+            file_name_alias=Config.file_name_alias,
+            file_name_deletion_queue=Config.file_name_deletion_queue,
+            file_name_main_list=Config.file_name_main_list,
+            file_name_release_time=Config.file_name_release_time,
+            file_name_pre_released_list=Config.file_name_pre_released_list
+        )
+
+    @property
+    def chat_id(self) -> int:
+        return self._chat_id
+
+    @property
+    def data_handler(self) -> DataHandler:
+        return self._data_handler
+
+    @property
+    def tracer(self) -> Tracer:
+        return self._tracer
+
+    @property
+    def auto_reg_system(self) -> AutoRegistrationSystem:
+        return self._auto_reg_system
+
+    @property
+    def deletion_queue(self) -> DeletionQueue:
+        return self._deletion_queue
+
+    @property
+    def keyboard_cache(self) -> KeyboardCache:
+        return self._keyboard_cache
+
+    @property
+    def job_name_for_release(self) -> str:
+        return f"{Config.job_name_for_release}_{self._chat_id}"
+
+    @property
+    def idle_time(self) -> float:
+        """Number of seconds since the tenant was used last time."""
+        return time.monotonic() - self._last_used_time
+
+    def touch(self):
+        self._last_used_time = time.monotonic()
+
+    def is_evictable(self) -> bool:
+        # a pending release needs its jobs, and queued messages still have to be deleted
+        return not self._auto_reg_system.release_time_manager.enabled and self._deletion_queue.is_empty()
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from collections.abc import Callable
+
+from chat_api.tenant import Tenant
+
+
+class TenantRegistry:
+    """Tenants keyed by chat id, loaded on first use and unloaded when idle or when too many are in memory.
+
+    Updates from a chat that is not a tenant (e.g. private chat of an admin) go to the tenant it stages lists for."""
+
+    def __init__(self, tenant_chat_ids: set[int], staging_chat_ids: dict[int, int], default_chat_id: int,
+                 max_num_tenants: int, load: Callable[[int], Tenant], unload: Callable[[Tenant], None]):
+        self._tenant_chat_ids: set[int] = tenant_chat_ids
+        self._staging_chat_ids: dict[int, int] = staging_chat_ids
+        self._default_chat_id: int = default_chat_id
+        self._max_num_tenants: int = max_num_tenants
+        self._load: Callable[[int], Tenant] = load
+        self._unload: Callable[[Tenant], None] = unload
+        self._tenants: OrderedDict[int, Tenant] = OrderedDict()  # least recently used first
+
+    @property
+    def loaded_tenants(self) -> list[Tenant]:
+        return list(self._tenants.values())
+
+    @staticmethod
+    def resolve(chat_id: int, tenant_chat_ids: set[int], staging_chat_ids: dict[int, int], default_chat_id: int) \
+            -> int:
+        """Return the chat id of the tenant serving chat_id."""
+        if chat_id in tenant_chat_ids:
+            return chat_id
+        return staging_chat_ids.get(chat_id, default_chat_id)
+
+    def resolve_tenant_chat_id(self, chat_id: int) -> int:
+        return TenantRegistry.resolve(
+            chat_id=chat_id,
+            tenant_chat_ids=self._tenant_chat_ids,
+            staging_chat_ids=self._staging_chat_ids,
+            default_chat_id=self._default_chat_id
+        )
+
+    def is_loaded(self, chat_id: int) -> bool:
+        return self.resolve_tenant_chat_id(chat_id=chat_id) in self._tenants
+
+    def get(self, chat_id: int) -> Tenant:
+        tenant_chat_id = self.resolve_tenant_chat_id(chat_id=chat_id)
+        tenant = self._tenants.get(tenant_chat_id)
+        if tenant is None:
+            tenant = self._load(tenant_chat_id)
+            self._tenants[tenant_chat_id] = tenant
+            self._evict_over_limit()
+        else:
+            self._tenants.move_to_end(tenant_chat_id)
+        tenant.touch()
+        return tenant
+
+    def evict_idle(self, idle_time: float) -> list[int]:
+        """Unload every evictable tenant unused for at least idle_time seconds, return their chat ids."""
+        evicted_chat_ids = [
+            tenant.chat_id for tenant in self._tenants.values()
+            if tenant.idle_time >= idle_time and tenant.is_evictable()
+        ]
+        for chat_id in evicted_chat_ids:
+            self._evict(chat_id=chat_id)
+        return evicted_chat_ids
+
+    def _evict_over_limit(self):
+        # the most recently used tenant is never evicted, tenants waiting for release are kept even over limit
+        candidates = [tenant.chat_id for tenant in list(self._tenants.values())[:-1] if tenant.is_evictable()]
+        for chat_id in candidates[:max(0, len(self._tenants) - self._max_num_tenants)]:
+            self._evict(chat_id=chat_id)
+
+    def _evict(self, chat_id: int):
+        self._unload(self._tenants.pop(chat_id))
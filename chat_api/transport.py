@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+
+from chat_api.action import Action
+from chat_api.tenant import Tenant
+
+
+class Transport(ABC):
+    """Executes the actions returned by CommandApi on a chat platform.
+
+    Actions are executed in order. If an action with on_failed fails, the following actions with the same
+    on_failed are skipped and the actions returned by on_failed are executed instead (e.g. the list is posted
+    again if editing it failed). Other failures are handled by the transport itself."""
+
+    async def execute(self, actions: list[Action]):
+        failed_groups: list = []  # on_failed of the actions that failed
+        for action in actions:
+            on_failed = getattr(action, "on_failed", None)
+            if on_failed is not None and on_failed in failed_groups:
+                continue
+            if not await self.execute_action(action=action) and on_failed is not None:
+                failed_groups.append(on_failed)
+                await self.execute(actions=on_failed())
+
+    @abstractmethod
+    async def execute_action(self, action: Action) -> bool:
+        """Execute one action, return False if it failed."""
+
+
+class Scheduler(ABC):
+    """Runs the jobs of CommandApi at their time: release and reminders of tenants, deleting queued messages and
+    unloading idle tenants."""
+
+    @abstractmethod
+    def arm_release(self, tenant: Tenant):
+        """Arm jobs at the reminder times and the release time of tenant, replacing jobs armed before."""
+
+    @abstractmethod
+    def disarm_release(self, tenant: Tenant):
+        """Remove the jobs armed for tenant, e.g. when it is unloaded."""
+
+    @abstractmethod
+    def start_maintenance(self):
+        """Start (or restart) the repeating jobs deleting queued messages and unloading idle tenants."""
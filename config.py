@@ -4,20 +4,67 @@ from pytz.tzinfo import StaticTzInfo
 
 class Config:
     admins: set[str] = {"khaihanhtang", "bibi_tran", "ledung_jenny"}
+    # every allowed chat is a tenant with its own lists, release time, aliases, history and jobs
     allowed_chat_ids: set[int] = {-1002228202437, -4273658267}  # official
-    default_chat_id = -1002228202437  # official
+    default_chat_id = -1002228202437  # official, its data stays directly in directory_data
     # allowed_chat_ids: set[int] = {-4273658267}  # test
     # default_chat_id = -4273658267  # test
     time_zone: StaticTzInfo = pytz.timezone("Asia/Singapore")
     input_time_format: str = "%H:%M:%S %d/%m/%Y"
     output_time_format: str = "%H:%M:%S %A %d-%B-%Y (%Z)"
 
+    # variables for receiving updates (long polling is used when use_webhook is False)
+    use_webhook: bool = False
+    webhook_listen: str = "0.0.0.0"
+    webhook_port: int = 8443
+    webhook_url_path: str = "telegram"  # Telegram posts updates to http://<listen>:<port>/<webhook_url_path>
+    webhook_health_path: str = "health"  # GET http://<listen>:<port>/<webhook_health_path> for health checks
+    webhook_url: str | None = None  # public https url registered with Telegram, e.g. https://example.com/telegram
+    webhook_secret_token: str | None = None  # TELEGRAM_WEBHOOK_SECRET in environment variables takes precedence
+
+    # variables for metrics of handled updates (shown to admins by /stats)
+    metrics_port: int | None = None  # e.g. 9100 to serve metrics in Prometheus format (shard workers add their index)
+    metrics_listen: str = "127.0.0.1"
+    metrics_path: str = "metrics"  # Prometheus scrapes http://<metrics_listen>:<metrics_port>/<metrics_path>
+    default_num_profiled_updates: int = 50  # for /profile without a number
+    max_num_profiled_updates: int = 1000
+    # the event loop not running for longer than this number of seconds (e.g. a blocking call in a handler) is
+    # logged with the running handler and its stack, and shown by /stats (None turns the watchdog off)
+    event_loop_lag_threshold: float | None = 0.25
+    interval_for_checking_event_loop: float = 0.1  # this is the number of seconds between heartbeats
+    job_name_for_sampling_memory: str = "memory"  # used when creating job for the bot to log memory usage
+    repeating_interval_for_sampling_memory: int | None = 3600  # seconds between samples (None turns them off)
+
+    # variables for serving many group chats (tenants) in one process
+    # other chats, e.g. private chats of admins, stage lists for the tenant mapped here or for default_chat_id
+    staging_chat_ids: dict[int, int] = {}  # staging chat id -> tenant chat id
+    max_num_tenants_in_memory: int = 32  # least recently used idle tenants are written to files and unloaded
+    idle_time_for_evicting_tenant: int = 3600  # this is the number of seconds without updates before unloading
+    job_name_for_evicting: str = "evict"  # used when creating job for the telegram bot to unload idle tenants
+    repeating_interval_for_evicting: int = 300  # this is the number of seconds between checks for idle tenants
+
+    # variables for sharding updates over worker processes by chat id (0 runs everything in one process)
+    # the ingress process receives updates by long polling and forwards them to workers over Unix sockets
+    num_shard_workers: int = 0
+    shard_socket_directory: str = "data/shards"
+    max_num_buffered_updates_per_shard: int = 1000  # updates kept for a worker while it is restarting
+    interval_for_checking_shard_workers: float = 1.0  # this is the number of seconds between checks
+
     # variables for setting the list of players
     max_num_players_per_slot = 50
+    max_size_of_list_document: int = 1000000  # bytes of a text document uploaded with /new as caption
+    # pending reservations of members (names set by /aka) are promoted before those of guests (any other name)
+    prioritize_members_in_waitlist: bool = False
+
+    # variables for showing the list
+    max_list_page_length: int = 4000  # the list is split into messages of this length (Telegram allows 4096)
+    use_compact_list_layout: bool = False  # collapse runs of empty positions into one line
+    edit_list_in_place: bool = False  # edit changed pages of the list instead of posting the whole list again
+    notify_changes_only: bool = False  # after a change, send what changed (e.g. "Alice → slot a #12") instead
+    interval_for_refreshing_full_list: int = 600  # seconds after which the entire list is posted again on change
 
     # variables for release time
-    job_name_for_release: str = "release"  # used when creating job for the telegram bot to run before release
-    repeating_interval_for_release: float = 3  # number of seconds after every 2 consecutive repeats
+    job_name_for_release: str = "release"  # used (with chat id) when creating jobs for the bot to remind and release
     reminder_time_list: list[int] = [5]  # this is the list of numbers of minutes
 
     # variables for deleting messages
@@ -1,3 +1,4 @@
+import logging
 import os
 
 from auto_registration_system.data_structure.identity_manager import IdentityManager
@@ -70,21 +71,28 @@ class DataHandler:
             with open(file=self._full_file_name_main_list, mode="r", encoding="utf-8") as text_file:
                 main_list_as_str: str = text_file.read()
         except Exception:
-            print(f"File {self._full_file_name_main_list} may not exist or error!")
+            logging.info(msg=f"File {self._full_file_name_main_list} may not exist or error!")
 
         try:
             with open(file=self._full_file_name_release_time, mode="r", encoding="utf-8") as text_file:
                 release_time_as_str: str = text_file.read()
         except Exception:
-            print(f"File {self._full_file_name_release_time} may not exist or error!")
+            logging.info(msg=f"File {self._full_file_name_release_time} may not exist or error!")
 
         try:
             with open(file=self._full_file_name_pre_released_list, mode="r", encoding="utf-8") as text_file:
                 pre_released_list_as_str: str = text_file.read()
         except Exception:
-            print(f"File {self._full_file_name_pre_released_list} may not exist or error!")
+            logging.info(msg=f"File {self._full_file_name_pre_released_list} may not exist or error!")
         return main_list_as_str, release_time_as_str, pre_released_list_as_str
 
+    def read_release_time_from_file(self) -> str | None:
+        try:
+            with open(file=self._full_file_name_release_time, mode="r", encoding="utf-8") as text_file:
+                return text_file.read()
+        except Exception:
+            return None
+
     def load_identity_manager(self) -> IdentityManager:
         return IdentityManager(file_name_alias=self._full_file_name_alias)
 
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from collections.abc import Callable
+from types import FrameType
+
+
+class Stall:
+    """A time the event loop did not get to run for longer than the threshold, with a sample of its stack."""
+
+    def __init__(self, start_time: float, command: str | None, stack: list[str]):
+        self.start_time: float = start_time  # time.monotonic() of the last heartbeat before the stall
+        self.duration: float | None = None  # seconds, known once the event loop runs again
+        self.command: str | None = command  # measured handler running when the stall was detected, if any
+        self.stack: list[str] = stack  # formatted frames of the event loop thread, innermost last
+
+
+class LoopWatchdog:
+    """Measures the lag of the event loop with a heartbeat task, and samples the stack of the loop from a thread
+    when the heartbeat is late by more than a threshold, i.e. when a blocking call is running in a coroutine.
+
+    The heartbeat and the thread wake up once per interval each, so the watchdog can stay on in production."""
+    NUM_STACK_FRAMES = 12  # innermost frames kept per stall
+    NUM_RECENT_STALLS = 20
+
+    def __init__(self, observe_lag: Callable[[float], None],
+                 find_command: Callable[[FrameType], str | None]):
+        self._observe_lag: Callable[[float], None] = observe_lag  # called with the lag of every heartbeat
+        self._find_command: Callable[[FrameType], str | None] = find_command
+        self._threshold: float = 0.0
+        self._interval: float = 0.0
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop_event: threading.Event = threading.Event()
+        self._lock: threading.Lock = threading.Lock()  # guards the fields below, shared with the thread
+        self._last_beat_time: float = 0.0
+        self._current_stall: Stall | None = None
+        self._recent_stalls: deque[Stall] = deque(maxlen=LoopWatchdog.NUM_RECENT_STALLS)
+        self._num_stalls: int = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def num_stalls(self) -> int:
+        return self._num_stalls
+
+    def get_recent_stalls(self) -> list[Stall]:
+        """Return the latest stalls, oldest first."""
+        with self._lock:
+            return list(self._recent_stalls)
+
+    def start(self, threshold: float, interval: float):
+        """Watch the running event loop, reporting stalls longer than threshold seconds."""
+        if self.is_running:
+            raise RuntimeError("Watchdog of event loop is already running!")
+        self._threshold = threshold
+        self._interval = interval
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat_time = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop_watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._task.cancel()
+        self._task = None
+        self._thread.join()
+        self._thread = None
+
+    async def _beat(self):
+        while True:
+            expected_time = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected_time)
+            self._observe_lag(lag)
+            with self._lock:
+                self._last_beat_time = now
+                stall = self._current_stall
+                self._current_stall = None
+            if stall is not None:
+                stall.duration = lag
+                logging.warning(msg=f"Event loop was blocked for {lag:.3f} s"
+                                    + (f" by {stall.command}" if stall.command is not None else ""))
+
+    def _watch(self):
+        while not self._stop_event.wait(timeout=self._interval):
+            with self._lock:
+                lag = time.monotonic() - self._last_beat_time - self._interval
+                if lag < self._threshold or self._current_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stall = Stall(
+                    start_time=self._last_beat_time,
+                    command=self._find_command(frame) if frame is not None else None,
+                    stack=traceback.format_stack(f=frame, limit=LoopWatchdog.NUM_STACK_FRAMES)
+                    if frame is not None else []
+                )
+                self._current_stall = stall
+                self._recent_stalls.append(stall)
+                self._num_stalls += 1
+            logging.warning(msg=f"Event loop is blocked for more than {lag:.3f} s"
+                                + (f" by {stall.command}" if stall.command is not None else "")
+                                + ":\n" + "".join(stall.stack))
@@ -1,20 +1,23 @@
 from telegram.ext import (ApplicationBuilder, CommandHandler, MessageHandler, CallbackQueryHandler, Application, ExtBot,
-                          CallbackContext, JobQueue)
+                          CallbackContext, JobQueue, Updater)
 from telegram.ext import filters
 
+from telegram import Bot, Update
+
 from telegram_adapter.telegram_command_handler import TelegramCommandHandler
 from auto_registration_system.command import Command
+from config import Config
 
+import asyncio
 import logging
 import os
+import secrets
 
 
 def main() -> (Application[
     ExtBot[None], CallbackContext[ExtBot[None], dict, dict, dict], dict, dict, dict, JobQueue[
-        CallbackContext[ExtBot[None], dict, dict, dict]]],
+        CallbackContext[ExtBot[None], dict, dict, dict]]] | None,
                logging.Logger):
-    TelegramCommandHandler.initialize()
-
     if "TELEGRAM_BOT_TOKEN" in os.environ:
         print("Found TELEGRAM_BOT_TOKEN in environment variables.")
         token: str = os.environ["TELEGRAM_BOT_TOKEN"]
@@ -25,84 +28,252 @@ def main() -> (Application[
 
     to_be_returned_logger: logging.Logger = logging.getLogger(__name__)
 
-    to_be_returned_app = (
+    if Config.num_shard_workers > 0:
+        asyncio.run(run_shard_ingress(token=token))
+        return None, to_be_returned_logger
+
+    TelegramCommandHandler.initialize()
+    to_be_returned_app = build_application(token=token)
+
+    if Config.use_webhook:
+        asyncio.run(run_webhook(application=to_be_returned_app, secret_token=get_webhook_secret_token()))
+    else:
+        to_be_returned_app.run_polling()
+    return to_be_returned_app, to_be_returned_logger
+
+
+def build_application(token: str, has_updater: bool = True, base_url: str | None = None) -> Application:
+    """Build the application with all handlers. Workers of shards get updates from the ingress, not an updater.
+    base_url replaces the url of the Bot API, e.g. by a local stand-in for rehearsing release."""
+    builder = (
         ApplicationBuilder()
         .token(token)
         .read_timeout(60)
         .write_timeout(60)
-        .build()
+        .post_init(TelegramCommandHandler.post_init)
     )
+    if not has_updater:
+        builder = builder.updater(None)
+    if base_url is not None:
+        builder = builder.base_url(base_url)
+    application = builder.build()
 
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_START, callback=TelegramCommandHandler.run_start)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_HELLO, callback=TelegramCommandHandler.run_hello)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_RETRIEVE, callback=TelegramCommandHandler.run_all)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_ALL, callback=TelegramCommandHandler.run_all)
     )  # same as /retrieve
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_NEW, callback=TelegramCommandHandler.run_new)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
+        MessageHandler(
+            filters=filters.Document.ALL & filters.CaptionRegex(rf"^/{Command.COMMAND_NEW}(@\w+)?(\s|$)"),
+            callback=TelegramCommandHandler.run_new_from_document
+        )
+    )
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_NOTITIME, callback=TelegramCommandHandler.run_notitime)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_RESET, callback=TelegramCommandHandler.run_reset)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_REG, callback=TelegramCommandHandler.run_reg)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_RG, callback=TelegramCommandHandler.run_reg)
     )  # same as /reg
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_RESERVE, callback=TelegramCommandHandler.run_reserve)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_RS, callback=TelegramCommandHandler.run_reserve)
     )  # same as /reserve
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_DEREG, callback=TelegramCommandHandler.run_dereg)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_DRG, callback=TelegramCommandHandler.run_dereg)
     )  # same as /drg
-    to_be_returned_app.add_handler(
+    application.add_handler(
+        CommandHandler(command=Command.COMMAND_POS, callback=TelegramCommandHandler.run_pos)
+    )
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_ADMIN, callback=TelegramCommandHandler.run_admin)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_AV, callback=TelegramCommandHandler.run_av)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_ALLPENDING, callback=TelegramCommandHandler.run_allpending)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_LOCK, callback=TelegramCommandHandler.run_lock)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_UNLOCK, callback=TelegramCommandHandler.run_unlock)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_HELP, callback=TelegramCommandHandler.run_help)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_HISTORY, callback=TelegramCommandHandler.run_history)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
         CommandHandler(command=Command.COMMAND_AKA, callback=TelegramCommandHandler.run_aka)
     )
-    to_be_returned_app.add_handler(
+    application.add_handler(
+        CommandHandler(command=Command.COMMAND_STATS, callback=TelegramCommandHandler.run_stats)
+    )
+    application.add_handler(
+        CommandHandler(command=Command.COMMAND_PROFILE, callback=TelegramCommandHandler.run_profile)
+    )
+    application.add_handler(
+        CommandHandler(command=Command.COMMAND_MEMORY, callback=TelegramCommandHandler.run_memory)
+    )
+    application.add_handler(
         MessageHandler(filters=filters.COMMAND, callback=TelegramCommandHandler.run_command_not_found)
     )
-    to_be_returned_app.add_handler(CallbackQueryHandler(TelegramCommandHandler.handle_buttons))
+    application.add_handler(CallbackQueryHandler(TelegramCommandHandler.handle_buttons))
 
-    to_be_returned_app.run_polling()
-    return to_be_returned_app, to_be_returned_logger
+    # every update is measured under the name of its handler, e.g. reg for /reg and /rg (handle_buttons names
+    # buttons once they are decoded)
+    for handler in application.handlers[0]:
+        handler.callback = TelegramCommandHandler.metrics.measure(
+            command=handler.callback.__name__.removeprefix("run_"),
+            callback=handler.callback
+        )
+
+    return application
+
+
+def get_webhook_secret_token() -> str:
+    if "TELEGRAM_WEBHOOK_SECRET" in os.environ:
+        print("Found TELEGRAM_WEBHOOK_SECRET in environment variables.")
+        return os.environ["TELEGRAM_WEBHOOK_SECRET"]
+    if Config.webhook_secret_token is not None:
+        return Config.webhook_secret_token
+    # Telegram only accepts characters A-Z, a-z, 0-9, _ and - in secret tokens
+    print("Secret token for webhook is generated randomly. Set TELEGRAM_WEBHOOK_SECRET to post updates locally.")
+    return secrets.token_urlsafe(32)
+
+
+async def run_webhook(application: Application, secret_token: str):
+    # imported here so that aiohttp is only required in webhook mode
+    from telegram_adapter.webhook_server import WebhookServer
+
+    webhook_server = WebhookServer(
+        application=application,
+        listen=Config.webhook_listen,
+        port=Config.webhook_port,
+        url_path=Config.webhook_url_path,
+        health_path=Config.webhook_health_path,
+        secret_token=secret_token
+    )
+    async with application:
+        await application.post_init(application)  # run_polling would do this by itself
+        if Config.webhook_url is not None:
+            await application.bot.set_webhook(
+                url=Config.webhook_url,
+                allowed_updates=Update.ALL_TYPES,
+                secret_token=secret_token
+            )
+            print(f"Webhook is registered at {Config.webhook_url}")
+        else:
+            print("Config.webhook_url is not set! Only updates posted locally will be received.")
+        await application.start()
+        await webhook_server.start()
+        try:
+            await asyncio.Event().wait()  # serve until interrupted
+        finally:
+            await webhook_server.stop()
+            await application.stop()
+
+
+def make_shard_socket_path(worker_index: int) -> str:
+    return f"{Config.shard_socket_directory}/worker_{worker_index}.sock"
+
+
+def run_shard_worker(worker_index: int, token: str):
+    """Entry point of a worker process, serving the tenants whose chats are mapped to worker_index."""
+    TelegramCommandHandler.initialize(worker_index=worker_index, num_workers=Config.num_shard_workers)
+    application = build_application(token=token, has_updater=False)
+    asyncio.run(serve_shard_worker(application=application, socket_path=make_shard_socket_path(worker_index)))
+
+
+async def serve_shard_worker(application: Application, socket_path: str):
+    from telegram_adapter.shard import ShardWorkerServer
+
+    worker_server = ShardWorkerServer(application=application, socket_path=socket_path)
+    async with application:
+        await application.post_init(application)
+        await application.start()
+        await worker_server.start()
+        try:
+            await asyncio.Event().wait()  # serve until terminated by the ingress
+        finally:
+            await worker_server.stop()
+            await application.stop()
+
+
+async def run_shard_ingress(token: str):
+    """Receive updates by long polling and forward them to worker processes, restarting workers that exit.
+
+    Tenants are mapped to workers by chat id, so a restarted worker loads the same tenants from files and gets
+    the updates buffered while it was down."""
+    import multiprocessing
+
+    from telegram_adapter.shard import ShardIngress, ShardRouter, ShardSupervisor
+
+    os.makedirs(Config.shard_socket_directory, exist_ok=True)
+    process_context = multiprocessing.get_context("spawn")
+
+    def start_worker(worker_index: int) -> multiprocessing.process.BaseProcess:
+        process = process_context.Process(
+            target=run_shard_worker,
+            args=(worker_index, token),
+            name=f"shard_worker_{worker_index}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    supervisor = ShardSupervisor(
+        num_workers=Config.num_shard_workers,
+        start_worker=start_worker,
+        interval_for_checking=Config.interval_for_checking_shard_workers
+    )
+    ingress = ShardIngress(
+        router=ShardRouter(
+            num_workers=Config.num_shard_workers,
+            tenant_chat_ids=Config.allowed_chat_ids,
+            staging_chat_ids=Config.staging_chat_ids,
+            default_chat_id=Config.default_chat_id
+        ),
+        socket_paths=[make_shard_socket_path(worker_index) for worker_index in range(Config.num_shard_workers)],
+        max_num_buffered_updates=Config.max_num_buffered_updates_per_shard
+    )
+    updater = Updater(bot=Bot(token=token), update_queue=ingress.update_queue)
+    supervisor.start()
+    try:
+        async with updater:
+            await updater.start_polling(allowed_updates=Update.ALL_TYPES)
+            print(f"Updates are forwarded to {Config.num_shard_workers} shard workers")
+            try:
+                await asyncio.gather(ingress.forward_updates(), supervisor.watch())
+            finally:
+                await updater.stop()
+                await ingress.stop()
+    finally:
+        supervisor.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+import os
+
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.data_structure.slot_manager import SlotManager
+
+
+class MemoryMonitor:
+    """Compares tracemalloc snapshots of the process on request, and samples the resident memory and the number of
+    objects of the registration structures, to find out whether memory grows in long-running instances.
+
+    tracemalloc slows down allocations, so tracing only starts with the first snapshot and runs until stopped.
+    Samples run on the event loop, so objects are counted from the weak sets kept by their classes instead of
+    walking the heap."""
+    NUM_LINES = 20  # allocation sites listed per comparison
+    COUNTED_TYPES: tuple[type, ...] = (SlotManager, RegistrationData)
+
+    def __init__(self):
+        self._previous_snapshot = None  # tracemalloc.Snapshot taken by the last comparison
+
+    @property
+    def is_tracing(self) -> bool:
+        return self._previous_snapshot is not None
+
+    def compare_snapshot(self) -> str:
+        """Take a snapshot and return the allocation sites (file and line) which grew most since the previous one.
+        The first snapshot starts tracing, so there is nothing to compare it with."""
+        # imported here so that tracemalloc is only loaded when snapshots are requested
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+            tracemalloc.Filter(inclusive=False, filename_pattern="<frozen importlib._bootstrap*>"),
+        ))
+        previous_snapshot = self._previous_snapshot
+        self._previous_snapshot = snapshot
+        current_size, peak_size = tracemalloc.get_traced_memory()
+        lines = [f"Traced memory {current_size / 1e6:.1f} MB (peak {peak_size / 1e6:.1f} MB)"]
+        if previous_snapshot is None:
+            lines.append("Tracing started, send the command again to compare with this snapshot.")
+            return "\n".join(lines)
+        lines.append(f"Top {MemoryMonitor.NUM_LINES} allocation sites by growth since the previous snapshot:")
+        for stat in snapshot.compare_to(old_snapshot=previous_snapshot, key_type="lineno")[:MemoryMonitor.NUM_LINES]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks) "
+                         + f"{MemoryMonitor.shorten_file_name(frame.filename)}:{frame.lineno}, "
+                         + f"{stat.size / 1024:.1f} KiB in total")
+        return "\n".join(lines)
+
+    def stop(self):
+        """Stop tracing and forget the previous snapshot."""
+        import tracemalloc
+
+        tracemalloc.stop()
+        self._previous_snapshot = None
+
+    @staticmethod
+    def shorten_file_name(file_name: str) -> str:
+        """Return the last two parts of the path, e.g. data_structure/slot_manager.py."""
+        return "/".join(file_name.replace(os.sep, "/").split("/")[-2:])
+
+    @staticmethod
+    def get_rss() -> int | None:
+        """Return the resident set size of the process in bytes, or None where /proc is not available."""
+        try:
+            with open("/proc/self/statm", encoding="utf-8") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    @staticmethod
+    def count_objects() -> dict[str, int]:
+        """Return the number of live objects of each of COUNTED_TYPES (including garbage in reference cycles not
+        collected yet)."""
+        return {counted_type.__name__: counted_type.count_instances() for counted_type in MemoryMonitor.COUNTED_TYPES}
+
+    @staticmethod
+    def make_sample() -> str:
+        rss = MemoryMonitor.get_rss()
+        return ", ".join(
+            [f"RSS {rss / 1e6:.1f} MB" if rss is not None else "RSS unknown"]
+            + [f"{name} {count}" for name, count in MemoryMonitor.count_objects().items()]
+        )
@@ -0,0 +1,404 @@
+import bisect
+import contextvars
+import functools
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from types import FrameType
+
+from loop_watchdog import LoopWatchdog
+from profiler import UpdateProfiler
+
+
+class Histogram:
+    """Counts of durations (in seconds) in buckets with fixed upper bounds, enough for percentiles and for
+    exposing in Prometheus format."""
+    BOUNDS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                                 10.0, 30.0)
+
+    def __init__(self):
+        self._bucket_counts: list[int] = [0] * (len(Histogram.BOUNDS) + 1)  # the last bucket has no upper bound
+        self._count: int = 0
+        self._sum: float = 0.0
+        self._max: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    @property
+    def mean(self) -> float | None:
+        return self._sum / self._count if self._count > 0 else None
+
+    def observe(self, value: float):
+        self._bucket_counts[bisect.bisect_left(Histogram.BOUNDS, value)] += 1
+        self._count += 1
+        self._sum += value
+        if value > self._max:
+            self._max = value
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return the upper bound of the bucket holding the percentile (at most the maximum observed value)."""
+        if self._count == 0:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * self._count))
+        num_seen = 0
+        for bound, bucket_count in zip(Histogram.BOUNDS, self._bucket_counts):
+            num_seen += bucket_count
+            if num_seen >= rank:
+                return min(bound, self._max)
+        return self._max
+
+    def get_cumulative_bucket_counts(self) -> list[(float, int)]:
+        """Return (upper bound, number of values at most the bound) for every bucket, the last bound being inf."""
+        res: list[(float, int)] = []
+        num_seen = 0
+        for bound, bucket_count in zip(Histogram.BOUNDS + (math.inf,), self._bucket_counts):
+            num_seen += bucket_count
+            res.append((bound, num_seen))
+        return res
+
+
+class CommandMeasurement:
+    """Time spent in each phase by the handling of one update.
+
+    Phases may be nested (e.g. a file written while rendering), in which case the time only counts for the
+    innermost one."""
+
+    def __init__(self, command: str):
+        self.command: str = command
+        self.outcome: str = Metrics.OUTCOME_OK
+        self.phase_durations: dict[str, float] = dict()
+        self.api_calls: dict[str, int] = dict()  # method of the Bot API -> number of calls caused by the update
+        self._phase_stack: list[list] = []  # [phase, time.perf_counter() when the phase was entered or resumed]
+
+    def enter_phase(self, phase: str):
+        now = time.perf_counter()
+        if len(self._phase_stack) > 0:
+            outer = self._phase_stack[-1]
+            self.phase_durations[outer[0]] = self.phase_durations.get(outer[0], 0.0) + now - outer[1]
+        self._phase_stack.append([phase, now])
+
+    def count_api_call(self, method: str):
+        self.api_calls[method] = self.api_calls.get(method, 0) + 1
+
+    def exit_phase(self):
+        now = time.perf_counter()
+        phase, start_time = self._phase_stack.pop()
+        self.phase_durations[phase] = self.phase_durations.get(phase, 0.0) + now - start_time
+        if len(self._phase_stack) > 0:
+            self._phase_stack[-1][1] = now
+
+
+_current_measurement: contextvars.ContextVar[CommandMeasurement | None] = contextvars.ContextVar(
+    "current_measurement",
+    default=None
+)
+
+
+class PhaseTimer:
+    """Context manager adding the time spent inside to a phase of the update being measured, if there is one."""
+    __slots__ = ("_phase", "_measurement")
+
+    def __init__(self, phase: str):
+        self._phase: str = phase
+        self._measurement: CommandMeasurement | None = None
+
+    def __enter__(self):
+        self._measurement = _current_measurement.get()
+        if self._measurement is not None:
+            self._measurement.enter_phase(self._phase)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._measurement is not None:
+            self._measurement.exit_phase()
+        return False
+
+
+class Metrics:
+    """Latency histograms (total and per phase) and counters by command and outcome of the handled updates."""
+    PHASE_PARSE = "parse"
+    PHASE_MUTATE = "mutate"
+    PHASE_RENDER = "render"
+    PHASE_PERSIST = "persist"
+    PHASE_NETWORK = "network"
+    PHASES: tuple[str, ...] = (PHASE_PARSE, PHASE_MUTATE, PHASE_RENDER, PHASE_PERSIST, PHASE_NETWORK)
+    TOTAL = "total"
+    OTHER = "other"  # total minus the phases
+
+    OUTCOME_OK = "ok"
+    OUTCOME_REJECTED = "rejected"  # e.g. syntax error or permission denied, reported to the user
+    OUTCOME_ERROR = "error"  # the handler raised
+
+    THROUGHPUT_WINDOW = 60  # seconds
+    NUM_REPORTED_STALLS = 3  # latest stalls of the event loop shown in the report
+
+    def __init__(self):
+        self._start_time: float = time.monotonic()
+        self._counts: dict[(str, str), int] = dict()
+        self._histograms: dict[(str, str), Histogram] = dict()
+        self._recent_end_times: deque[float] = deque()
+        self._api_call_counts: dict[(str, str), int] = dict()  # (command, method) -> number of calls
+        self._num_keyboard_cache_hits: int = 0  # of the keyboard caches of all tenants, also the unloaded ones
+        self._num_keyboard_cache_misses: int = 0
+        self._profiler: UpdateProfiler = UpdateProfiler()
+        self._loop_lag_histogram: Histogram = Histogram()
+        self._watchdog: LoopWatchdog = LoopWatchdog(
+            observe_lag=self._loop_lag_histogram.observe,
+            find_command=Metrics.find_command
+        )
+
+    @staticmethod
+    def phase(phase: str) -> PhaseTimer:
+        return PhaseTimer(phase=phase)
+
+    @staticmethod
+    def count_api_call(method: str):
+        """Count a call of the Bot API (or one queued, e.g. deleteMessage) for the update being measured."""
+        measurement = _current_measurement.get()
+        if measurement is not None:
+            measurement.count_api_call(method=method)
+
+    @staticmethod
+    def api_call(method: str) -> PhaseTimer:
+        """Count a call of the Bot API for the update being measured and time it as network."""
+        Metrics.count_api_call(method=method)
+        return PhaseTimer(phase=Metrics.PHASE_NETWORK)
+
+    @staticmethod
+    def get_current_measurement() -> CommandMeasurement | None:
+        return _current_measurement.get()
+
+    @staticmethod
+    def set_command(command: str):
+        """Record the update being measured under command, e.g. once a pressed button is decoded."""
+        measurement = _current_measurement.get()
+        if measurement is not None:
+            measurement.command = command
+
+    @staticmethod
+    def set_outcome(outcome: str):
+        measurement = _current_measurement.get()
+        if measurement is not None:
+            measurement.outcome = outcome
+
+    @staticmethod
+    def find_command(frame: FrameType) -> str | None:
+        """Return the command of the innermost measured update in the stack of frame, e.g. sampled from another
+        thread, where the current measurement cannot be read."""
+        while frame is not None:
+            if frame.f_code is _MEASURED_CALLBACK_CODE:
+                measurement = frame.f_locals.get("measurement")
+                if measurement is not None:
+                    return measurement.command
+            frame = frame.f_back
+        return None
+
+    @property
+    def profiler(self) -> UpdateProfiler:
+        return self._profiler
+
+    @property
+    def watchdog(self) -> LoopWatchdog:
+        return self._watchdog
+
+    @property
+    def loop_lag_histogram(self) -> Histogram:
+        return self._loop_lag_histogram
+
+    @property
+    def uptime(self) -> float:
+        return time.monotonic() - self._start_time
+
+    def measure(self, command: str, callback: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        """Wrap the handler callback so that every update it handles is measured under command, and counted by
+        the profiler if it is active when the update comes."""
+
+        @functools.wraps(callback)
+        async def measured_callback(*args, **kwargs):
+            measurement = CommandMeasurement(command=command)
+            token = _current_measurement.set(measurement)
+            is_profiled = self._profiler.is_active
+            start_time = time.perf_counter()
+            try:
+                return await callback(*args, **kwargs)
+            except BaseException:
+                measurement.outcome = Metrics.OUTCOME_ERROR
+                raise
+            finally:
+                _current_measurement.reset(token)
+                self.record(measurement=measurement, total=time.perf_counter() - start_time)
+                if is_profiled and self._profiler.is_active:
+                    await self._profiler.count_update()
+
+        return measured_callback
+
+    def record(self, measurement: CommandMeasurement, total: float):
+        command = measurement.command
+        key = (command, measurement.outcome)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self.get_or_make_histogram(command=command, phase=Metrics.TOTAL).observe(total)
+        for phase in Metrics.PHASES:
+            self.get_or_make_histogram(command=command, phase=phase).observe(
+                measurement.phase_durations.get(phase, 0.0)
+            )
+        self.get_or_make_histogram(command=command, phase=Metrics.OTHER).observe(
+            max(0.0, total - sum(measurement.phase_durations.values()))
+        )
+        for method, num_calls in measurement.api_calls.items():
+            self._api_call_counts[(command, method)] = self._api_call_counts.get((command, method), 0) + num_calls
+
+        now = time.monotonic()
+        self._recent_end_times.append(now)
+        while self._recent_end_times[0] < now - Metrics.THROUGHPUT_WINDOW:
+            self._recent_end_times.popleft()
+
+    def get_or_make_histogram(self, command: str, phase: str) -> Histogram:
+        histogram = self._histograms.get((command, phase))
+        if histogram is None:
+            histogram = Histogram()
+            self._histograms[(command, phase)] = histogram
+        return histogram
+
+    def get_histogram(self, command: str, phase: str) -> Histogram | None:
+        return self._histograms.get((command, phase))
+
+    def get_count(self, command: str, outcome: str | None = None) -> int:
+        """Return the number of handled updates of command (with outcome if given)."""
+        return sum(count for (counted_command, counted_outcome), count in self._counts.items()
+                   if counted_command == command and (outcome is None or counted_outcome == outcome))
+
+    def get_api_call_count(self, command: str, method: str | None = None) -> int:
+        """Return the number of calls of the Bot API (of method if given) caused by updates of command."""
+        return sum(count for (counted_command, counted_method), count in self._api_call_counts.items()
+                   if counted_command == command and (method is None or counted_method == method))
+
+    def get_amplification(self, command: str, method: str | None = None) -> float | None:
+        """Return the mean number of calls of the Bot API (of method if given) per update of command."""
+        num_updates = self.get_count(command=command)
+        if num_updates == 0:
+            return None
+        return self.get_api_call_count(command=command, method=method) / num_updates
+
+    def get_amplifications(self) -> dict[str, float]:
+        return {command: self.get_amplification(command=command) for command in self.get_commands()}
+
+    def count_keyboard_cache_lookup(self, is_hit: bool):
+        if is_hit:
+            self._num_keyboard_cache_hits += 1
+        else:
+            self._num_keyboard_cache_misses += 1
+
+    @property
+    def num_keyboard_cache_hits(self) -> int:
+        return self._num_keyboard_cache_hits
+
+    @property
+    def num_keyboard_cache_misses(self) -> int:
+        return self._num_keyboard_cache_misses
+
+    def get_commands(self) -> list[str]:
+        return sorted({command for command, _ in self._counts})
+
+    def get_num_recent(self) -> int:
+        """Return the number of updates handled in the last THROUGHPUT_WINDOW seconds."""
+        threshold = time.monotonic() - Metrics.THROUGHPUT_WINDOW
+        return sum(1 for end_time in self._recent_end_times if end_time >= threshold)
+
+    def make_report(self) -> str:
+        uptime = self.uptime
+        num_total = sum(self._counts.values())
+        lines = [
+            f"Uptime {int(uptime // 3600)}h {int(uptime % 3600 // 60):02d}m, {num_total} updates handled "
+            + f"({self.get_num_recent()} in the last {Metrics.THROUGHPUT_WINDOW} s)"
+        ]
+        lines.extend(self.make_loop_lag_report())
+        lines.append(f"Keyboard cache {self._num_keyboard_cache_hits} hit(s), "
+                     + f"{self._num_keyboard_cache_misses} miss(es)")
+        for command in self.get_commands():
+            outcomes = ", ".join(f"{count} {outcome}" for (counted_command, outcome), count in sorted(
+                self._counts.items()) if counted_command == command)
+            total = self._histograms[(command, Metrics.TOTAL)]
+            lines.append(f"{command}: {outcomes}")
+            lines.append(f"  p50 {total.percentile(50) * 1000:.1f}, p95 {total.percentile(95) * 1000:.1f}, "
+                         + f"p99 {total.percentile(99) * 1000:.1f}, max {total.max * 1000:.1f} ms")
+            lines.append("  mean " + ", ".join(
+                f"{phase} {self._histograms[(command, phase)].mean * 1000:.1f}"
+                for phase in Metrics.PHASES + (Metrics.OTHER,)
+            ) + " ms")
+            api_calls = ", ".join(
+                f"{method} {self.get_amplification(command=command, method=method):.2f}"
+                for counted_command, method in sorted(self._api_call_counts) if counted_command == command
+            )
+            lines.append(f"  {self.get_amplification(command=command):.2f} API calls per update"
+                         + (f" ({api_calls})" if len(api_calls) > 0 else ""))
+        return "\n".join(lines)
+
+    def make_loop_lag_report(self) -> list[str]:
+        lag = self._loop_lag_histogram
+        if lag.count == 0:
+            return []
+        lines = [f"Event loop lag p50 {lag.percentile(50) * 1000:.1f}, p99 {lag.percentile(99) * 1000:.1f}, "
+                 + f"max {lag.max * 1000:.1f} ms, {self._watchdog.num_stalls} stall(s) over "
+                 + f"{self._watchdog.threshold * 1000:.0f} ms"]
+        now = time.monotonic()
+        for stall in self._watchdog.get_recent_stalls()[-Metrics.NUM_REPORTED_STALLS:]:
+            duration = f"{stall.duration:.2f} s" if stall.duration is not None else "ongoing"
+            location = stall.stack[-1].strip().splitlines()[0] if len(stall.stack) > 0 else "unknown location"
+            lines.append(f"  {duration} in {stall.command or 'no handler'}, {now - stall.start_time:.0f} s ago, "
+                         + location)
+        return lines
+
+    @staticmethod
+    def format_labels(**labels) -> str:
+        return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the text exposition format of Prometheus."""
+        lines = [
+            "# TYPE bot_uptime_seconds gauge",
+            f"bot_uptime_seconds {self.uptime:.3f}",
+            "# TYPE bot_updates_total counter",
+        ]
+        for (command, outcome), count in sorted(self._counts.items()):
+            lines.append(f"bot_updates_total{{{Metrics.format_labels(command=command, outcome=outcome)}}} {count}")
+        lines.append("# TYPE bot_api_calls_total counter")
+        for (command, method), count in sorted(self._api_call_counts.items()):
+            lines.append(f"bot_api_calls_total{{{Metrics.format_labels(command=command, method=method)}}} {count}")
+        lines.append("# TYPE bot_keyboard_cache_hits_total counter")
+        lines.append(f"bot_keyboard_cache_hits_total {self._num_keyboard_cache_hits}")
+        lines.append("# TYPE bot_keyboard_cache_misses_total counter")
+        lines.append(f"bot_keyboard_cache_misses_total {self._num_keyboard_cache_misses}")
+        lines.append("# TYPE bot_update_duration_seconds histogram")
+        for (command, phase), histogram in sorted(self._histograms.items()):
+            labels = Metrics.format_labels(command=command, phase=phase)
+            for bound, count in histogram.get_cumulative_bucket_counts():
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(f'bot_update_duration_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"bot_update_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"bot_update_duration_seconds_count{{{labels}}} {histogram.count}")
+        lines.append("# TYPE bot_event_loop_lag_seconds histogram")
+        for bound, count in self._loop_lag_histogram.get_cumulative_bucket_counts():
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            lines.append(f'bot_event_loop_lag_seconds_bucket{{le="{le}"}} {count}')
+        lines.append(f"bot_event_loop_lag_seconds_sum {self._loop_lag_histogram.sum:.6f}")
+        lines.append(f"bot_event_loop_lag_seconds_count {self._loop_lag_histogram.count}")
+        lines.append("# TYPE bot_event_loop_stalls_total counter")
+        lines.append(f"bot_event_loop_stalls_total {self._watchdog.num_stalls}")
+        return "\n".join(lines) + "\n"
+
+
+_MEASURED_CALLBACK_CODE = next(
+    constant for constant in Metrics.measure.__code__.co_consts
+    if isinstance(constant, type(Metrics.measure.__code__)) and constant.co_name == "measured_callback"
+)  # code of the wrapper made by Metrics.measure, for finding measured updates in stacks sampled by the watchdog
@@ -0,0 +1,64 @@
+import io
+from collections.abc import Awaitable, Callable
+
+
+class UpdateProfiler:
+    """Runs cProfile while the next few updates are handled, then hands the sorted stats to a callback.
+
+    The profiler is enabled from start until the last of those updates is handled, so whatever else runs in the
+    meantime (jobs, polling) is profiled too. While it is not active, checking is_active is all it costs."""
+    NUM_LINES = 60  # functions listed per sort order
+
+    def __init__(self):
+        self._profile = None  # cProfile.Profile while profiling
+        self._num_remaining_updates: int = 0
+        self._on_finished: Callable[[str], Awaitable] | None = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._profile is not None
+
+    @property
+    def num_remaining_updates(self) -> int:
+        return self._num_remaining_updates
+
+    def start(self, num_updates: int, on_finished: Callable[[str], Awaitable]):
+        """Profile the next num_updates updates, then await on_finished with the stats as text."""
+        if self.is_active:
+            raise RuntimeError(f"Profiling is in progress, {self._num_remaining_updates} update(s) left!")
+        # imported here so that cProfile and pstats are only loaded when profiling is requested
+        import cProfile
+
+        self._num_remaining_updates = num_updates
+        self._on_finished = on_finished
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> str:
+        """Stop profiling and return the stats, sorted by cumulative time and by own time."""
+        profile = self._profile
+        profile.disable()
+        self._profile = None
+        self._num_remaining_updates = 0
+        self._on_finished = None
+        return UpdateProfiler.format_stats(profile=profile)
+
+    async def count_update(self):
+        """Count an update profiled from its start, finishing after the last one."""
+        self._num_remaining_updates -= 1
+        if self._num_remaining_updates > 0:
+            return
+        on_finished = self._on_finished
+        await on_finished(self.stop())
+
+    @staticmethod
+    def format_stats(profile) -> str:
+        import pstats
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        for description, sort_key in (("cumulative time", pstats.SortKey.CUMULATIVE),
+                                      ("own time", pstats.SortKey.TIME)):
+            stream.write(f"Sorted by {description}\n")
+            stats.sort_stats(sort_key).print_stats(UpdateProfiler.NUM_LINES)
+        return stream.getvalue()
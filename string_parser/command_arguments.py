@@ -0,0 +1,65 @@
+import functools
+
+from auto_registration_system.exception.error_maker import ErrorMaker
+from string_parser.string_parser import StringParser
+
+
+class CommandArguments:
+    """Arguments of a command naming players of a slot, e.g. /rg Alice, Bob a, tokenized once.
+
+    A message which cannot be parsed gives arguments with the error instead of raising it."""
+
+    def __init__(self, command: str, names: tuple[str, ...], slot_label: str | None,
+                 names_without_alpha: frozenset[str] = frozenset(), error: Exception | None = None):
+        self._command: str = command
+        self._names: tuple[str, ...] = names
+        self._slot_label: str | None = slot_label
+        self._names_without_alpha: frozenset[str] = names_without_alpha
+        self._error: Exception | None = error
+
+    @property
+    def command(self) -> str:
+        return self._command
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Non-empty names (or positions for deregistration) in the order given."""
+        return self._names
+
+    @property
+    def slot_label(self) -> str | None:
+        return self._slot_label
+
+    @property
+    def names_without_alpha(self) -> frozenset[str]:
+        """Names without any alphabet character, which are not valid names of players."""
+        return self._names_without_alpha
+
+    @property
+    def error(self) -> Exception | None:
+        return self._error
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def parse(message: str) -> "CommandArguments":
+        # the same texts come again and again, e.g. from buttons, and parse to the same immutable arguments
+        if "\n" in message:
+            return CommandArguments(command="", names=(), slot_label=None,
+                                    error=ErrorMaker.make_single_line_not_satisfied_exception())
+        text = message.strip()
+        command = ""
+        if text.startswith("/"):
+            command, _, text = text.partition(" ")
+            command = command[1:]
+        words = StringParser.remove_redundant_spaces(text).rsplit(None, 1)
+        if len(words) == 0:
+            return CommandArguments(command=command, names=(), slot_label=None,
+                                    error=ErrorMaker.make_syntax_error_exception(message=message))
+        names = tuple(name for name in StringParser.split_names(words[0]) if len(name) > 0) \
+            if len(words) == 2 else ()
+        return CommandArguments(
+            command=command,
+            names=names,
+            slot_label=words[-1],
+            names_without_alpha=frozenset(name for name in names if not StringParser.is_containing_alpha(name))
+        )
@@ -1,3 +1,4 @@
+import functools
 import re
 
 from auto_registration_system.exception.error_maker import ErrorMaker
@@ -6,10 +7,14 @@ from auto_registration_system.exception.exception_first_word_not_found import Fi
 
 
 class StringParser:
+    REDUNDANT_SPACES_PATTERN = re.compile(' {2,}')
+    ESCAPED_CHARACTER_PATTERN = re.compile(r'\\(.)')
+    # characters to be escaped in Telegram MarkdownV2
+    MARKDOWN_ESCAPE_TABLE = str.maketrans({c: f"\\{c}" for c in "_*[]()~`>#+-=|{}.!"})
 
     @staticmethod
     def remove_redundant_spaces(message: str) -> str:
-        return re.sub(' +', ' ', message).strip()
+        return StringParser.REDUNDANT_SPACES_PATTERN.sub(' ', message).strip()
 
     @staticmethod
     def remove_first_word(message: str) -> str:
@@ -23,28 +28,22 @@ class StringParser:
         current_message: str = message.strip()
         if len(current_message) == 0:
             return current_message
-        res: str = ""
         split_lines = current_message.splitlines()
-        for i, line in enumerate(split_lines):
-            if i == 0 and line[0] == '/':
-                res += StringParser.remove_redundant_spaces(line.partition(' ')[2])
-            else:
-                res += line
-            if i + 1 < len(split_lines):
-                res += "\n"
-        return res
+        if split_lines[0][0] == '/':
+            split_lines[0] = StringParser.remove_redundant_spaces(split_lines[0].partition(' ')[2])
+        return "\n".join(split_lines)
 
     @staticmethod
     def get_first_word(message: str) -> str:
         try:
-            return message.split()[0]
+            return message.split(None, 1)[0]
         except Exception:
             raise FirstWordNotFoundException
 
     @staticmethod
     def get_last_word(message: str) -> str:
         try:
-            return message.split()[-1]
+            return message.rsplit(None, 1)[-1]
         except Exception:
             raise LastWordNotFoundException
 
@@ -64,18 +63,15 @@ class StringParser:
 
     @staticmethod
     def split_names(message: str) -> list[str]:
-        res: list[str] = message.split(',')
-        for i, name in enumerate(res):
-            res[i] = StringParser.remove_redundant_spaces(name).title()
-        return res
+        return [StringParser.remove_redundant_spaces(name).title() for name in message.split(',')]
+
+    @staticmethod
+    def is_containing_alpha(message: str) -> bool:
+        return any(map(str.isalpha, message))
 
     @staticmethod
     def enforce_message_containing_alpha(message: str):
-        containing_alpha: bool = False
-        for character in list(message):
-            if character.isalpha():
-                containing_alpha = True
-        if not containing_alpha:
+        if not StringParser.is_containing_alpha(message=message):
             raise ErrorMaker.make_message_not_containing_alpha_exception(message=message)
 
     @staticmethod
@@ -85,35 +81,17 @@ class StringParser:
 
     @staticmethod
     def process_telegram_full_name(telegram_full_name: str) -> str:
-        char_list = list(telegram_full_name)
-        for i, c in enumerate(char_list):
-            if c == ",":
-                char_list[i] = ""
-        full_name = StringParser.split_names(message="".join(char_list))[0]
-        return full_name
+        return StringParser.remove_redundant_spaces(telegram_full_name.replace(",", "")).title()
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def replace_escape_characters_for_markdown(message: str) -> str:
-        return (message.replace("_", '\\_')
-                .replace('*', '\\*')
-                .replace('[', '\\[')
-                .replace(']', '\\]')
-                .replace('(', '\\(')
-                .replace(')', '\\)')
-                .replace('~', '\\~')
-                .replace('`', '\\`')
-                .replace('>', '\\>')
-                .replace('#', '\\#')
-                .replace('+', '\\+')
-                .replace('+', '\\+')
-                .replace('-', '\\-')
-                .replace('=', '\\=')
-                .replace('|', '\\|')
-                .replace('{', '\\{')
-                .replace('}', '\\}')
-                .replace('.', '\\.')
-                .replace('!', '\\!')
-                )
+        # names are escaped again in every response, so the escaped ones are cached
+        return message.translate(StringParser.MARKDOWN_ESCAPE_TABLE)
+
+    @staticmethod
+    def remove_escape_characters_for_markdown(message: str) -> str:
+        return StringParser.ESCAPED_CHARACTER_PATTERN.sub(r'\1', message)
 
     @staticmethod
     def make_clickable_link_for_telegram_id(telegram_id: int, full_name: str) -> str:
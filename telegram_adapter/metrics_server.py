@@ -0,0 +1,37 @@
+from aiohttp import web
+
+from metrics import Metrics
+
+
+class MetricsServer:
+    """Embedded HTTP server exposing the metrics in the text format scraped by Prometheus."""
+
+    CONTENT_TYPE = "text/plain"
+
+    def __init__(self, metrics: Metrics, listen: str, port: int, path: str):
+        self._metrics: Metrics = metrics
+        self._listen: str = listen
+        self._port: int = port
+        self._path: str = "/" + path.strip("/")
+        self._runner: web.AppRunner | None = None
+
+        self._web_app: web.Application = web.Application()
+        self._web_app.router.add_get(self._path, self.handle_metrics)
+
+    @property
+    def web_app(self) -> web.Application:
+        return self._web_app
+
+    async def handle_metrics(self, _: web.Request) -> web.Response:
+        return web.Response(text=self._metrics.to_prometheus(), content_type=MetricsServer.CONTENT_TYPE)
+
+    async def start(self):
+        self._runner = web.AppRunner(self._web_app)
+        await self._runner.setup()
+        await web.TCPSite(runner=self._runner, host=self._listen, port=self._port).start()
+        print(f"Metrics are served at http://{self._listen}:{self._port}{self._path}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import os
+import struct
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from multiprocessing.process import BaseProcess
+
+from telegram import Update
+from telegram.ext import Application
+
+from chat_api.tenant_registry import TenantRegistry
+
+
+class ShardFrame:
+    """Length-prefixed JSON messages exchanged between the ingress and worker processes over Unix sockets."""
+
+    HEADER = struct.Struct(">I")  # length of the JSON body in bytes
+
+    @staticmethod
+    def encode(payload: dict) -> bytes:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return ShardFrame.HEADER.pack(len(body)) + body
+
+    @staticmethod
+    async def read(reader: asyncio.StreamReader) -> dict | None:
+        """Return the next message, or None if the connection is closed."""
+        try:
+            header = await reader.readexactly(ShardFrame.HEADER.size)
+            (length,) = ShardFrame.HEADER.unpack(header)
+            return json.loads(await reader.readexactly(length))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+
+
+class ShardRouter:
+    """Maps updates to worker processes by the chat id of the tenant serving them.
+
+    Private chats staging lists for a group go to the worker of that group, so every tenant is owned by exactly
+    one worker. The mapping only depends on the number of workers, hence it survives restarts of workers."""
+
+    def __init__(self, num_workers: int, tenant_chat_ids: set[int], staging_chat_ids: dict[int, int],
+                 default_chat_id: int):
+        self._num_workers: int = num_workers
+        self._tenant_chat_ids: set[int] = tenant_chat_ids
+        self._staging_chat_ids: dict[int, int] = staging_chat_ids
+        self._default_chat_id: int = default_chat_id
+
+    @property
+    def num_workers(self) -> int:
+        return self._num_workers
+
+    @staticmethod
+    def compute_worker_index(tenant_chat_id: int, num_workers: int) -> int:
+        return tenant_chat_id % num_workers
+
+    def get_worker_index(self, chat_id: int | None) -> int:
+        if chat_id is None:
+            chat_id = self._default_chat_id  # updates without chat are served with the default chat
+        tenant_chat_id = TenantRegistry.resolve(
+            chat_id=chat_id,
+            tenant_chat_ids=self._tenant_chat_ids,
+            staging_chat_ids=self._staging_chat_ids,
+            default_chat_id=self._default_chat_id
+        )
+        return ShardRouter.compute_worker_index(tenant_chat_id=tenant_chat_id, num_workers=self._num_workers)
+
+    def get_worker_index_of_update(self, update: Update) -> int:
+        chat = update.effective_chat
+        return self.get_worker_index(chat_id=chat.id if chat is not None else None)
+
+
+class ShardWorkerServer:
+    """Unix socket server of a worker process, putting updates forwarded by the ingress into the update queue of
+    the application and acknowledging each of them.
+
+    Delivery is at least once: the ingress replays every update not acknowledged when a connection is lost, so the
+    worker may receive an update again. Updates already received (by update_id, among the last
+    MAX_NUM_RECENT_UPDATE_IDS) are acknowledged again but not queued twice. A worker process started again has
+    forgotten them, so an update it received but did not acknowledge before exiting can be handled twice."""
+
+    MAX_NUM_RECENT_UPDATE_IDS = 10000
+
+    def __init__(self, application: Application, socket_path: str):
+        self._application: Application = application
+        self._socket_path: str = socket_path
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()  # connections from the ingress
+        self._recent_update_ids: OrderedDict[int, None] = OrderedDict()  # oldest first
+        self._num_updates_received: int = 0
+        self._num_duplicate_updates: int = 0
+
+    @property
+    def num_updates_received(self) -> int:
+        return self._num_updates_received
+
+    @property
+    def num_duplicate_updates(self) -> int:
+        return self._num_duplicate_updates
+
+    def _is_duplicate(self, update_id: int) -> bool:
+        """Return whether update_id has been received recently, remembering it otherwise."""
+        if update_id in self._recent_update_ids:
+            return True
+        self._recent_update_ids[update_id] = None
+        if len(self._recent_update_ids) > ShardWorkerServer.MAX_NUM_RECENT_UPDATE_IDS:
+            self._recent_update_ids.popitem(last=False)
+        return False
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while (payload := await ShardFrame.read(reader)) is not None:
+                if self._is_duplicate(update_id=payload["update_id"]):
+                    self._num_duplicate_updates += 1
+                else:
+                    await self._application.update_queue.put(Update.de_json(data=payload, bot=self._application.bot))
+                    self._num_updates_received += 1
+                writer.write(ShardFrame.encode({"ack": payload["update_id"]}))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self):
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)  # left by a previous run of this worker
+        self._server = await asyncio.start_unix_server(self.handle_connection, path=self._socket_path)
+        print(f"Shard worker is listening at {self._socket_path}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class ShardIngress:
+    """Forwards updates from the update queue to the worker owning their chat.
+
+    Updates are kept until the worker acknowledges them, so they are delivered at least once. While a worker is
+    down (e.g. restarting), its updates are buffered and replayed in order once it accepts connections again;
+    unacknowledged updates are replayed first. The oldest buffered updates are dropped if more than
+    max_num_buffered_updates are waiting for one worker."""
+
+    RECONNECT_DELAYS = (0.1, 0.2, 0.5, 1.0, 2.0)  # seconds between attempts to connect, the last one repeats
+
+    def __init__(self, router: ShardRouter, socket_paths: list[str], max_num_buffered_updates: int):
+        self._router: ShardRouter = router
+        self._socket_paths: list[str] = socket_paths
+        self._update_queue: asyncio.Queue = asyncio.Queue()
+        self._writers: list[asyncio.StreamWriter | None] = [None] * router.num_workers
+        self._buffers: list[deque[tuple[int, bytes]]] = [
+            deque(maxlen=max_num_buffered_updates) for _ in range(router.num_workers)
+        ]
+        self._unacknowledged: list[OrderedDict[int, bytes]] = [OrderedDict() for _ in range(router.num_workers)]
+        self._connecting_tasks: list[asyncio.Task | None] = [None] * router.num_workers
+        self._num_updates_forwarded: int = 0
+        self._num_updates_dropped: int = 0
+
+    @property
+    def update_queue(self) -> asyncio.Queue:
+        return self._update_queue
+
+    @property
+    def num_updates_forwarded(self) -> int:
+        return self._num_updates_forwarded
+
+    @property
+    def num_updates_dropped(self) -> int:
+        return self._num_updates_dropped
+
+    def get_num_pending_updates(self, worker_index: int) -> int:
+        return len(self._buffers[worker_index]) + len(self._unacknowledged[worker_index])
+
+    async def forward_updates(self):
+        while True:
+            self.dispatch(update=await self._update_queue.get())
+
+    def dispatch(self, update: Update):
+        worker_index = self._router.get_worker_index_of_update(update=update)
+        self._send(
+            worker_index=worker_index,
+            update_id=update.update_id,
+            frame=ShardFrame.encode(update.to_dict())
+        )
+
+    def _send(self, worker_index: int, update_id: int, frame: bytes):
+        writer = self._writers[worker_index]
+        if writer is None or writer.is_closing():
+            buffer = self._buffers[worker_index]
+            if len(buffer) == buffer.maxlen:
+                self._num_updates_dropped += 1
+            buffer.append((update_id, frame))
+            self._connect_later(worker_index=worker_index)
+            return
+        self._unacknowledged[worker_index][update_id] = frame
+        writer.write(frame)
+
+    def _connect_later(self, worker_index: int):
+        task = self._connecting_tasks[worker_index]
+        if task is None or task.done():
+            self._connecting_tasks[worker_index] = asyncio.create_task(self._connect(worker_index=worker_index))
+
+    async def _connect(self, worker_index: int):
+        attempt = 0
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(path=self._socket_paths[worker_index])
+                break
+            except (FileNotFoundError, ConnectionError):
+                await asyncio.sleep(ShardIngress.RECONNECT_DELAYS[min(attempt, len(ShardIngress.RECONNECT_DELAYS) - 1)])
+                attempt += 1
+        self._writers[worker_index] = writer
+        buffer = self._buffers[worker_index]
+        while len(buffer) > 0:
+            update_id, frame = buffer.popleft()
+            self._send(worker_index=worker_index, update_id=update_id, frame=frame)
+        await self._receive_acknowledgements(worker_index=worker_index, reader=reader)
+
+    async def _receive_acknowledgements(self, worker_index: int, reader: asyncio.StreamReader):
+        unacknowledged = self._unacknowledged[worker_index]
+        while (payload := await ShardFrame.read(reader)) is not None:
+            if unacknowledged.pop(payload["ack"], None) is not None:
+                self._num_updates_forwarded += 1
+
+        # the worker is gone: updates it has not acknowledged are replayed before the buffered ones
+        self._writers[worker_index] = None
+        buffer = self._buffers[worker_index]
+        # extendleft would push the newest buffered updates out of the full buffer, so the oldest are dropped here
+        replayed = list(unacknowledged.items()) + list(buffer)
+        num_dropped = max(0, len(replayed) - buffer.maxlen)
+        self._num_updates_dropped += num_dropped
+        buffer.clear()
+        buffer.extend(replayed[num_dropped:])
+        unacknowledged.clear()
+        self._connecting_tasks[worker_index] = asyncio.create_task(self._connect(worker_index=worker_index))
+
+    async def stop(self):
+        for task in self._connecting_tasks:
+            if task is not None:
+                task.cancel()
+        for writer in self._writers:
+            if writer is not None:
+                writer.close()
+
+
+class ShardSupervisor:
+    """Starts one process per worker and starts it again whenever it exits."""
+
+    def __init__(self, num_workers: int, start_worker: Callable[[int], BaseProcess], interval_for_checking: float):
+        self._num_workers: int = num_workers
+        self._start_worker: Callable[[int], BaseProcess] = start_worker
+        self._interval_for_checking: float = interval_for_checking
+        self._processes: list[BaseProcess | None] = [None] * num_workers
+        self._num_restarts: int = 0
+
+    @property
+    def num_restarts(self) -> int:
+        return self._num_restarts
+
+    def start(self):
+        for worker_index in range(self._num_workers):
+            self._processes[worker_index] = self._start_worker(worker_index)
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self._interval_for_checking)
+            for worker_index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    print(f"Shard worker {worker_index} exited with code {process.exitcode}! Starting it again!")
+                    self._num_restarts += 1
+                    self._processes[worker_index] = self._start_worker(worker_index)
+
+    def stop(self):
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout=10)
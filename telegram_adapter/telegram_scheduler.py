@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from telegram.ext import ContextTypes, JobQueue
+
+from chat_api.command_api import CommandApi
+from chat_api.tenant import Tenant
+from chat_api.transport import Scheduler
+
+from config import Config
+
+
+class TelegramScheduler(Scheduler):
+    """Runs the jobs of CommandApi in the job queue of the application, executing their actions with the
+    transport of the api."""
+
+    def __init__(self, api: CommandApi, job_queue: JobQueue):
+        self._api: CommandApi = api
+        self._job_queue: JobQueue = job_queue
+
+    def remove_jobs(self, name: str):
+        jobs = self._job_queue.get_jobs_by_name(name=name)
+        for job in jobs:
+            job.schedule_removal()
+
+    def arm_release(self, tenant: Tenant):
+        self.remove_jobs(name=tenant.job_name_for_release)
+        release_time_manager = tenant.auto_reg_system.release_time_manager
+        if not release_time_manager.enabled:
+            return
+        for minutes_left, reminder_time in tenant.auto_reg_system.get_upcoming_reminders(
+                time_manager=self._api.time_manager
+        ):
+            self._job_queue.run_once(
+                callback=self.send_reminder,
+                when=reminder_time,
+                data=minutes_left,
+                name=tenant.job_name_for_release,
+                chat_id=tenant.chat_id,
+            )
+        self._job_queue.run_once(
+            callback=self.attempt_release_data,
+            when=max(
+                release_time_manager.release_time,
+                self._api.time_manager.now() + timedelta(milliseconds=1)
+            ),
+            name=tenant.job_name_for_release,
+            chat_id=tenant.chat_id,
+        )
+
+    def disarm_release(self, tenant: Tenant):
+        self.remove_jobs(name=tenant.job_name_for_release)
+
+    def start_maintenance(self):
+        self.remove_jobs(name=Config.job_name_for_deleting)
+        self._job_queue.run_repeating(
+            callback=self.attempt_delete_message,
+            interval=Config.repeating_interval_for_deleting,
+            name=Config.job_name_for_deleting,
+        )
+        self.remove_jobs(name=Config.job_name_for_evicting)
+        self._job_queue.run_repeating(
+            callback=self.evict_idle_tenants,
+            interval=Config.repeating_interval_for_evicting,
+            name=Config.job_name_for_evicting,
+        )
+        self.remove_jobs(name=Config.job_name_for_sampling_memory)
+        if Config.repeating_interval_for_sampling_memory is not None:
+            self._job_queue.run_repeating(
+                callback=self.sample_memory,
+                interval=Config.repeating_interval_for_sampling_memory,
+                name=Config.job_name_for_sampling_memory,
+            )
+
+    async def send_reminder(self, context: ContextTypes.DEFAULT_TYPE):
+        await self._api.transport.execute(
+            actions=self._api.make_reminder(chat_id=context.job.chat_id, minutes_left=context.job.data)
+        )
+
+    async def attempt_release_data(self, context: ContextTypes.DEFAULT_TYPE):
+        await self._api.transport.execute(actions=self._api.release(chat_id=context.job.chat_id))
+
+    async def attempt_delete_message(self, _: ContextTypes.DEFAULT_TYPE):
+        await self._api.transport.execute(actions=self._api.dequeue_deletions())
+
+    async def evict_idle_tenants(self, _: ContextTypes.DEFAULT_TYPE):
+        self._api.evict_idle_tenants()
+
+    async def sample_memory(self, _: ContextTypes.DEFAULT_TYPE):
+        self._api.log_memory_sample()
@@ -0,0 +1,200 @@
+import asyncio
+import io
+import weakref
+
+from telegram import Bot, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message, ReplyParameters, User
+from telegram.constants import MessageEntityType
+from telegram.error import BadRequest
+
+from auto_registration_system.model import Mention
+from chat_api.action import Action, AnswerButton, DeleteMessage, EditMessage, SendDocument, SendMessage
+from chat_api.model import Button, ChatRequest, Document, Keyboard, Sender
+from chat_api.transport import Transport
+from metrics import Metrics
+from tracer import Tracer
+
+
+class TelegramTransport(Transport):
+    """Executes actions with the Bot API, and converts updates into requests of CommandApi.
+
+    If the transport is made for a message, replies to that message are sent with Message.reply_text, so that
+    they are quoted (in groups) and stay in the topic of the message like replies of python-telegram-bot."""
+
+    # keyboards are cached by CommandApi, so each is converted once while it is in use
+    MAX_NUM_RETRIES = 2  # sending again after connection errors
+    RETRY_DELAY = 10  # seconds
+
+    _markups: weakref.WeakKeyDictionary[Keyboard, InlineKeyboardMarkup] = weakref.WeakKeyDictionary()
+
+    def __init__(self, bot: Bot, tracer: Tracer, message: Message | None = None):
+        self._bot: Bot = bot
+        self._tracer: Tracer = tracer
+        self._message: Message | None = message
+
+    @staticmethod
+    def make_sender(user: User) -> Sender:
+        return Sender(id=user.id, full_name=user.full_name, username=user.username, first_name=user.first_name)
+
+    @staticmethod
+    def make_mentions(message: Message) -> list[Mention]:
+        """Convert the mentions of users in message into the type of the core."""
+        return [
+            Mention(
+                offset=entity.offset,
+                length=entity.length,
+                text=text,
+                user_id=entity.user.id if entity.user is not None else None,
+                user_full_name=entity.user.full_name if entity.user is not None else None
+            )
+            for entity, text in message.parse_entities(
+                types=[MessageEntityType.MENTION, MessageEntityType.TEXT_MENTION]
+            ).items()
+        ]
+
+    @staticmethod
+    def make_document(message: Message) -> Document | None:
+        document = message.document
+        if document is None:
+            return None
+
+        async def download() -> bytes:
+            buffer = io.BytesIO()
+            with Metrics.api_call(method="getFile"):
+                file = await document.get_file()
+            with Metrics.phase(phase=Metrics.PHASE_NETWORK):
+                await file.download_to_memory(out=buffer)
+            return buffer.getvalue()
+
+        return Document(file_name=document.file_name, file_size=document.file_size, download=download)
+
+    @staticmethod
+    def make_request(message: Message, sender: User) -> ChatRequest:
+        return ChatRequest(
+            chat_id=message.chat_id,
+            message_id=message.message_id,
+            sender=TelegramTransport.make_sender(user=sender),
+            text=message.text if message.text is not None else message.caption,
+            mentions=TelegramTransport.make_mentions(message=message),
+            document=TelegramTransport.make_document(message=message)
+        )
+
+    @staticmethod
+    def make_button_request(query: CallbackQuery) -> ChatRequest:
+        return ChatRequest(
+            chat_id=query.message.chat.id,
+            message_id=query.message.message_id,
+            sender=TelegramTransport.make_sender(user=query.from_user),
+            callback_data=query.data,
+            callback_query_id=query.id
+        )
+
+    @staticmethod
+    def make_markup(keyboard: Keyboard | None) -> InlineKeyboardMarkup | None:
+        if keyboard is None:
+            return None
+        markup = TelegramTransport._markups.get(keyboard)
+        if markup is None:
+            markup = InlineKeyboardMarkup(inline_keyboard=[
+                [TelegramTransport.make_inline_button(button=button) for button in row] for row in keyboard.rows
+            ])
+            TelegramTransport._markups[keyboard] = markup
+        return markup
+
+    @staticmethod
+    def make_inline_button(button: Button) -> InlineKeyboardButton:
+        return InlineKeyboardButton(text=button.text, callback_data=button.callback_data)
+
+    def log_error(self, description: str, e: Exception):
+        self._tracer.log(
+            message=f"(from system) We caught an error when {description}: {repr(e)}",
+            is_history_required=False
+        )
+
+    async def execute_action(self, action: Action) -> bool:
+        try:
+            if isinstance(action, SendMessage):
+                return await self.send_message(action=action)
+            if isinstance(action, EditMessage):
+                with Metrics.api_call(method="editMessageText"):
+                    await self._bot.edit_message_text(
+                        chat_id=action.chat_id,
+                        message_id=action.message_id,
+                        text=action.text,
+                        reply_markup=TelegramTransport.make_markup(keyboard=action.keyboard)
+                    )
+            elif isinstance(action, DeleteMessage):
+                await self._bot.delete_message(chat_id=action.chat_id, message_id=action.message_id)
+            elif isinstance(action, SendDocument):
+                with Metrics.api_call(method="sendDocument"):
+                    if self._message is not None and action.reply_to == self._message.message_id:
+                        await self._message.reply_document(document=action.document, filename=action.file_name)
+                    else:
+                        await self._bot.send_document(
+                            chat_id=action.chat_id,
+                            document=action.document,
+                            filename=action.file_name,
+                            reply_parameters=ReplyParameters(message_id=action.reply_to)
+                            if action.reply_to is not None else None
+                        )
+            elif isinstance(action, AnswerButton):
+                with Metrics.api_call(method="answerCallbackQuery"):
+                    await self._bot.answer_callback_query(
+                        callback_query_id=action.callback_query_id,
+                        text=action.text,
+                        show_alert=action.show_alert
+                    )
+            return True
+        except Exception as e:
+            self.log_error(description=f"executing {type(action).__name__}", e=e)
+            return False
+
+    async def send_message(self, action: SendMessage) -> bool:
+        """Send the message. Unless the action has a fallback, text rejected by Telegram (e.g. not escaped for
+        MarkdownV2) is sent again once as plain text, and after other errors (e.g. connection) the message is
+        sent again as plain text at most MAX_NUM_RETRIES times, after a notice."""
+        text = action.text
+        if len(text.strip()) == 0:
+            text = "Error! Message to be sent is empty!"
+        parse_mode = action.parse_mode
+        num_retries = 0
+        while True:
+            try:
+                sent_message = await self.send_text(action=action, text=text, parse_mode=parse_mode)
+                break
+            except BadRequest as e:
+                self.log_error(description="sending message", e=e)
+                if action.on_failed is not None or parse_mode is None:
+                    return False
+                parse_mode = None  # the same request would be rejected again
+            except Exception as e:
+                self.log_error(description="sending message", e=e)
+                if action.on_failed is not None or num_retries >= TelegramTransport.MAX_NUM_RETRIES:
+                    return False
+                num_retries += 1
+                await asyncio.sleep(TelegramTransport.RETRY_DELAY)  # without blocking other updates
+                try:
+                    await self.send_text(action=action, text="Connection error! I (bot) am trying again!",
+                                         parse_mode=None)
+                except Exception as notice_error:
+                    self.log_error(description="sending notice of connection error", e=notice_error)
+                parse_mode = None
+        action.message_id = sent_message.message_id
+        if action.on_sent is not None:
+            action.on_sent(sent_message.message_id)
+        return True
+
+    async def send_text(self, action: SendMessage, text: str, parse_mode: str | None) -> Message:
+        """Send text to the chat of action, replying and attaching the keyboard as the action says."""
+        reply_to_message_id = action.reply_to_message_id
+        reply_markup = TelegramTransport.make_markup(keyboard=action.keyboard)
+        with Metrics.api_call(method="sendMessage"):
+            if self._message is not None and reply_to_message_id == self._message.message_id:
+                return await self._message.reply_text(text=text, parse_mode=parse_mode, reply_markup=reply_markup)
+            return await self._bot.send_message(
+                chat_id=action.chat_id,
+                text=text,
+                parse_mode=parse_mode,
+                reply_markup=reply_markup,
+                reply_parameters=ReplyParameters(message_id=reply_to_message_id)
+                if reply_to_message_id is not None else None
+            )
@@ -0,0 +1,84 @@
+import hmac
+import json
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+
+class WebhookServer:
+    """Embedded HTTP server receiving updates pushed by Telegram, used instead of long polling.
+
+    Updates posted to the webhook path are validated against the secret token and put straight into the update
+    queue of the application. A health endpoint reports whether the application is running."""
+
+    SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+    def __init__(self, application: Application, listen: str, port: int, url_path: str, health_path: str,
+                 secret_token: str):
+        self._application: Application = application
+        self._listen: str = listen
+        self._port: int = port
+        self._url_path: str = "/" + url_path.strip("/")
+        self._health_path: str = "/" + health_path.strip("/")
+        self._secret_token: str = secret_token
+        self._runner: web.AppRunner | None = None
+        self._num_updates_received: int = 0
+        self._num_updates_rejected: int = 0
+
+        self._web_app: web.Application = web.Application()
+        self._web_app.router.add_post(self._url_path, self.handle_update)
+        self._web_app.router.add_get(self._health_path, self.handle_health)
+
+    @property
+    def web_app(self) -> web.Application:
+        return self._web_app
+
+    @property
+    def num_updates_received(self) -> int:
+        return self._num_updates_received
+
+    @property
+    def num_updates_rejected(self) -> int:
+        return self._num_updates_rejected
+
+    def is_secret_token_valid(self, secret_token: str | None) -> bool:
+        if secret_token is None:
+            return False
+        return hmac.compare_digest(secret_token.encode("utf-8"), self._secret_token.encode("utf-8"))
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if not self.is_secret_token_valid(secret_token=request.headers.get(WebhookServer.SECRET_TOKEN_HEADER)):
+            self._num_updates_rejected += 1
+            return web.Response(status=403, text="Invalid secret token!")
+        try:
+            update = Update.de_json(data=await request.json(), bot=self._application.bot)
+        except (json.JSONDecodeError, TypeError, KeyError, ValueError):
+            self._num_updates_rejected += 1
+            return web.Response(status=400, text="Invalid update!")
+        await self._application.update_queue.put(update)
+        self._num_updates_received += 1
+        return web.Response(status=200)
+
+    async def handle_health(self, _: web.Request) -> web.Response:
+        is_running: bool = self._application.running
+        return web.json_response(
+            data={
+                "status": "ok" if is_running else "starting",
+                "num_updates_received": self._num_updates_received,
+                "num_updates_rejected": self._num_updates_rejected,
+                "num_updates_queued": self._application.update_queue.qsize(),
+            },
+            status=200 if is_running else 503
+        )
+
+    async def start(self):
+        self._runner = web.AppRunner(self._web_app)
+        await self._runner.setup()
+        await web.TCPSite(runner=self._runner, host=self._listen, port=self._port).start()
+        print(f"Webhook server is listening at http://{self._listen}:{self._port}{self._url_path}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.command import Command
+from chat_api.callback_data import CallbackData
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestCallbackData:
+    """Unit tests for CallbackData class."""
+
+    def test_encode_without_args(self):
+        """Test encoding a button without arguments."""
+        assert CallbackData.encode(Command.CALLBACK_CODE_ALL) == Command.CALLBACK_CODE_ALL
+
+    def test_encode_decode_round_trip(self):
+        """Test decoding returns the encoded code and arguments."""
+        data = CallbackData.encode(Command.CALLBACK_CODE_DRG_SLOT, 123456789, "a1")
+        assert len(data.encode("utf-8")) <= 64  # limit of Telegram for callback data
+        decoded = CallbackData.decode(data)
+        assert decoded.code == Command.CALLBACK_CODE_DRG_SLOT
+        assert decoded.args == ("123456789", "a1")
+
+    @pytest.mark.parametrize("legacy_data, expected", [
+        ("_all", CallbackData(Command.CALLBACK_CODE_ALL)),
+        ("_help", CallbackData(Command.CALLBACK_CODE_HELP)),
+        ("_av", CallbackData(Command.CALLBACK_CODE_AV)),
+        ("_rt", CallbackData(Command.CALLBACK_CODE_RT)),
+        ("_rg s", CallbackData(Command.CALLBACK_CODE_RG, ("s",))),
+        ("_drg", CallbackData(Command.CALLBACK_CODE_DRG)),
+        ("_drg 123 s", CallbackData(Command.CALLBACK_CODE_DRG_SLOT, ("123", "s"))),
+    ])
+    def test_decode_legacy(self, legacy_data: str, expected: CallbackData):
+        """Test buttons of old messages are decoded into the compact codes."""
+        assert CallbackData.decode(legacy_data) == expected
+
+    def test_decode_invalid(self):
+        """Test decoding empty or unknown legacy data."""
+        assert CallbackData.decode("") is None
+        assert CallbackData.decode(None) is None
+        assert CallbackData.decode("_unknown") is None
@@ -0,0 +1,38 @@
+import os
+import sys
+
+from auto_registration_system.exception.exception_syntax_error import SyntaxErrorException
+from string_parser.command_arguments import CommandArguments
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestCommandArguments:
+    """Unit tests for CommandArguments class."""
+
+    def test_parse(self):
+        """Test the command, names and slot label are taken from one line."""
+        arguments = CommandArguments.parse(message="/rg  alice,, bob   tan , 123 sat1")
+        assert arguments.error is None
+        assert arguments.command == "rg"
+        assert arguments.names == ("Alice", "Bob Tan", "123")
+        assert arguments.slot_label == "sat1"
+        assert arguments.names_without_alpha == frozenset({"123"})
+
+    def test_slot_only(self):
+        """Test a slot label without names gives no name."""
+        arguments = CommandArguments.parse(message="/drg a")
+        assert arguments.error is None
+        assert arguments.names == ()
+        assert arguments.slot_label == "a"
+
+    def test_errors_as_values(self):
+        """Test a message without slot label or with many lines gives an error instead of raising."""
+        assert isinstance(CommandArguments.parse(message="/rg").error, SyntaxErrorException)
+        arguments = CommandArguments.parse(message="/rg Alice\nBob a")
+        assert arguments.error is not None and not isinstance(arguments.error, SyntaxErrorException)
+
+    def test_parse_cached(self):
+        """Test the same message is parsed once."""
+        assert CommandArguments.parse(message="/rg Alice a") is CommandArguments.parse(message="/rg Alice a")
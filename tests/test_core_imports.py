@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIRECTORY_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCoreImports:
+    """Tests of the core package staying independent of python-telegram-bot."""
+
+    def test_core_does_not_import_telegram(self):
+        """Test importing the core in a fresh interpreter loads neither telegram nor its HTTP client."""
+        code = ("import sys, auto_registration_system.auto_registration_system; "
+                "print(sorted({name.split('.')[0] for name in sys.modules} & {'telegram', 'httpx'}))")
+        output = subprocess.run([sys.executable, "-c", code], cwd=DIRECTORY_REPO, capture_output=True, text=True,
+                                check=True).stdout
+        assert output.strip() == "[]"
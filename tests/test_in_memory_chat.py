@@ -0,0 +1,202 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.command import Command
+from auto_registration_system.data_structure.time_manager import TimeManager
+from auto_registration_system.term import Term
+from chat_api.action import AnswerButton, DeleteMessage, EditMessage, SendMessage
+from chat_api.callback_data import CallbackData
+from chat_api.command_api import CommandApi
+from chat_api.in_memory_chat import InMemoryChat
+from chat_api.model import Sender
+from chat_api.transport import Scheduler, Transport
+from chat_api.tenant import Tenant
+from config import Config
+from metrics import Metrics
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHAT_ID = -100
+ADMIN = Sender(id=1, full_name="Admin", username="admin")
+ALICE = Sender(id=2, full_name="Alice Tan", username="alice")
+BOB = Sender(id=3, full_name="Bob Lee", username="bob")
+NEW_LIST = f"/{Command.COMMAND_NEW} [dv] Mon, Hall\n[a] 1:00-3:00 pm, #players: 2\n[b] 3:00-5:00 pm, #players: 2"
+
+
+@pytest.fixture(name="chat")
+def fixture_chat(tmp_path, monkeypatch) -> InMemoryChat:
+    """Fixture to provide an in-memory chat served by a CommandApi, with data in a temporary directory."""
+    monkeypatch.setattr(Config, "directory_data", str(tmp_path))
+    monkeypatch.setattr(Config, "allowed_chat_ids", {CHAT_ID})
+    monkeypatch.setattr(Config, "default_chat_id", CHAT_ID)
+    monkeypatch.setattr(Config, "admins", {ADMIN.username})
+    time_manager = TimeManager(
+        time_zone=Config.time_zone,
+        input_time_format=Config.input_time_format,
+        output_time_format=Config.output_time_format
+    )
+    api = CommandApi(
+        time_manager=time_manager,
+        tracer=Tenant.make_data_handler(chat_id=CHAT_ID).load_tracer(time_manager=time_manager),
+        metrics=Metrics()
+    )
+    chat = InMemoryChat(api=api)
+    asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=NEW_LIST))
+    return chat
+
+
+def get_list_message(chat: InMemoryChat):
+    tenant = chat.api.get_tenant(chat_id=CHAT_ID)
+    return chat.get_message(chat_id=CHAT_ID, message_id=tenant.list_message_ids[-1])
+
+
+class TestInMemoryChat:
+    """Tests of running commands and buttons of CommandApi in an in-memory chat."""
+
+    def test_new_list_replies_with_keyboard(self, chat: InMemoryChat):
+        """Test the list posted for /new replies to the command and carries the registration keyboard."""
+        command_message = chat.get_messages(chat_id=CHAT_ID)[0]
+        list_message = get_list_message(chat=chat)
+        assert list_message.reply_to_message_id == command_message.message_id
+        assert "[a]" in list_message.text
+        assert [button.text for button in list_message.keyboard.rows[0]] == ["slot a", "slot b"]
+
+    def test_register_posts_list_again(self, chat: InMemoryChat):
+        """Test /rg replies with the updated list, and the previous list is deleted by the deletion job."""
+        old_list_message = get_list_message(chat=chat)
+        actions = asyncio.run(chat.send(chat_id=CHAT_ID, sender=ALICE, text=f"/{Command.COMMAND_RG} Alice a"))
+        assert all(isinstance(action, SendMessage) for action in actions)
+        assert "Alice" in get_list_message(chat=chat).text
+        asyncio.run(chat.delete_queued_messages())
+        assert chat.get_message(chat_id=CHAT_ID, message_id=old_list_message.message_id) is None
+        assert chat.api.metrics.get_count(command="reg") == 1
+
+    def test_button_answered_first(self, chat: InMemoryChat):
+        """Test a slot button is answered before the list is sent, under the name of the sender."""
+        actions = asyncio.run(chat.press(
+            chat_id=CHAT_ID,
+            message_id=get_list_message(chat=chat).message_id,
+            sender=BOB,
+            callback_data=CallbackData.encode(Command.CALLBACK_CODE_RG, "b")
+        ))
+        assert isinstance(actions[0], AnswerButton)
+        assert len(chat.answers) == 1
+        assert "Bob Lee" in get_list_message(chat=chat).text
+        assert chat.api.metrics.get_count(command="button_rg") == 1
+
+    def test_button_conflict_suggests_deregistration(self, chat: InMemoryChat):
+        """Test pressing the button of a slot again sends the suggestion of the command to deregister."""
+        for _ in range(2):
+            actions = asyncio.run(chat.press(
+                chat_id=CHAT_ID,
+                message_id=get_list_message(chat=chat).message_id,
+                sender=BOB,
+                callback_data=CallbackData.encode(Command.CALLBACK_CODE_RG, "b")
+            ))
+        suggestions = [action for action in actions
+                       if isinstance(action, SendMessage) and f"/{Command.COMMAND_DRG}" in action.text]
+        assert len(suggestions) == 1 and suggestions[0].parse_mode == SendMessage.PARSE_MODE_MARKDOWN_V2
+
+    def test_deregister_button_of_other_member(self, chat: InMemoryChat):
+        """Test pressing the deregistration button of another member only shows an alert."""
+        actions = asyncio.run(chat.press(
+            chat_id=CHAT_ID,
+            message_id=get_list_message(chat=chat).message_id,
+            sender=BOB,
+            callback_data=CallbackData.encode(Command.CALLBACK_CODE_DRG_SLOT, ALICE.id, "a")
+        ))
+        assert len(actions) == 1 and actions[0].show_alert
+
+    def test_list_edited_in_place(self, chat: InMemoryChat, monkeypatch):
+        """Test the posted list is edited if configured, and posted again if it cannot be edited."""
+        monkeypatch.setattr(Config, "edit_list_in_place", True)
+        list_message = get_list_message(chat=chat)
+        actions = asyncio.run(chat.send(chat_id=CHAT_ID, sender=ALICE, text=f"/{Command.COMMAND_RG} Alice a"))
+        assert any(isinstance(action, EditMessage) for action in actions)
+        assert get_list_message(chat=chat) is list_message and "Alice" in list_message.text
+
+        # the list is deleted by someone
+        asyncio.run(chat.execute(actions=[DeleteMessage(chat_id=CHAT_ID, message_id=list_message.message_id)]))
+        asyncio.run(chat.send(chat_id=CHAT_ID, sender=BOB, text=f"/{Command.COMMAND_RG} Bob a"))
+        reposted_list_message = get_list_message(chat=chat)
+        assert reposted_list_message.message_id != list_message.message_id
+        assert "Bob" in reposted_list_message.text
+
+    def test_list_edited_after_allpending(self, chat: InMemoryChat, monkeypatch):
+        """Test the list is paginated again after /allpending, which changes no names, and edited in place."""
+        monkeypatch.setattr(Config, "edit_list_in_place", True)
+        for name in ("P1", "P2"):
+            asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=f"/{Command.COMMAND_RG} {name} a"))
+        asyncio.run(chat.send(chat_id=CHAT_ID, sender=ALICE, text=f"/{Command.COMMAND_RS} Alice a"))
+        list_message = get_list_message(chat=chat)
+        assert f"{Term.RESERVATION}. Alice\n" in list_message.text
+        actions = asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=f"/{Command.COMMAND_ALLPENDING}"))
+        assert any(isinstance(action, EditMessage) for action in actions)
+        assert f"{Term.RESERVATION}. Alice {Term.PENDING}" in list_message.text
+
+    def test_memory_snapshots_for_admins(self, chat: InMemoryChat):
+        """Test /memory compares snapshots for admins only, and /memory stop stops tracing."""
+        asyncio.run(chat.send(chat_id=CHAT_ID, sender=ALICE, text=f"/{Command.COMMAND_MEMORY}"))
+        assert not chat.api.memory_monitor.is_tracing
+        asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=f"/{Command.COMMAND_MEMORY}"))
+        actions = asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=f"/{Command.COMMAND_MEMORY}"))
+        assert "SlotManager" in actions[0].text and "allocation sites" in actions[0].text
+        asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=f"/{Command.COMMAND_MEMORY} stop"))
+        assert not chat.api.memory_monitor.is_tracing
+
+    def test_position_in_waitlist(self, chat: InMemoryChat):
+        """Test /pos tells the position of the sender among the pending reservations of a slot."""
+        for name in ("P1", "P2", "Alice", "Bob Lee"):
+            asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=f"/{Command.COMMAND_RG} {name} a"))
+        actions = asyncio.run(chat.send(chat_id=CHAT_ID, sender=BOB, text=f"/{Command.COMMAND_POS}"))
+        assert "#2 of 2" in actions[0].text and "slot a" in actions[0].text
+        assert "waiting for 0 min" in actions[0].text
+        actions = asyncio.run(chat.send(chat_id=CHAT_ID, sender=BOB, text=f"/{Command.COMMAND_POS} P1"))
+        assert "P1 is a player of slot a" in actions[0].text
+
+    def test_members_promoted_before_guests(self, chat: InMemoryChat, monkeypatch):
+        """Test members (with an alias) wait before guests if configured, also after the list is loaded again."""
+        monkeypatch.setattr(Config, "prioritize_members_in_waitlist", True)
+        tenant = chat.api.get_tenant(chat_id=CHAT_ID)
+        tenant.auto_reg_system.identity_manager.set_alias(telegram_id=BOB.id, alias="Bobby")
+        for name in ("P1", "P2", "Guest"):
+            asyncio.run(chat.send(chat_id=CHAT_ID, sender=ADMIN, text=f"/{Command.COMMAND_RG} {name} a"))
+        asyncio.run(chat.press(
+            chat_id=CHAT_ID,
+            message_id=get_list_message(chat=chat).message_id,
+            sender=BOB,
+            callback_data=CallbackData.encode(Command.CALLBACK_CODE_RG, "a")
+        ))
+        assert tenant.auto_reg_system.data.get_slot(slot_label="a").pending_reservations == ["Bobby", "Guest"]
+
+        reloaded_tenant = chat.api.load_tenant(chat_id=CHAT_ID)
+        reloaded_tenant.auto_reg_system.handle_register(
+            command_string_for_suggestion=Command.COMMAND_DRG,
+            username=ADMIN.username,
+            message=f"/{Command.COMMAND_RG} Other Guest a",
+            chat_id=CHAT_ID
+        )
+        reloaded_tenant.auto_reg_system.identity_manager.set_alias(telegram_id=ALICE.id, alias="Alice")
+        reloaded_tenant.auto_reg_system.handle_register(
+            command_string_for_suggestion=Command.COMMAND_DRG,
+            username=ALICE.username,
+            message=f"/{Command.COMMAND_RG} Alice a",
+            chat_id=CHAT_ID
+        )
+        assert reloaded_tenant.auto_reg_system.data.get_slot(slot_label="a").pending_reservations \
+               == ["Bobby", "Alice", "Guest", "Other Guest"]
+
+    def test_transport_and_scheduler_are_abstract(self):
+        """Test a transport or scheduler missing a method cannot be created."""
+
+        class IncompleteScheduler(Scheduler):
+            def arm_release(self, tenant: Tenant):
+                pass
+
+        for incomplete_class in (Transport, Scheduler, IncompleteScheduler):
+            with pytest.raises(TypeError):
+                incomplete_class()
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.model import SlotDetail
+from chat_api.keyboard_cache import KeyboardCache
+from metrics import Metrics
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(name="registration_data")
+def fixture_registration_data() -> RegistrationData:
+    """Fixture to provide a RegistrationData instance with two slots."""
+    data = RegistrationData()
+    data.insert_slot_detail(SlotDetail(slot_label="a", date_venue="Mon", time="", court="", num_players=2))
+    data.insert_slot_detail(SlotDetail(slot_label="b", date_venue="Mon", time="", court="", num_players=2))
+    return data
+
+
+class TestKeyboardCache:
+    """Unit tests for KeyboardCache class."""
+
+    def test_registration_keyboard_rebuilt_only_when_slots_change(self, registration_data: RegistrationData):
+        """Test registering players does not invalidate the registration keyboard, inserting a slot does."""
+        cache = KeyboardCache()
+        builds: list[int] = []
+
+        def build():
+            builds.append(registration_data.slot_set_revision)
+            return object()
+
+        first = cache.get_registration_keyboard(data=registration_data, build=build)
+        registration_data.register_player(slot_label="a", player="Alice")
+        assert cache.get_registration_keyboard(data=registration_data, build=build) is first
+        assert cache.num_hits == 1
+        assert cache.num_misses == 1
+
+        registration_data.insert_slot_detail(SlotDetail(slot_label="c", date_venue="Tue", time="", court="",
+                                                        num_players=2))
+        assert cache.get_registration_keyboard(data=registration_data, build=build) is not first
+        assert len(builds) == 2
+
+    def test_registration_keyboard_dropped_when_data_replaced(self, registration_data: RegistrationData):
+        """Test a new data object never gets the keyboard of the previous one."""
+        cache = KeyboardCache()
+        first = cache.get_registration_keyboard(data=registration_data, build=object)
+        assert cache.get_registration_keyboard(data=RegistrationData(), build=object) is not first
+        assert cache.num_misses == 2
+
+    def test_member_keyboard_keyed_by_member_revision(self, registration_data: RegistrationData):
+        """Test the keyboard of a user is only rebuilt when that user joins or leaves a slot."""
+        cache = KeyboardCache()
+        registration_data.register_player(slot_label="a", player="Alice")
+        alice_keyboard = cache.get_member_keyboard(data=registration_data, telegram_id=1, id_string="Alice",
+                                                   build=object)
+        registration_data.register_player(slot_label="a", player="Bob")
+        assert cache.get_member_keyboard(data=registration_data, telegram_id=1, id_string="Alice",
+                                         build=object) is alice_keyboard
+
+        registration_data.register_player(slot_label="b", player="Alice")
+        assert cache.get_member_keyboard(data=registration_data, telegram_id=1, id_string="Alice",
+                                         build=object) is not alice_keyboard
+        assert cache.num_hits == 1
+        assert cache.num_misses == 2
+
+    def test_member_keyboard_none_is_cached(self, registration_data: RegistrationData):
+        """Test that having no slot to deregister is cached as well."""
+        cache = KeyboardCache()
+        assert cache.get_member_keyboard(data=registration_data, telegram_id=1, id_string="Alice",
+                                         build=lambda: None) is None
+        assert cache.get_member_keyboard(data=registration_data, telegram_id=1, id_string="Alice",
+                                         build=object) is None
+        assert cache.num_hits == 1
+
+    def test_lookups_counted_in_metrics(self, registration_data: RegistrationData):
+        """Test hits and misses are also counted in metrics, shown in the report and exposed to Prometheus."""
+        metrics = Metrics()
+        cache = KeyboardCache(metrics=metrics)
+        cache.get_registration_keyboard(data=registration_data, build=object)
+        cache.get_registration_keyboard(data=registration_data, build=object)
+        assert (metrics.num_keyboard_cache_hits, metrics.num_keyboard_cache_misses) == (1, 1)
+        assert "Keyboard cache 1 hit(s), 1 miss(es)" in metrics.make_report()
+        prometheus = metrics.to_prometheus()
+        assert "bot_keyboard_cache_hits_total 1" in prometheus and "bot_keyboard_cache_misses_total 1" in prometheus
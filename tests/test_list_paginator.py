@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.data_structure.list_paginator import ListPaginator
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.data_structure.slot_manager import SlotManager
+from auto_registration_system.model import SlotDetail
+from auto_registration_system.term import Term
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(name="registration_data")
+def fixture_registration_data() -> RegistrationData:
+    """Fixture to provide a RegistrationData instance with two dates/venues of three big slots each."""
+    data = RegistrationData()
+    for date_venue in ["Mon", "Tue"]:
+        for slot_label in ["a", "b", "c"]:
+            data.insert_slot_detail(SlotDetail(
+                slot_label=f"{date_venue}{slot_label}",
+                date_venue=date_venue,
+                time="",
+                court="",
+                num_players=50
+            ))
+            for i in range(30):
+                data.register_player(slot_label=f"{date_venue}{slot_label}", player=f"player {date_venue}{slot_label}{i}")
+    return data
+
+
+class TestListPaginator:
+    """Unit tests for ListPaginator class."""
+
+    def test_single_page_is_whole_list(self, registration_data: RegistrationData):
+        """Test a list shorter than a page is the same as the list in one message."""
+        pages = ListPaginator(max_page_length=100000).paginate(data=registration_data)
+        expected = ""
+        for date_venue, slots in registration_data.bookings_by_date_venue.items():
+            expected += f"{Term.DATE_VENUE} {date_venue}\n"
+            for slot_label, slot in slots.items():
+                expected += slot.to_string(slot_label=slot_label)
+        assert pages == [expected]
+
+    def test_pages_split_on_slot_boundaries(self, registration_data: RegistrationData):
+        """Test every page fits, starts with a date/venue and contains whole slots."""
+        max_page_length = 1500
+        pages = ListPaginator(max_page_length=max_page_length).paginate(data=registration_data)
+        assert len(pages) > 2
+        for page in pages:
+            assert len(page) <= max_page_length
+            assert page.startswith(Term.DATE_VENUE)
+        slot_texts = [
+            slot.to_string(slot_label=slot_label)
+            for slots in registration_data.bookings_by_date_venue.values()
+            for slot_label, slot in slots.items()
+        ]
+        joined_pages = "".join(pages)
+        assert all(slot_text in joined_pages for slot_text in slot_texts)
+
+    def test_slot_longer_than_page_split_on_lines(self, registration_data: RegistrationData):
+        """Test a slot longer than a page is split into pages on line boundaries."""
+        pages = ListPaginator(max_page_length=300).paginate(data=registration_data)
+        assert all(len(page) <= 300 and page.endswith("\n") for page in pages)
+
+    def test_pages_cached_until_data_changes(self, registration_data: RegistrationData):
+        """Test pages are rendered again only after the data changes."""
+        paginator = ListPaginator(max_page_length=1500)
+        pages = paginator.paginate(data=registration_data)
+        assert paginator.paginate(data=registration_data) is pages
+        registration_data.register_player(slot_label="Mona", player="Zed")
+        new_pages = paginator.paginate(data=registration_data)
+        assert new_pages is not pages
+        assert "Zed" in "".join(new_pages)
+
+    def test_compact_layout(self):
+        """Test runs of empty positions are collapsed in compact layout only."""
+        slot = SlotManager(slot_name="1-3pm", num_players=5)
+        slot.register(proposed_name="Alice")
+        compact = slot.to_string(slot_label="a", is_compact=True)
+        assert compact.splitlines()[1:] == [f"{Term.INDENT_SPACE}1. Alice", f"{Term.INDENT_SPACE}2.-5. (4 available)"]
+        assert len(slot.to_string(slot_label="a").splitlines()) == 6
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+import time
+
+from metrics import Metrics
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_slowly():
+    time.sleep(0.3)  # stands for a blocking call, e.g. a synchronous file write
+
+
+class TestLoopWatchdog:
+    """Tests of detecting blocking calls in coroutines with the watchdog of Metrics."""
+
+    def test_stall_records_handler_and_stack(self):
+        """Test a blocking call in a measured handler is recorded with the command and the blocking function."""
+        metrics = Metrics()
+
+        async def run_reg():
+            write_slowly()
+
+        async def run() -> None:
+            metrics.watchdog.start(threshold=0.1, interval=0.02)
+            try:
+                await asyncio.sleep(0.05)
+                await metrics.measure(command="reg", callback=run_reg)()
+                await asyncio.sleep(0.05)  # the heartbeat comes after the stall
+            finally:
+                metrics.watchdog.stop()
+
+        asyncio.run(run())
+        stalls = metrics.watchdog.get_recent_stalls()
+        assert len(stalls) == 1 and metrics.watchdog.num_stalls == 1
+        assert stalls[0].command == "reg"
+        assert "write_slowly" in stalls[0].stack[-1]
+        assert stalls[0].duration >= 0.2
+        assert metrics.loop_lag_histogram.max >= 0.2
+        assert "1 stall(s)" in metrics.make_report()
+        assert "bot_event_loop_stalls_total 1" in metrics.to_prometheus()
+
+    def test_no_stall_without_blocking(self):
+        """Test awaiting does not count as a stall, while the lag is still measured."""
+        metrics = Metrics()
+
+        async def run() -> None:
+            metrics.watchdog.start(threshold=0.5, interval=0.02)
+            try:
+                await asyncio.sleep(0.2)
+            finally:
+                metrics.watchdog.stop()
+
+        asyncio.run(run())
+        assert metrics.watchdog.num_stalls == 0
+        assert metrics.loop_lag_histogram.count > 0
+        assert not metrics.watchdog.is_running
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.command_handler.handler_dereg import DeregHandler
+from auto_registration_system.data_structure.membership_snapshot import MembershipSnapshot
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.model import SlotDetail
+from string_parser.command_arguments import CommandArguments
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(name="registration_data")
+def fixture_registration_data() -> RegistrationData:
+    """Fixture to provide a RegistrationData instance with a full slot of two players and one pending reserve."""
+    data = RegistrationData()
+    data.insert_slot_detail(SlotDetail(slot_label="a", date_venue="Mon", time="", court="", num_players=2))
+    data.insert_slot_detail(SlotDetail(slot_label="b", date_venue="Mon", time="", court="", num_players=2))
+    for player in ["Alice", "Bob", "Carol"]:
+        data.register_player(slot_label="a", player=player)
+    return data
+
+
+class TestMembershipSnapshot:
+    """Unit tests for MembershipSnapshot class."""
+
+    def test_registration(self, registration_data: RegistrationData):
+        """Test a new player is described with its position."""
+        snapshot = MembershipSnapshot(data=registration_data)
+        registration_data.register_player(slot_label="b", player="Dave")
+        assert snapshot.describe_changes(data=registration_data) == ["Dave → slot b #1"]
+
+    def test_promotion_after_deregistration(self, registration_data: RegistrationData):
+        """Test the pending reserve taking the place of a deregistered player is described as promoted."""
+        snapshot = MembershipSnapshot(data=registration_data)
+        DeregHandler.handle(arguments=CommandArguments.parse(message="/drg Alice a"), data=registration_data)
+        assert snapshot.describe_changes(data=registration_data) == [
+            "Alice ✗ slot a",
+            "Carol promoted from reserve to slot a #2",
+        ]
+
+    def test_no_change(self, registration_data: RegistrationData):
+        """Test nothing is described if nothing changed."""
+        snapshot = MembershipSnapshot(data=registration_data)
+        assert snapshot.describe_changes(data=registration_data) == []
+
+    def test_new_slots_not_described(self, registration_data: RegistrationData):
+        """Test changes of slots themselves cannot be described in short."""
+        snapshot = MembershipSnapshot(data=registration_data)
+        registration_data.insert_slot_detail(SlotDetail(slot_label="c", date_venue="Tue", time="", court="",
+                                                        num_players=2))
+        assert snapshot.describe_changes(data=registration_data) is None
+        assert snapshot.describe_changes(data=RegistrationData()) is None
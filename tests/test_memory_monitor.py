@@ -0,0 +1,60 @@
+import gc
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.data_structure.slot_manager import SlotManager
+from memory_monitor import MemoryMonitor
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def allocate_blocks() -> list[bytes]:
+    return [bytes(1000) + bytes([i % 256]) for i in range(2000)]
+
+
+@pytest.fixture(name="monitor")
+def fixture_monitor():
+    """Fixture to provide a memory monitor, stopping tracing afterwards."""
+    monitor = MemoryMonitor()
+    yield monitor
+    monitor.stop()
+
+
+class TestMemoryMonitor:
+    """Tests of comparing tracemalloc snapshots and sampling memory with MemoryMonitor."""
+
+    def test_first_snapshot_starts_tracing(self, monitor: MemoryMonitor):
+        """Test the first snapshot starts tracing without a comparison."""
+        report = monitor.compare_snapshot()
+        assert monitor.is_tracing
+        assert "Tracing started" in report and "allocation sites" not in report
+
+    def test_growth_reported_by_line(self, monitor: MemoryMonitor):
+        """Test allocations between two snapshots are reported at the line allocating them."""
+        monitor.compare_snapshot()
+        blocks = allocate_blocks()
+        report = monitor.compare_snapshot()
+        assert len(blocks) == 2000
+        top_site = report.splitlines()[2]
+        assert "tests/test_memory_monitor.py:" in top_site and top_site.startswith("+")
+
+    def test_stop(self, monitor: MemoryMonitor):
+        """Test stopping forgets the snapshot, so that the next one starts tracing again."""
+        monitor.compare_snapshot()
+        monitor.stop()
+        assert not monitor.is_tracing
+        assert "Tracing started" in monitor.compare_snapshot()
+
+    def test_sample_counts_objects(self, monkeypatch):
+        """Test the sample counts live registration structures without collecting or walking the heap."""
+        monkeypatch.setattr(gc, "collect", None)
+        monkeypatch.setattr(gc, "get_objects", None)
+        num_slot_managers = MemoryMonitor.count_objects()["SlotManager"]
+        slot_manager = SlotManager(slot_name="a", num_players=2)
+        assert MemoryMonitor.count_objects()["SlotManager"] == num_slot_managers + 1
+        assert "SlotManager" in MemoryMonitor.make_sample() and "RSS" in MemoryMonitor.make_sample()
+        del slot_manager
+        assert MemoryMonitor.count_objects()["SlotManager"] == num_slot_managers
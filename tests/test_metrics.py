@@ -0,0 +1,130 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from metrics import CommandMeasurement, Histogram, Metrics
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(name="metrics")
+def fixture_metrics() -> Metrics:
+    """Fixture to provide an empty Metrics instance."""
+    return Metrics()
+
+
+class TestHistogram:
+    """Unit tests for Histogram class."""
+
+    def test_percentiles(self):
+        """Test percentiles are the upper bounds of their buckets, capped by the maximum."""
+        histogram = Histogram()
+        for _ in range(90):
+            histogram.observe(0.003)
+        for _ in range(10):
+            histogram.observe(0.2)
+        assert histogram.percentile(50) == 0.005
+        assert histogram.percentile(95) == 0.2
+        assert histogram.percentile(99) == 0.2
+        assert histogram.count == 100
+        assert Histogram().percentile(50) is None
+
+    def test_cumulative_bucket_counts(self):
+        """Test cumulative counts end with every value in the unbounded bucket."""
+        histogram = Histogram()
+        histogram.observe(0.0001)
+        histogram.observe(100.0)
+        counts = histogram.get_cumulative_bucket_counts()
+        assert counts[0] == (Histogram.BOUNDS[0], 1)
+        assert counts[-2] == (Histogram.BOUNDS[-1], 1)
+        assert counts[-1][1] == 2
+
+
+class TestCommandMeasurement:
+    """Unit tests for CommandMeasurement class."""
+
+    def test_nested_phase_counts_for_innermost_only(self):
+        """Test time spent in a nested phase is not counted again for the outer phase."""
+        measurement = CommandMeasurement(command="reg")
+        measurement.enter_phase(Metrics.PHASE_RENDER)
+        measurement.enter_phase(Metrics.PHASE_PERSIST)
+        measurement.exit_phase()
+        measurement.exit_phase()
+        assert set(measurement.phase_durations) == {Metrics.PHASE_RENDER, Metrics.PHASE_PERSIST}
+
+
+class TestMetrics:
+    """Tests of measuring handlers with Metrics."""
+
+    def test_measured_handler(self, metrics: Metrics):
+        """Test a handler is counted under its command and outcome, with its phases."""
+
+        async def run_reg():
+            with Metrics.phase(phase=Metrics.PHASE_PARSE):
+                pass
+            Metrics.set_outcome(outcome=Metrics.OUTCOME_REJECTED)
+
+        asyncio.run(metrics.measure(command="reg", callback=run_reg)())
+        assert metrics.get_count(command="reg") == 1
+        assert metrics.get_count(command="reg", outcome=Metrics.OUTCOME_REJECTED) == 1
+        assert metrics.get_histogram(command="reg", phase=Metrics.PHASE_PARSE).count == 1
+        assert metrics.get_histogram(command="reg", phase=Metrics.TOTAL).count == 1
+
+    def test_error_and_renamed_command(self, metrics: Metrics):
+        """Test a handler raising is counted as error under the command it set."""
+
+        async def handle_buttons():
+            Metrics.set_command(command="button_rg")
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            asyncio.run(metrics.measure(command="handle_buttons", callback=handle_buttons)())
+        assert metrics.get_commands() == ["button_rg"]
+        assert metrics.get_count(command="button_rg", outcome=Metrics.OUTCOME_ERROR) == 1
+
+    def test_phase_outside_measured_handler(self, metrics: Metrics):
+        """Test phases outside handlers (e.g. jobs) are ignored."""
+        with Metrics.phase(phase=Metrics.PHASE_PERSIST):
+            pass
+        assert Metrics.get_current_measurement() is None
+        assert metrics.get_commands() == []
+
+    def test_report_and_prometheus(self, metrics: Metrics):
+        """Test the report and the Prometheus text contain the measured commands."""
+
+        async def run_all():
+            pass
+
+        asyncio.run(metrics.measure(command="all", callback=run_all)())
+        assert "all: 1 ok" in metrics.make_report()
+        prometheus = metrics.to_prometheus()
+        assert 'bot_updates_total{command="all",outcome="ok"} 1' in prometheus
+        assert 'bot_update_duration_seconds_count{command="all",phase="total"} 1' in prometheus
+        assert 'le="+Inf"' in prometheus
+
+    def test_api_calls_per_update(self, metrics: Metrics):
+        """Test calls of the Bot API are counted for the command causing them, as a factor per update."""
+
+        async def run_reg():
+            with Metrics.api_call(method="sendMessage"):
+                pass
+            with Metrics.api_call(method="sendMessage"):
+                pass
+            Metrics.count_api_call(method="deleteMessage")
+
+        async def run_av():
+            pass
+
+        for _ in range(2):
+            asyncio.run(metrics.measure(command="reg", callback=run_reg)())
+        asyncio.run(metrics.measure(command="av", callback=run_av)())
+        assert metrics.get_api_call_count(command="reg") == 6
+        assert metrics.get_amplification(command="reg") == 3.0
+        assert metrics.get_amplification(command="reg", method="sendMessage") == 2.0
+        assert metrics.get_amplifications() == {"av": 0.0, "reg": 3.0}
+        assert metrics.get_histogram(command="reg", phase=Metrics.PHASE_NETWORK).count == 2
+        assert "3.00 API calls per update (deleteMessage 1.00, sendMessage 2.00)" in metrics.make_report()
+        assert 'bot_api_calls_total{command="reg",method="sendMessage"} 4' in metrics.to_prometheus()
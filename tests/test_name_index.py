@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.command_handler.handler_dereg import DeregHandler
+from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.model import SlotDetail
+from string_parser.command_arguments import CommandArguments
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(name="registration_data")
+def fixture_registration_data() -> RegistrationData:
+    """Fixture to provide a RegistrationData instance with John in two slots and Alice in one."""
+    data = RegistrationData()
+    data.insert_slot_detail(SlotDetail(slot_label="a", date_venue="Mon", time="", court="", num_players=2))
+    data.insert_slot_detail(SlotDetail(slot_label="b", date_venue="Tue", time="", court="", num_players=2))
+    data.register_player(slot_label="a", player="John")
+    data.register_player(slot_label="a", player="Alice")
+    data.reserve_player(slot_label="b", player="John")
+    return data
+
+
+class TestNameIndex:
+    """Unit tests for the name index of RegistrationData."""
+
+    def test_similar_names(self, registration_data: RegistrationData):
+        """Test a misspelled name finds the close names with their slots."""
+        assert registration_data.find_similar_names(query="Jon") == [("John", ["a", "b"])]
+        assert registration_data.find_similar_names(query="Jon", slot_label="b") == [("John", ["b"])]
+        assert registration_data.find_similar_names(query="Zed") == []
+
+    def test_index_follows_changes(self, registration_data: RegistrationData):
+        """Test the index is updated after players are inserted and removed."""
+        assert registration_data.get_slot_labels_of_name(name="John") == ["a", "b"]
+        DeregHandler.handle(arguments=CommandArguments.parse(message="/drg John a"), data=registration_data)
+        assert registration_data.get_slot_labels_of_name(name="John") == ["b"]
+        DeregHandler.handle(arguments=CommandArguments.parse(message="/drg John b"), data=registration_data)
+        assert registration_data.get_slot_labels_of_name(name="John") == []
+        assert registration_data.find_similar_names(query="Jon") == []
+        registration_data.register_player(slot_label="b", player="Johnny")
+        assert [name for name, _ in registration_data.find_similar_names(query="John")] == ["Johnny"]
+
+    def test_deregistration_suggests_close_name(self, registration_data: RegistrationData):
+        """Test deregistering a name not in the slot suggests the close names in it."""
+        response = DeregHandler.handle(arguments=CommandArguments.parse(message="/drg Jon a"), data=registration_data)
+        assert "Did you mean John?" in response
+        suggestion = DeregHandler.make_suggestion(command_string="drg", id_string="Jon", data=registration_data)
+        assert "/drg John a" in suggestion and "/drg John b" in suggestion
+
+    def test_index_updated_without_scanning_slots(self, registration_data: RegistrationData, monkeypatch):
+        """Test queries are answered from the index, with slots in the order of the list even if a slot is inserted
+        into an earlier date/venue later."""
+        registration_data.insert_slot_detail(SlotDetail(slot_label="c", date_venue="Mon", time="", court="",
+                                                        num_players=1))
+        monkeypatch.setattr(RegistrationData, "collect_all_slots_with_labels", None)  # any scan fails
+        registration_data.reserve_player(slot_label="c", player="John")
+        assert registration_data.get_slot_labels_of_name(name="John") == ["a", "c", "b"]
+        registration_data.register_player(slot_label="c", player="John")  # moved from reserve, still in c
+        registration_data.get_slot(slot_label="a").deregister(names={"John"})
+        assert registration_data.get_slot_labels_of_name(name="John") == ["c", "b"]
+        assert registration_data.find_similar_names(query="Jon") == [("John", ["c", "b"])]
@@ -3,9 +3,11 @@ import sys
 import pytest
 
 from auto_registration_system.model import User
-from auto_registration_system.command_handler.handler_new import NewHandler
+from auto_registration_system.command_handler.handler_new import NewHandler, DateVenueNode, SlotNode, PlayerNode
 from auto_registration_system.data_structure.registration_data import RegistrationData
+from auto_registration_system.exception.exception_list_errors import ListErrorsException
 from auto_registration_system.exception.exception_syntax_error import SyntaxErrorException
+from auto_registration_system.model import SlotDetail
 from config import Config
 
 # Add the parent directory to Python path to import modules
@@ -160,3 +162,81 @@ class TestNewHandler:
         assert eva.is_paid is False
         assert eva.is_reserve is True
         assert eva.is_pending is True
+
+    def test_compact_layout_read_back(self, admin: User):
+        """Test a list posted in compact layout is parsed back into the same slots."""
+        data = RegistrationData()
+        data.insert_slot_detail(SlotDetail(slot_label="a", date_venue="Mon", time="", court="", num_players=6))
+        data.insert_slot_detail(SlotDetail(slot_label="b", date_venue="Mon", time="", court="", num_players=1))
+        for player in ("Alice", "Bob"):
+            data.register_player(slot_label="a", player=player)
+        for player in ("Carol", "Dave"):
+            data.register_player(slot_label="b", player=player)
+        lines = ["[dv] Mon"] + [
+            line
+            for slot_label, slot in data.collect_all_slots_with_labels()
+            for line in slot.to_string(slot_label=slot_label, is_compact=True).splitlines()
+        ]
+        assert "3.-6. (4 available)" in "\n".join(lines)
+
+        read_back = RegistrationData()
+        NewHandler.handle_lines(user=admin, lines=lines, data=read_back, max_num_players=50)
+        for slot_label, slot in data.collect_all_slots_with_labels():
+            read_back_slot = read_back.get_slot(slot_label=slot_label)
+            assert read_back_slot.num_players == slot.num_players
+            assert read_back_slot.to_string(slot_label=slot_label, is_compact=True) \
+                   == slot.to_string(slot_label=slot_label, is_compact=True)
+        assert read_back.get_slot(slot_label="a").players == ["Alice", "Bob"]
+        assert read_back.get_slot(slot_label="b").pending_reservations == ["Dave"]
+
+    def test_parse_into_nodes(self):
+        """Test each non-empty line is parsed once into a node carrying its line number."""
+        lines = [
+            "[dv] 🏸14/09 SUN Queenstown cc",
+            "",
+            "[s] ❤️1:00-3:00 pm (1), #players: 2",
+            "   1. Alice (paid)",
+            "   2.",
+        ]
+        nodes = list(NewHandler.parse(lines=lines))
+        assert [type(node) for node in nodes] == [DateVenueNode, SlotNode, PlayerNode, PlayerNode]
+        assert [node.line_number for node in nodes] == [1, 3, 4, 5]
+        assert nodes[0].date_venue == "🏸14/09 SUN Queenstown cc"
+        assert nodes[1].slot_detail.slot_label == "s"
+        assert nodes[2].player.name == "Alice" and nodes[2].player.is_paid
+        assert nodes[3].player is None
+
+    def test_parse_invalid_line(self):
+        """Test a line which is neither a date/venue, a slot nor a player is a syntax error."""
+        with pytest.raises(SyntaxErrorException):
+            list(NewHandler.parse(lines=["[dv] Mon", "Alice"]))
+
+    def test_all_errors_reported_with_line_numbers(self, admin: User):
+        """Test every invalid line is reported in one pass, and players of an invalid slot are not."""
+        lines = iter([
+            "[dv] Mon",
+            "[a] 1-3pm, #players: 2",
+            "   1. Alice",
+            "Bob",
+            "[a] 3-5pm, #players: 2",
+            "   1. Carol",
+            "[b] 5-7pm, #players: 100",
+            "[c] 7-9pm, #players: x",
+        ])
+        with pytest.raises(ListErrorsException) as excinfo:
+            NewHandler.handle_lines(user=admin, lines=lines, data=RegistrationData(), max_num_players=50)
+        assert [line_number for line_number, _ in excinfo.value.errors] == [4, 5, 7, 8]
+        assert "Line 4:" in repr(excinfo.value)
+
+    def test_many_long_errors_fit_in_a_message(self, admin: User):
+        """Test errors are shortened and left out once the report would not fit in a message."""
+        lines = ["[dv] Mon", "[a] 1-3pm, #players: 2"] + [f"[c{i}] 7-9pm, #players: " + "x" * 1000 for i in range(100)]
+        with pytest.raises(ListErrorsException) as excinfo:
+            NewHandler.handle_lines(user=admin, lines=lines, data=RegistrationData(), max_num_players=50)
+        report = repr(excinfo.value)
+        assert len(report) <= ListErrorsException.MAX_LENGTH
+        assert all(len(line) <= ListErrorsException.MAX_ERROR_LENGTH + len("Line 102: ")
+                   for line in report.splitlines()[1:])
+        num_listed = sum(1 for line in report.splitlines() if line.startswith("Line "))
+        assert report.endswith(f"... and {len(excinfo.value.errors) - num_listed} more errors")
+        assert report.splitlines()[1].startswith("Line 3: ") and report.splitlines()[1].endswith("...")
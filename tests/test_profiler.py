@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from metrics import Metrics
+from profiler import UpdateProfiler
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_busy_work() -> int:
+    return sum(i * i for i in range(1000))
+
+
+class TestUpdateProfiler:
+    """Tests of profiling updates handled by measured handlers."""
+
+    def test_stats_after_requested_number_of_updates(self):
+        """Test the stats are handed over once the requested number of updates is handled, not before."""
+        metrics = Metrics()
+        received: list[str] = []
+
+        async def on_finished(stats: str):
+            received.append(stats)
+
+        async def run_reg():
+            make_busy_work()
+
+        async def run() -> None:
+            handler = metrics.measure(command="reg", callback=run_reg)
+            metrics.profiler.start(num_updates=2, on_finished=on_finished)
+            await handler()
+            assert received == [] and metrics.profiler.num_remaining_updates == 1
+            await handler()
+            await handler()  # not profiled anymore
+
+        asyncio.run(run())
+        assert len(received) == 1
+        assert "make_busy_work" in received[0]
+        assert "Sorted by cumulative time" in received[0] and "Sorted by own time" in received[0]
+        assert not metrics.profiler.is_active
+
+    def test_update_starting_profiling_not_counted(self):
+        """Test the update turning profiling on (e.g. /profile) is not one of the profiled updates."""
+        metrics = Metrics()
+
+        async def on_finished(_: str):
+            pass
+
+        async def run_profile():
+            metrics.profiler.start(num_updates=1, on_finished=on_finished)
+
+        asyncio.run(metrics.measure(command="profile", callback=run_profile)())
+        assert metrics.profiler.is_active
+        assert metrics.profiler.stop() != ""
+
+    def test_only_one_profiling_at_a_time(self):
+        """Test profiling cannot be started again while in progress."""
+        profiler = UpdateProfiler()
+
+        async def on_finished(_: str):
+            pass
+
+        profiler.start(num_updates=3, on_finished=on_finished)
+        with pytest.raises(RuntimeError):
+            profiler.start(num_updates=3, on_finished=on_finished)
+        profiler.stop()
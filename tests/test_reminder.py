@@ -0,0 +1,58 @@
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+
+from auto_registration_system.data_structure.reminder import Reminder
+from auto_registration_system.data_structure.time_manager import TimeManager
+from config import Config
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(name="time_manager")
+def fixture_time_manager() -> TimeManager:
+    """Fixture to provide a TimeManager instance for tests."""
+    return TimeManager(
+        time_zone=Config.time_zone,
+        input_time_format=Config.input_time_format,
+        output_time_format=Config.output_time_format
+    )
+
+
+class TestReminder:
+    """Unit tests for Reminder class."""
+
+    def test_invalid_time_list(self):
+        """Test time lists must be strictly decreasing and positive."""
+        with pytest.raises(Exception):
+            Reminder(time_list=[5, 10])
+        with pytest.raises(Exception):
+            Reminder(time_list=[5, 0])
+
+    def test_upcoming_reminders(self, time_manager: TimeManager):
+        """Test every reminder is placed exactly before release time."""
+        release_time = time_manager.now() + timedelta(minutes=30)
+        reminders = Reminder(time_list=[15, 5]).get_upcoming_reminders(
+            time_manager=time_manager,
+            release_time=release_time
+        )
+        assert reminders == [
+            (15, release_time - timedelta(minutes=15)),
+            (5, release_time - timedelta(minutes=5)),
+        ]
+
+    def test_past_reminders_are_skipped(self, time_manager: TimeManager):
+        """Test reminders whose time has passed are not returned."""
+        release_time = time_manager.now() + timedelta(minutes=10)
+        reminders = Reminder(time_list=[60, 5]).get_upcoming_reminders(
+            time_manager=time_manager,
+            release_time=release_time
+        )
+        assert [minutes_left for minutes_left, _ in reminders] == [5]
+
+    def test_no_release_time(self, time_manager: TimeManager):
+        """Test there is no reminder without release time."""
+        assert Reminder(time_list=[5]).get_upcoming_reminders(time_manager=time_manager, release_time=None) == []
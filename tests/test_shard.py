@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("telegram")
+from telegram import Update  # noqa: E402
+from telegram_adapter.shard import ShardFrame, ShardIngress, ShardRouter, ShardWorkerServer  # noqa: E402
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    return Update.de_json(
+        data={
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "group"},
+                "text": "/all",
+            },
+        },
+        bot=None
+    )
+
+
+@pytest.fixture(name="router")
+def fixture_router() -> ShardRouter:
+    """Fixture to provide a ShardRouter over two workers."""
+    return ShardRouter(num_workers=2, tenant_chat_ids={-10, -11}, staging_chat_ids={7: -11}, default_chat_id=-10)
+
+
+class TestShardRouter:
+    """Unit tests for ShardRouter class."""
+
+    def test_tenants_are_spread_over_workers(self, router: ShardRouter):
+        """Test different tenants can be owned by different workers."""
+        assert router.get_worker_index(chat_id=-10) == -10 % 2
+        assert router.get_worker_index(chat_id=-11) == -11 % 2
+
+    def test_staging_chat_goes_to_worker_of_its_tenant(self, router: ShardRouter):
+        """Test private chats staging lists go to the worker owning the tenant."""
+        assert router.get_worker_index(chat_id=7) == router.get_worker_index(chat_id=-11)
+        assert router.get_worker_index(chat_id=8) == router.get_worker_index(chat_id=-10)
+        assert router.get_worker_index(chat_id=None) == router.get_worker_index(chat_id=-10)
+
+
+class TestShardIngress:
+    """Tests of forwarding updates from the ingress to worker servers over Unix sockets."""
+
+    def test_updates_buffered_until_worker_starts(self, router: ShardRouter, tmp_path):
+        """Test updates sent while a worker is down are delivered in order once it listens."""
+
+        async def run() -> list[int]:
+            application = SimpleNamespace(update_queue=asyncio.Queue(), bot=None)
+            socket_paths = [str(tmp_path / f"worker_{worker_index}.sock") for worker_index in range(2)]
+            ingress = ShardIngress(router=router, socket_paths=socket_paths, max_num_buffered_updates=10)
+            worker_index = router.get_worker_index(chat_id=-10)
+            for update_id in range(3):
+                ingress.dispatch(update=make_update(update_id=update_id, chat_id=-10))
+            assert ingress.get_num_pending_updates(worker_index=worker_index) == 3
+
+            server = ShardWorkerServer(application=application, socket_path=socket_paths[worker_index])
+            await server.start()
+            received = [(await asyncio.wait_for(application.update_queue.get(), timeout=5)).update_id
+                        for _ in range(3)]
+            while ingress.get_num_pending_updates(worker_index=worker_index) > 0:
+                await asyncio.sleep(0.01)
+            assert ingress.num_updates_forwarded == 3
+            await ingress.stop()
+            await server.stop()
+            return received
+
+        assert asyncio.run(run()) == [0, 1, 2]
+
+    def test_oldest_updates_dropped_when_replaying_into_full_buffer(self, router: ShardRouter, tmp_path):
+        """Test unacknowledged updates replayed into a full buffer push out the oldest updates, counted as dropped."""
+
+        async def run() -> list[int]:
+            socket_paths = [str(tmp_path / f"worker_{worker_index}.sock") for worker_index in range(2)]
+            ingress = ShardIngress(router=router, socket_paths=socket_paths, max_num_buffered_updates=3)
+            ingress._unacknowledged[0].update({0: b"0", 1: b"1"})
+            ingress._buffers[0].extend([(10, b"10"), (11, b"11")])
+            reader = asyncio.StreamReader()
+            reader.feed_eof()  # the worker is gone
+            await ingress._receive_acknowledgements(worker_index=0, reader=reader)
+            await ingress.stop()
+            assert ingress.num_updates_dropped == 1
+            return [update_id for update_id, _ in ingress._buffers[0]]
+
+        assert asyncio.run(run()) == [1, 10, 11]
+
+    def test_replayed_update_queued_once(self, tmp_path):
+        """Test an update received again, e.g. replayed after a lost connection, is acknowledged but not queued."""
+
+        async def run() -> (list[int], list[dict]):
+            application = SimpleNamespace(update_queue=asyncio.Queue(), bot=None)
+            server = ShardWorkerServer(application=application, socket_path=str(tmp_path / "worker.sock"))
+            await server.start()
+            acks = []
+            for update_id in (0, 1):
+                reader, writer = await asyncio.open_unix_connection(path=str(tmp_path / "worker.sock"))
+                for replayed_update_id in range(update_id + 1):
+                    writer.write(ShardFrame.encode(make_update(update_id=replayed_update_id, chat_id=-10).to_dict()))
+                    acks.append(await asyncio.wait_for(ShardFrame.read(reader), timeout=5))
+                writer.close()
+            await server.stop()
+            queued = []
+            while not application.update_queue.empty():
+                queued.append(application.update_queue.get_nowait().update_id)
+            assert server.num_duplicate_updates == 1
+            return queued, acks
+
+        assert asyncio.run(run()) == ([0, 1], [{"ack": 0}, {"ack": 0}, {"ack": 1}])
+
+    def test_frame_round_trip(self):
+        """Test a frame is read back as the same payload and a closed stream reads as None."""
+
+        async def run() -> (dict, dict | None):
+            reader = asyncio.StreamReader()
+            reader.feed_data(ShardFrame.encode({"update_id": 5, "text": "ă"}))
+            reader.feed_eof()
+            return await ShardFrame.read(reader), await ShardFrame.read(reader)
+
+        assert asyncio.run(run()) == ({"update_id": 5, "text": "ă"}, None)
@@ -146,6 +146,30 @@ class TestSlotManager:
         assert "PendingPlayer" not in slot_manager.pending_reservations
         assert len(slot_manager.players) == 3
 
+    def test_waitlist_priority_and_position(self, slot_manager: SlotManager):
+        """Test a full slot promotes from the waitlist by priority class, then first come, first served."""
+        for player in ("Player1", "Player2", "Player3", "Late", "Later"):
+            slot_manager.register(player)
+        slot_manager.register("Member", priority=-1)
+        assert slot_manager.pending_reservations == ["Member", "Late", "Later"]
+        assert slot_manager.waitlist.get_position("Later") == 3
+        slot_manager.deregister(names={"Player2"})
+        assert slot_manager.players == ["Player1", "Player3", "Member"]
+        assert slot_manager.waitlist.get_position("Later") == 2
+
+    def test_deregister_and_make_reservations_pending(self, slot_manager: SlotManager):
+        """Test deregistering from every list, and moving the non-pending reservations to the waitlist."""
+        for player in ("Player1", "Player2", "Player3", "Pending"):
+            slot_manager.register(player)
+        slot_manager.reserve("Reserved")
+        slot_manager.deregister(names={"Player1", "Reserved", "Unknown"})
+        assert slot_manager.players == ["Player2", "Player3", "Pending"]
+        assert slot_manager.non_pending_reservations == []
+        slot_manager.reserve("Reserved")
+        slot_manager.make_reservations_pending()
+        assert slot_manager.pending_reservations == ["Reserved"]
+        assert slot_manager.non_pending_reservations == []
+
     def test_get_num_available(self, slot_manager: SlotManager):
         """Test get_num_available method."""
         # Test when no players registered
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.exception.exception_last_word_not_found import LastWordNotFoundException
+from string_parser.string_parser import StringParser
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestStringParser:
+    """Unit tests for StringParser class."""
+
+    def test_escape_characters_for_markdown(self):
+        """Test every special character of MarkdownV2 is escaped exactly once and can be unescaped."""
+        special_characters = "_*[]()~`>#+-=|{}.!"
+        escaped = StringParser.replace_escape_characters_for_markdown(f"a{special_characters}b")
+        assert escaped == "a" + "".join(f"\\{c}" for c in special_characters) + "b"
+        assert StringParser.remove_escape_characters_for_markdown(escaped) == f"a{special_characters}b"
+
+    def test_redundant_spaces(self):
+        """Test runs of spaces are collapsed and the ends stripped."""
+        assert StringParser.remove_redundant_spaces("  Nguyen   Van  A ") == "Nguyen Van A"
+
+    def test_split_names(self):
+        """Test names are split by commas, trimmed and capitalized."""
+        assert StringParser.split_names(" alice ,  bob  tan,carol") == ["Alice", "Bob Tan", "Carol"]
+
+    def test_words(self):
+        """Test first and last words are taken by whitespace."""
+        assert StringParser.get_first_word("/rg  Alice, Bob a") == "/rg"
+        assert StringParser.get_last_word("/rg Alice, Bob a\t") == "a"
+        with pytest.raises(LastWordNotFoundException):
+            StringParser.get_last_word("   ")
+
+    def test_process_telegram_full_name(self):
+        """Test commas are removed from the full name, which is then one name."""
+        assert StringParser.process_telegram_full_name("nguyen,  van a") == "Nguyen Van A"
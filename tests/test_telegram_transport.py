@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from chat_api.action import SendMessage
+from tracer import Tracer
+
+pytest.importorskip("telegram")
+from telegram.error import BadRequest, NetworkError  # noqa: E402
+
+from telegram_adapter.telegram_transport import TelegramTransport  # noqa: E402
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SentMessage:
+    def __init__(self, message_id: int):
+        self.message_id: int = message_id
+
+
+class FakeBot:
+    """Stand-in for the Bot API, failing the first num_failures calls of send_message with error (or the ones
+    with a parse mode if error is BadRequest)."""
+
+    def __init__(self, error: Exception, num_failures: int):
+        self.error: Exception = error
+        self.num_failures: int = num_failures
+        self.calls: list[(str, str | None)] = []
+
+    async def send_message(self, chat_id: int, text: str, parse_mode: str | None, reply_markup, reply_parameters):
+        self.calls.append((text, parse_mode))
+        if isinstance(self.error, BadRequest) and parse_mode is not None or len(self.calls) <= self.num_failures:
+            raise self.error
+        return SentMessage(message_id=len(self.calls))
+
+
+@pytest.fixture(name="tracer")
+def fixture_tracer(tmp_path) -> Tracer:
+    """Fixture to provide a tracer writing into a temporary directory."""
+    return Tracer(file_name_log=str(tmp_path / "activities.log"), file_name_history=str(tmp_path / "history.txt"),
+                  time_manager=None)
+
+
+@pytest.fixture(autouse=True)
+def fixture_no_delay(monkeypatch):
+    """Fixture to retry without waiting."""
+    monkeypatch.setattr(TelegramTransport, "RETRY_DELAY", 0)
+
+
+class TestTelegramTransport:
+    """Tests of sending messages again after errors of the Bot API."""
+
+    def test_bad_request_sent_again_as_plain_text(self, tracer: Tracer):
+        """Test text rejected for its MarkdownV2 is sent once more as plain text, without a connection notice."""
+        bot = FakeBot(error=BadRequest("Can't parse entities"), num_failures=0)
+        action = SendMessage(chat_id=1, text="Anh-Tuan", parse_mode=SendMessage.PARSE_MODE_MARKDOWN_V2)
+        assert asyncio.run(TelegramTransport(bot=bot, tracer=tracer).execute_action(action=action))
+        assert bot.calls == [("Anh-Tuan", SendMessage.PARSE_MODE_MARKDOWN_V2), ("Anh-Tuan", None)]
+        assert action.message_id == 2
+
+    def test_connection_errors_retried_at_most_max_times(self, tracer: Tracer):
+        """Test a message failing for good is given up after MAX_NUM_RETRIES retries."""
+        bot = FakeBot(error=NetworkError("timed out"), num_failures=100)
+        action = SendMessage(chat_id=1, text="list")
+        assert not asyncio.run(TelegramTransport(bot=bot, tracer=tracer).execute_action(action=action))
+        # first attempt, then a notice and an attempt per retry
+        assert len(bot.calls) == 1 + 2 * TelegramTransport.MAX_NUM_RETRIES
+        assert bot.calls[1][0].startswith("Connection error!")
+
+    def test_connection_error_retried(self, tracer: Tracer):
+        """Test a message is sent after a connection error is over."""
+        bot = FakeBot(error=NetworkError("timed out"), num_failures=1)
+        action = SendMessage(chat_id=1, text="list")
+        assert asyncio.run(TelegramTransport(bot=bot, tracer=tracer).execute_action(action=action))
+        assert [text for text, _ in bot.calls] == ["list", "Connection error! I (bot) am trying again!", "list"]
@@ -0,0 +1,88 @@
+import os
+import sys
+
+from chat_api.tenant_registry import TenantRegistry
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeTenant:
+    """Tenant with controllable idle time and evictability."""
+
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.idle_time = 0.0
+        self.evictable = True
+
+    def touch(self):
+        self.idle_time = 0.0
+
+    def is_evictable(self) -> bool:
+        return self.evictable
+
+
+class TestTenantRegistry:
+    """Unit tests for TenantRegistry class."""
+
+    @staticmethod
+    def make_registry(max_num_tenants: int = 10) -> (TenantRegistry, list[int], list[int]):
+        loaded: list[int] = []
+        unloaded: list[int] = []
+
+        def load(chat_id: int) -> FakeTenant:
+            loaded.append(chat_id)
+            return FakeTenant(chat_id=chat_id)
+
+        registry = TenantRegistry(
+            tenant_chat_ids={-1, -2, -3},
+            staging_chat_ids={100: -2},
+            default_chat_id=-1,
+            max_num_tenants=max_num_tenants,
+            load=load,
+            unload=lambda tenant: unloaded.append(tenant.chat_id)
+        )
+        return registry, loaded, unloaded
+
+    def test_tenants_are_loaded_lazily_once(self):
+        """Test a tenant is loaded on first use and reused afterwards."""
+        registry, loaded, _ = TestTenantRegistry.make_registry()
+        assert loaded == []
+        first = registry.get(chat_id=-2)
+        assert registry.get(chat_id=-2) is first
+        assert loaded == [-2]
+
+    def test_staging_chats_are_routed(self):
+        """Test chats that are not tenants go to the mapped tenant, or the default one."""
+        registry, _, _ = TestTenantRegistry.make_registry()
+        assert registry.get(chat_id=100).chat_id == -2
+        assert registry.get(chat_id=555).chat_id == -1
+
+    def test_least_recently_used_tenant_evicted_over_limit(self):
+        """Test loading over the limit unloads the least recently used evictable tenant."""
+        registry, _, unloaded = TestTenantRegistry.make_registry(max_num_tenants=2)
+        registry.get(chat_id=-1)
+        registry.get(chat_id=-2)
+        registry.get(chat_id=-1)
+        registry.get(chat_id=-3)
+        assert unloaded == [-2]
+        assert [tenant.chat_id for tenant in registry.loaded_tenants] == [-1, -3]
+
+    def test_tenant_waiting_for_release_is_kept(self):
+        """Test tenants that are not evictable stay in memory even over the limit."""
+        registry, _, unloaded = TestTenantRegistry.make_registry(max_num_tenants=1)
+        registry.get(chat_id=-1).evictable = False
+        registry.get(chat_id=-2)
+        assert unloaded == []
+
+    def test_idle_tenants_evicted(self):
+        """Test only evictable tenants idle for long enough are unloaded."""
+        registry, _, unloaded = TestTenantRegistry.make_registry()
+        registry.get(chat_id=-1).idle_time = 100
+        busy = registry.get(chat_id=-2)
+        busy.idle_time = 100
+        busy.evictable = False
+        registry.get(chat_id=-3).idle_time = 5
+        assert registry.evict_idle(idle_time=60) == [-1]
+        assert unloaded == [-1]
+        assert not registry.is_loaded(chat_id=-1)
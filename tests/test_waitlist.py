@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+from auto_registration_system.data_structure.waitlist import Waitlist
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(name="waitlist")
+def fixture_waitlist() -> Waitlist:
+    """Fixture to provide a waitlist of four names in the default priority class."""
+    waitlist = Waitlist()
+    for name in ("Alice", "Bob", "Carol", "Dave"):
+        waitlist.push(name=name)
+    return waitlist
+
+
+class TestWaitlist:
+    """Tests of the order and positions of Waitlist."""
+
+    def test_first_come_first_served(self, waitlist: Waitlist):
+        """Test names are promoted in the order they were enqueued within a priority class."""
+        assert waitlist.names == ["Alice", "Bob", "Carol", "Dave"]
+        assert [waitlist.pop() for _ in range(5)] == ["Alice", "Bob", "Carol", "Dave", None]
+        assert len(waitlist) == 0
+
+    def test_priority_class_first(self, waitlist: Waitlist):
+        """Test a smaller priority class is promoted first, keeping the enqueue order within each class."""
+        waitlist.push(name="Guest", priority=1)
+        waitlist.push(name="Member", priority=-1)
+        assert waitlist.names == ["Member", "Alice", "Bob", "Carol", "Dave", "Guest"]
+        assert waitlist.get_position(name="Guest") == 6
+        assert waitlist.get_entry(name="Member").enqueue_time > 0
+
+    def test_positions_after_changes(self, waitlist: Waitlist):
+        """Test positions stay right after promoting, enqueueing and removing from the middle."""
+        assert waitlist.get_position(name="Carol") == 3
+        assert waitlist.pop() == "Alice"
+        waitlist.push(name="Eve")
+        assert waitlist.get_position(name="Carol") == 2 and waitlist.get_position(name="Eve") == 4
+        assert waitlist.remove(name="Bob") and not waitlist.remove(name="Bob")
+        assert waitlist.get_position(name="Carol") == 1 and waitlist.get_position(name="Alice") is None
+        assert waitlist.names == ["Carol", "Dave", "Eve"]
+
+    def test_removed_names_skipped(self):
+        """Test names removed from the heap are never promoted, also after it is compacted."""
+        waitlist = Waitlist()
+        for i in range(100):
+            waitlist.push(name=f"Player{i}")
+        for i in range(0, 99):
+            waitlist.remove(name=f"Player{i}")
+        waitlist.push(name="Player0")
+        assert waitlist.pop() == "Player99"
+        assert waitlist.pop() == "Player0"
+        assert waitlist.pop() is None
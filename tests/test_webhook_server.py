@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("telegram")
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from telegram_adapter.webhook_server import WebhookServer  # noqa: E402
+
+# Add the parent directory to Python path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SECRET_TOKEN = "secret"
+UPDATE = {
+    "update_id": 7,
+    "message": {"message_id": 1, "date": 0, "chat": {"id": -100, "type": "group"}, "text": "/all"},
+}
+
+
+def run_with_client(test, is_running: bool = True):
+    """Run test(client, server, application) against a webhook server of a fake application."""
+
+    async def run():
+        application = SimpleNamespace(update_queue=asyncio.Queue(), bot=None, running=is_running)
+        server = WebhookServer(application=application, listen="127.0.0.1", port=0, url_path="telegram",
+                               health_path="health", secret_token=SECRET_TOKEN)
+        async with TestClient(TestServer(server.web_app)) as client:
+            await test(client, server, application)
+
+    asyncio.run(run())
+
+
+class TestWebhookServer:
+    """Tests of receiving updates and reporting health over HTTP with WebhookServer."""
+
+    @pytest.mark.parametrize("headers", [{}, {WebhookServer.SECRET_TOKEN_HEADER: "wrong"}])
+    def test_invalid_secret_token_rejected(self, headers: dict):
+        """Test an update without the secret token, or with a wrong one, is rejected and not queued."""
+
+        async def test(client: TestClient, server: WebhookServer, application):
+            response = await client.post("/telegram", json=UPDATE, headers=headers)
+            assert response.status == 403
+            assert application.update_queue.empty()
+            assert server.num_updates_rejected == 1
+
+        run_with_client(test)
+
+    def test_valid_update_queued(self):
+        """Test a valid update is put into the update queue of the application."""
+
+        async def test(client: TestClient, server: WebhookServer, application):
+            response = await client.post("/telegram", json=UPDATE,
+                                         headers={WebhookServer.SECRET_TOKEN_HEADER: SECRET_TOKEN})
+            assert response.status == 200
+            update = application.update_queue.get_nowait()
+            assert update.update_id == 7 and update.message.text == "/all"
+            assert server.num_updates_received == 1
+
+        run_with_client(test)
+
+    def test_malformed_update_rejected(self):
+        """Test a body which is not an update is rejected."""
+
+        async def test(client: TestClient, server: WebhookServer, application):
+            response = await client.post("/telegram", data="not json",
+                                         headers={WebhookServer.SECRET_TOKEN_HEADER: SECRET_TOKEN})
+            assert response.status == 400
+            assert application.update_queue.empty()
+
+        run_with_client(test)
+
+    @pytest.mark.parametrize("is_running, status", [(True, 200), (False, 503)])
+    def test_health(self, is_running: bool, status: int):
+        """Test the health endpoint reports whether the application is running, with the counts of updates."""
+
+        async def test(client: TestClient, server: WebhookServer, application):
+            response = await client.get("/health")
+            assert response.status == status
+            health = await response.json()
+            assert health["status"] == ("ok" if is_running else "starting")
+            assert health["num_updates_received"] == 0 and health["num_updates_queued"] == 0
+
+        run_with_client(test, is_running=is_running)
@@ -0,0 +1,161 @@
+"""Local stand-in for the Telegram Bot API, used by tools/simulate_release.py to run the bot without Telegram.
+
+Updates pushed with push_update are returned by getUpdates (long polling). Every other call is recorded with its
+arrival time and answered with a plausible result: sendMessage and editMessageText return the message, getMe
+returns the bot, and the rest (deleteMessage, answerCallbackQuery, deleteWebhook, ...) return True.
+"""
+import asyncio
+import itertools
+import json
+import time
+
+from aiohttp import web
+
+
+class ApiCall:
+    """One request of the bot to the API, with parameters decoded from JSON where they were encoded."""
+
+    def __init__(self, arrival_time: float, method: str, params: dict, result):
+        self.arrival_time = arrival_time  # time.perf_counter()
+        self.method = method
+        self.params = params
+        self.result = result
+
+    @property
+    def reply_to_message_id(self) -> int | None:
+        reply_parameters = self.params.get("reply_parameters")
+        if isinstance(reply_parameters, dict) and "message_id" in reply_parameters:
+            return int(reply_parameters["message_id"])
+        if "reply_to_message_id" in self.params:
+            return int(self.params["reply_to_message_id"])
+        return None
+
+
+class FakeBotApi:
+    BOT_USER = {"id": 1, "is_bot": True, "first_name": "Simulated bot", "username": "simulated_bot",
+                "can_join_groups": True, "can_read_all_group_messages": False, "supports_inline_queries": False}
+    CHAT_TITLE = "Simulated group"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._host: str = host
+        self._port: int = port
+        self._runner: web.AppRunner | None = None
+        self._updates: list[dict] = []
+        self._has_new_updates: asyncio.Event = asyncio.Event()
+        self._push_times: dict[int, float] = dict()  # update id -> time.perf_counter() when pushed
+        self._calls: list[ApiCall] = []
+        self._waiters: list[(callable, asyncio.Future)] = []
+        self._message_ids = itertools.count(start=1000000)
+
+        self._web_app: web.Application = web.Application()
+        self._web_app.router.add_post("/bot{token}/{method}", self.handle_call)
+        self._web_app.router.add_get("/bot{token}/{method}", self.handle_call)
+
+    @property
+    def base_url(self) -> str:
+        """Url to be given to the bot instead of https://api.telegram.org/bot"""
+        return f"http://{self._host}:{self._port}/bot"
+
+    @property
+    def calls(self) -> list[ApiCall]:
+        return self._calls
+
+    @property
+    def push_times(self) -> dict[int, float]:
+        return self._push_times
+
+    def push_update(self, update: dict):
+        self._push_times[update["update_id"]] = time.perf_counter()
+        self._updates.append(update)
+        self._has_new_updates.set()
+
+    async def wait_for_call(self, predicate, timeout: float) -> ApiCall:
+        """Wait for the first call from now on satisfying predicate."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((predicate, future))
+        return await asyncio.wait_for(future, timeout=timeout)
+
+    async def wait_until_quiet(self, quiet_time: float, timeout: float):
+        """Wait until there has been no call (other than getUpdates) for quiet_time seconds."""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            last_call_time = max((call.arrival_time for call in self._calls), default=0.0)
+            remaining = last_call_time + quiet_time - time.perf_counter()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, deadline - time.perf_counter()))
+
+    @staticmethod
+    async def read_params(request: web.Request) -> dict:
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        for key, value in params.items():
+            if isinstance(value, str) and value[:1] in ("{", "["):
+                try:
+                    params[key] = json.loads(value)
+                except json.JSONDecodeError:
+                    pass
+        return params
+
+    def make_message(self, params: dict, message_id: int) -> dict:
+        message = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]), "type": "supergroup", "title": FakeBotApi.CHAT_TITLE},
+            "from": FakeBotApi.BOT_USER,
+            "text": params.get("text", ""),
+        }
+        if isinstance(params.get("reply_markup"), dict):
+            message["reply_markup"] = params["reply_markup"]
+        return message
+
+    async def get_updates(self, params: dict) -> list[dict]:
+        offset = int(params.get("offset", 0))
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if len(self._updates) == 0:
+            self._has_new_updates.clear()
+            try:
+                await asyncio.wait_for(self._has_new_updates.wait(), timeout=float(params.get("timeout", 0)))
+            except asyncio.TimeoutError:
+                pass
+        return list(self._updates)
+
+    async def handle_call(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await FakeBotApi.read_params(request=request)
+        if method == "getUpdates":
+            return web.json_response({"ok": True, "result": await self.get_updates(params=params)})
+
+        if method == "getMe":
+            result = FakeBotApi.BOT_USER
+        elif method == "sendMessage":
+            result = self.make_message(params=params, message_id=next(self._message_ids))
+        elif method == "editMessageText":
+            result = self.make_message(params=params, message_id=int(params["message_id"]))
+        else:
+            result = True
+        call = ApiCall(arrival_time=time.perf_counter(), method=method, params=params, result=result)
+        self._calls.append(call)
+        for waiter in list(self._waiters):
+            predicate, future = waiter
+            if not future.done() and predicate(call):
+                future.set_result(call)
+            if future.done():
+                self._waiters.remove(waiter)
+        return web.json_response({"ok": True, "result": result})
+
+    async def start(self):
+        self._runner = web.AppRunner(self._web_app)
+        await self._runner.setup()
+        site = web.TCPSite(runner=self._runner, host=self._host, port=self._port)
+        await site.start()
+        if self._port == 0:
+            self._port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        self._has_new_updates.set()  # release a pending long poll
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,104 @@
+"""Post recorded Telegram updates to a locally running bot in webhook mode.
+
+Usage:
+    python tools/post_recorded_updates.py tools/recorded_updates/sample.jsonl
+    python tools/post_recorded_updates.py updates.jsonl --url http://127.0.0.1:8443/telegram --chat-id -4273658267
+
+Each line of the input file is one update as sent by Telegram (the JSON body of a webhook request). The secret token
+is taken from --secret-token or from TELEGRAM_WEBHOOK_SECRET in environment variables.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def load_updates(file_name: str) -> list[dict]:
+    updates: list[dict] = []
+    with open(file=file_name, mode="r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if len(line) > 0 and not line.startswith("#"):
+                updates.append(json.loads(line))
+    return updates
+
+
+def refresh_update(update: dict, update_id: int, chat_id: int | None) -> dict:
+    """Give the recorded update a fresh id and date, and optionally move it to another chat."""
+    update["update_id"] = update_id
+    for key in ("message", "edited_message"):
+        if key in update:
+            update[key]["date"] = int(time.time())
+            if chat_id is not None:
+                update[key]["chat"]["id"] = chat_id
+    if "callback_query" in update and "message" in update["callback_query"]:
+        update["callback_query"]["message"]["date"] = int(time.time())
+        if chat_id is not None:
+            update["callback_query"]["message"]["chat"]["id"] = chat_id
+    return update
+
+
+def post_update(url: str, secret_token: str, update: dict) -> (int, float):
+    request = urllib.request.Request(
+        url=url,
+        data=json.dumps(update).encode("utf-8"),
+        headers={"Content-Type": "application/json", SECRET_TOKEN_HEADER: secret_token},
+        method="POST"
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, (time.perf_counter() - start) * 1000
+
+
+def check_health(url: str) -> (int, str):
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Post recorded Telegram updates to the webhook of the bot.")
+    parser.add_argument("file", help="file of recorded updates, one JSON update per line")
+    parser.add_argument("--url", default="http://127.0.0.1:8443/telegram", help="webhook url of the bot")
+    parser.add_argument("--health-url", default="http://127.0.0.1:8443/health", help="health url of the bot")
+    parser.add_argument("--secret-token", default=os.environ.get("TELEGRAM_WEBHOOK_SECRET"))
+    parser.add_argument("--chat-id", type=int, default=None, help="override the chat id of every update")
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds to wait between two updates")
+    parser.add_argument("--first-update-id", type=int, default=int(time.time()))
+    args = parser.parse_args()
+
+    if args.secret_token is None:
+        print("Secret token is required! Use --secret-token or TELEGRAM_WEBHOOK_SECRET.")
+        return 1
+
+    status, body = check_health(url=args.health_url)
+    print(f"Health: {status} {body}")
+
+    num_failed = 0
+    for i, update in enumerate(load_updates(file_name=args.file)):
+        update = refresh_update(update=update, update_id=args.first_update_id + i, chat_id=args.chat_id)
+        status, latency_ms = post_update(url=args.url, secret_token=args.secret_token, update=update)
+        print(f"update {update['update_id']}: HTTP {status} in {latency_ms:.1f} ms")
+        if status != 200:
+            num_failed += 1
+        if args.interval > 0:
+            time.sleep(args.interval)
+
+    status, body = check_health(url=args.health_url)
+    print(f"Health: {status} {body}")
+    return 0 if num_failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
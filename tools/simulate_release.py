@@ -0,0 +1,343 @@
+"""Rehearse release night: run the bot against a local stand-in for the Bot API and hit it with a burst of users.
+
+Usage:
+    python tools/simulate_release.py
+    python tools/simulate_release.py --num-users 500 --num-slots 4 --num-players 30 --button-share 0.7
+    python tools/simulate_release.py --edit-list-in-place --notify-changes-only --output release.json
+
+The real application of main.py is built with its handlers and jobs, and a pre-released list is armed a few
+seconds ahead in a temporary data directory. When the released list arrives at the fake API, every simulated user
+sends "/rg <name> <slot>" or presses the button of a slot (--button-share of them) at once, or spread over
+--spread seconds. Reported are the percentiles of the time from sending to acknowledgement (the first reply to
+the command, or the answer of the button), the outbound API calls per command by method, and whether the final
+list holds exactly the users who asked for each slot, first come first served, within capacity. With
+--max-calls-per-update, the exit status is also 1 if a command causes more API calls per update than allowed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from fake_bot_api import ApiCall, FakeBotApi  # noqa: E402
+
+TOKEN = "123456:simulated"
+CHAT_ID = -1000000000001
+FIRST_USER_ID = 10000
+TIMEOUT_FOR_RELEASE = 30.0  # seconds after release time
+QUIET_TIME = 1.0  # seconds without calls after which the bot is considered done
+
+
+def make_pre_released_list(num_slots: int, num_players: int) -> (str, list[str]):
+    slot_labels = [chr(ord("a") + i) for i in range(num_slots)]
+    lines = ["[dv] 🏸Simulated day, Simulated venue"]
+    for i, slot_label in enumerate(slot_labels):
+        lines.append(f"[{slot_label}] {i + 1}:00-{i + 3}:00 pm, #players: {num_players}")
+    return "\n".join(lines), slot_labels
+
+
+def make_user(user_index: int) -> dict:
+    return {"id": FIRST_USER_ID + user_index, "is_bot": False, "first_name": "Sim", "last_name": f"User{user_index}",
+            "username": f"sim_user_{user_index}"}
+
+
+def make_name(user_index: int) -> str:
+    # the name the bot derives from the full name of the user, so that commands and buttons agree
+    return f"Sim User{user_index}"
+
+
+def make_command_update(update_id: int, user_index: int, slot_label: str) -> dict:
+    from auto_registration_system.command import Command
+
+    text = f"/{Command.COMMAND_RG} {make_name(user_index)} {slot_label}"
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": CHAT_ID, "type": "supergroup", "title": FakeBotApi.CHAT_TITLE},
+            "from": make_user(user_index),
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(Command.COMMAND_RG) + 1}],
+        },
+    }
+
+
+def make_button_update(update_id: int, user_index: int, slot_label: str, list_message: dict) -> dict:
+    from auto_registration_system.command import Command
+    from chat_api.callback_data import CallbackData
+
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": make_user(user_index),
+            "chat_instance": str(CHAT_ID),
+            "message": list_message,
+            "data": CallbackData.encode(Command.CALLBACK_CODE_RG, slot_label),
+        },
+    }
+
+
+def compute_percentile(sorted_values: list[float], percentile: float) -> float | None:
+    if len(sorted_values) == 0:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def find_ack_times(calls: list[ApiCall]) -> dict[(str, object), float]:
+    """Return (kind, id) -> arrival time of the first call acknowledging a message or a callback query."""
+    ack_times: dict[(str, object), float] = dict()
+    for call in calls:
+        if call.method == "answerCallbackQuery":
+            key = ("callback_query", str(call.params.get("callback_query_id")))
+        elif call.reply_to_message_id is not None:
+            key = ("message", call.reply_to_message_id)
+        else:
+            continue
+        ack_times.setdefault(key, call.arrival_time)
+    return ack_times
+
+
+def check_list(data, requests: list[(int, str)]) -> dict:
+    """Compare the final list with what users asked for, in the order the bot received it."""
+    expected_names_by_slot: dict[str, list[str]] = dict()
+    for user_index, slot_label in requests:
+        expected_names_by_slot.setdefault(slot_label, []).append(make_name(user_index))
+    res: dict = {"slots": dict(), "is_correct": True}
+    for slot_label, slot in data.collect_all_slots_with_labels():
+        expected = expected_names_by_slot.get(slot_label, [])
+        members = slot.players + slot.pending_reservations + slot.non_pending_reservations
+        num_registered = min(slot.num_players, len(expected))
+        slot_result = {
+            "num_requested": len(expected),
+            "num_players": len(slot.players),
+            "num_reservations": len(slot.pending_reservations) + len(slot.non_pending_reservations),
+            "num_lost": len(set(expected) - set(members)),
+            "num_unexpected": len(set(members) - set(expected)),
+            "num_duplicates": len(members) - len(set(members)),
+            "is_within_capacity": len(slot.players) <= slot.num_players,
+            "is_first_come_first_served": slot.players == expected[:num_registered],
+        }
+        slot_result["is_correct"] = (slot_result["num_lost"] == 0 and slot_result["num_unexpected"] == 0
+                                     and slot_result["num_duplicates"] == 0 and slot_result["is_within_capacity"]
+                                     and slot_result["is_first_come_first_served"])
+        res["slots"][slot_label] = slot_result
+        res["is_correct"] = res["is_correct"] and slot_result["is_correct"]
+    return res
+
+
+async def simulate(num_users: int, num_slots: int, num_players: int, button_share: float, spread: float,
+                   delay: float, timeout: float, seed: int) -> dict:
+    import main as bot_main
+    from telegram import Update
+    from telegram_adapter.telegram_command_handler import TelegramCommandHandler
+    from chat_api.tenant import Tenant
+
+    pre_released_list, slot_labels = make_pre_released_list(num_slots=num_slots, num_players=num_players)
+    time_manager = TelegramCommandHandler.time_manager
+    release_time = (time_manager.now() + timedelta(seconds=delay)).replace(microsecond=0) + timedelta(seconds=1)
+    Tenant.make_data_handler(chat_id=CHAT_ID).write_data_to_files(
+        main_list_as_str="",
+        release_time_as_str=release_time.strftime(Config.input_time_format),
+        pre_released_list_as_str=pre_released_list
+    )
+
+    api = FakeBotApi()
+    await api.start()
+    TelegramCommandHandler.initialize()
+    application = bot_main.build_application(token=TOKEN, base_url=api.base_url)
+    rng = random.Random(seed)
+    async with application:
+        await application.post_init(application)
+        await application.updater.start_polling(allowed_updates=Update.ALL_TYPES, poll_interval=0.0, timeout=10)
+        await application.start()
+        try:
+            release_call = await api.wait_for_call(
+                predicate=lambda call: call.method == "sendMessage" and "reply_markup" in call.params,
+                timeout=delay + 1 + TIMEOUT_FOR_RELEASE
+            )
+            release_delay = (time_manager.now() - release_time).total_seconds()
+
+            # the burst: who asks for which slot, by command or by button
+            start_time = time.perf_counter()
+            requests: list[(int, str)] = []  # (user index, slot label) in the order sent
+            ack_keys: list[(str, object)] = []
+            num_buttons = 0
+            for user_index in range(num_users):
+                if spread > 0:
+                    await asyncio.sleep(max(0.0, start_time + spread * user_index / num_users - time.perf_counter()))
+                update_id = user_index + 1
+                slot_label = rng.choice(slot_labels)
+                if rng.random() < button_share:
+                    api.push_update(make_button_update(update_id, user_index, slot_label, release_call.result))
+                    ack_keys.append(("callback_query", str(update_id)))
+                    num_buttons += 1
+                else:
+                    api.push_update(make_command_update(update_id, user_index, slot_label))
+                    ack_keys.append(("message", update_id))
+                requests.append((user_index, slot_label))
+
+            # wait for every acknowledgement, then for the bot to finish what it does after them
+            deadline = time.perf_counter() + timeout
+            while time.perf_counter() < deadline:
+                ack_times = find_ack_times(calls=api.calls)
+                if all(key in ack_times for key in ack_keys):
+                    break
+                await asyncio.sleep(0.05)
+            await api.wait_until_quiet(quiet_time=QUIET_TIME, timeout=max(0.0, deadline - time.perf_counter()))
+            end_time = time.perf_counter()
+        finally:
+            await application.updater.stop()
+            await application.stop()
+            await api.stop()
+
+    ack_times = find_ack_times(calls=api.calls)
+    latencies = sorted(
+        ack_times[key] - api.push_times[update_id]
+        for update_id, key in enumerate(ack_keys, start=1) if key in ack_times
+    )
+    calls_by_method: dict[str, int] = dict()
+    for call in api.calls:
+        if start_time <= call.arrival_time <= end_time:
+            calls_by_method[call.method] = calls_by_method.get(call.method, 0) + 1
+    num_calls = sum(calls_by_method.values())
+    metrics = TelegramCommandHandler.metrics
+    return {
+        "num_users": num_users,
+        "num_commands": num_users - num_buttons,
+        "num_buttons": num_buttons,
+        "release_sent_delay_ms": release_delay * 1000,
+        "num_acknowledged": len(latencies),
+        "ack_p50_ms": compute_percentile(latencies, 50) * 1000 if latencies else None,
+        "ack_p95_ms": compute_percentile(latencies, 95) * 1000 if latencies else None,
+        "ack_p99_ms": compute_percentile(latencies, 99) * 1000 if latencies else None,
+        "ack_max_ms": latencies[-1] * 1000 if latencies else None,
+        "burst_seconds": end_time - start_time,
+        "calls_by_method": calls_by_method,
+        "calls_per_command": num_calls / num_users if num_users > 0 else None,
+        # as counted by the bot for the command causing each call (queued deletions included)
+        "amplification_by_command": {
+            command: {
+                "calls_per_update": metrics.get_amplification(command=command),
+                "num_updates": metrics.get_count(command=command),
+            }
+            for command in metrics.get_commands()
+        },
+        "list": check_list(
+            data=TelegramCommandHandler.get_tenant(chat_id=CHAT_ID).auto_reg_system.data,
+            requests=requests
+        ),
+    }
+
+
+def run(num_users: int = 200, num_slots: int = 4, num_players: int = 20, button_share: float = 0.5,
+        spread: float = 0.0, delay: float = 3.0, timeout: float = 120.0, seed: int = 0,
+        directory_data: str | None = None) -> dict:
+    """Configure the bot for one simulated chat with data in directory_data (a temporary directory removed
+    afterwards if None) and simulate the release."""
+    is_temporary = directory_data is None
+    if is_temporary:
+        directory_data = tempfile.mkdtemp(prefix="simulate_release_")
+    Config.directory_data = directory_data
+    Config.allowed_chat_ids = {CHAT_ID}
+    Config.default_chat_id = CHAT_ID
+    Config.staging_chat_ids = {}
+    Config.num_shard_workers = 0
+    Config.reminder_time_list = []
+    try:
+        return asyncio.run(simulate(
+            num_users=num_users,
+            num_slots=num_slots,
+            num_players=num_players,
+            button_share=button_share,
+            spread=spread,
+            delay=delay,
+            timeout=timeout,
+            seed=seed
+        ))
+    finally:
+        if is_temporary:
+            shutil.rmtree(directory_data, ignore_errors=True)
+
+
+def format_report(result: dict) -> str:
+    def format_ms(value: float | None) -> str:
+        return "-" if value is None else f"{value:.1f} ms"
+
+    lines = [
+        f"Users: {result['num_users']} ({result['num_commands']} commands, {result['num_buttons']} buttons)",
+        f"Release sent {format_ms(result['release_sent_delay_ms'])} after release time",
+        f"Acknowledged: {result['num_acknowledged']}/{result['num_users']} in {result['burst_seconds']:.2f} s",
+        f"Time to acknowledgement: p50 {format_ms(result['ack_p50_ms'])}, p95 {format_ms(result['ack_p95_ms'])}, "
+        + f"p99 {format_ms(result['ack_p99_ms'])}, max {format_ms(result['ack_max_ms'])}",
+        f"Outbound calls per command: {result['calls_per_command']:.2f}",
+    ]
+    for method, num_calls in sorted(result["calls_by_method"].items()):
+        lines.append(f"    {method}: {num_calls}")
+    lines.append("Calls per update counted by the bot:")
+    for command, amplification in result["amplification_by_command"].items():
+        lines.append(f"    {command}: {amplification['calls_per_update']:.2f} ({amplification['num_updates']} updates)")
+    lines.append(f"List is {'correct' if result['list']['is_correct'] else 'NOT correct'}:")
+    for slot_label, slot_result in result["list"]["slots"].items():
+        lines.append(f"    [{slot_label}] " + ", ".join(f"{key}={value}" for key, value in slot_result.items()))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a burst of registrations at release time.")
+    parser.add_argument("--num-users", type=int, default=200)
+    parser.add_argument("--num-slots", type=int, default=4)
+    parser.add_argument("--num-players", type=int, default=20, help="capacity of every slot")
+    parser.add_argument("--button-share", type=float, default=0.5, help="share of users pressing buttons")
+    parser.add_argument("--spread", type=float, default=0.0, help="seconds over which users send (0 for at once)")
+    parser.add_argument("--delay", type=float, default=3.0, help="seconds from start-up to release")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for the bot after the burst")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--edit-list-in-place", action="store_true", help="set Config.edit_list_in_place")
+    parser.add_argument("--notify-changes-only", action="store_true", help="set Config.notify_changes_only")
+    parser.add_argument("--compact", action="store_true", help="set Config.use_compact_list_layout")
+    parser.add_argument("--directory-data", default=None, help="keep data here instead of a temporary directory")
+    parser.add_argument("--output", default=None, help="also write the result as JSON to this file")
+    parser.add_argument("--max-calls-per-update", type=float, default=None,
+                        help="fail if any command causes more API calls per update than this")
+    args = parser.parse_args()
+
+    Config.edit_list_in_place = args.edit_list_in_place
+    Config.notify_changes_only = args.notify_changes_only
+    Config.use_compact_list_layout = args.compact
+    result = run(
+        num_users=args.num_users,
+        num_slots=args.num_slots,
+        num_players=args.num_players,
+        button_share=args.button_share,
+        spread=args.spread,
+        delay=args.delay,
+        timeout=args.timeout,
+        seed=args.seed,
+        directory_data=args.directory_data
+    )
+    print(format_report(result))
+    if args.output is not None:
+        with open(file=args.output, mode="w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    is_amplification_exceeded = args.max_calls_per_update is not None and any(
+        amplification["calls_per_update"] > args.max_calls_per_update
+        for amplification in result["amplification_by_command"].values()
+    )
+    if is_amplification_exceeded:
+        print(f"Some command causes more than {args.max_calls_per_update} API calls per update!")
+    sys.exit(0 if result["list"]["is_correct"] and not is_amplification_exceeded else 1)
+
+
+if __name__ == "__main__":
+    main()
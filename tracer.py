@@ -2,6 +2,7 @@ import logging
 from typing import BinaryIO
 
 from auto_registration_system.data_structure.time_manager import TimeManager
+from metrics import Metrics
 
 
 class Tracer:
@@ -13,11 +14,12 @@ class Tracer:
         self._time_manager = time_manager
 
     def log(self, message: str, is_history_required: bool = True):
-        logging.info(msg=f"{message}")
-        if is_history_required:
-            with open(file=self._file_name_history, mode="a", encoding="utf-8") as f:
-                f.write(f"## {self._time_manager.now_to_str()}\n")
-                f.write(f"{message}\n\n")
+        with Metrics.phase(phase=Metrics.PHASE_PERSIST):
+            logging.info(msg=f"{message}")
+            if is_history_required:
+                with open(file=self._file_name_history, mode="a", encoding="utf-8") as f:
+                    f.write(f"## {self._time_manager.now_to_str()}\n")
+                    f.write(f"{message}\n\n")
 
     def load_file_history(self) -> BinaryIO:
         return open(self._file_name_history, 'rb')